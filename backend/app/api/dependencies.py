@@ -0,0 +1,20 @@
+import threading
+from fastapi import Request
+from ..ml.unified_ocr import UnifiedOCR
+
+_engine_lock = threading.Lock()
+
+
+def get_unified_ocr(request: Request) -> UnifiedOCR:
+    """
+    App-scoped UnifiedOCR engine.
+    Created in the app lifespan; built on first use if the lifespan did not run.
+    """
+    engine = getattr(request.app.state, "unified_ocr", None)
+    if engine is None:
+        with _engine_lock:
+            engine = getattr(request.app.state, "unified_ocr", None)
+            if engine is None:
+                engine = UnifiedOCR()
+                request.app.state.unified_ocr = engine
+    return engine
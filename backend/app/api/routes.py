@@ -1,13 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from typing import Any, Callable, Literal
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from ..services.file_utils import save_upload_file
-from ..services.ocr_pipeline import process_image
+from ..services.file_utils import UploadTooLarge, mb, read_upload, scoped_upload
+from ..services.ocr_pipeline import process_image, process_document
+from ..services.document_loader import IMAGE_TYPES, TooManyPages, is_supported, sniff_kind
 from ..schemas.ocr import OCRResponse, OCRV1Response, RoutedOCRResponse
-from ..services.ocr_service import run_ocr
+from ..services.ocr_service import run_ocr, run_ocr_document
+from ..services.reader_pool import get_reader_pool
+from ..services.easyocr_decoding import get_crop_batcher
+from ..services.tesseract_pool import tesseract_pool_stats
+from ..services.preprocessing import get_pipelines, resolve_profile
+from ..services.result_cache import cache_key, get_result_cache, is_cacheable
 from ..ml.evaluate import evaluate_dataset
 from ..ml.inference_classifier import get_classifier
 from ..ml.unified_ocr import UnifiedOCR
+from .dependencies import get_unified_ocr
 from ..core.config import settings
+from ..core.executor import QueueFullError, get_inference_executor
 from ..auth.dependencies import get_current_active_user, require_role
 from ..auth.models import User
 import time
@@ -16,40 +26,143 @@ import os
 router = APIRouter()
 
 
+def _queue_full_headers() -> dict:
+    return {"Retry-After": str(settings.inference_retry_after_s)}
+
+
+async def run_inference(fn, *args, **kwargs):
+    """
+    Run blocking inference on the dedicated executor.
+    Answers 503 with Retry-After when the executor queue is full.
+    """
+    try:
+        return await get_inference_executor().run(fn, *args, **kwargs)
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Inference queue is full", headers=_queue_full_headers())
+
+
+async def _is_multipage_upload(file: UploadFile) -> bool:
+    """
+    Whether the upload is a PDF/TIFF, judged by its leading bytes rather
+    than the declared content type. Those are rasterized page by page from
+    a file on disk, anything else is decoded from memory.
+    """
+    head = await file.read(8)
+    await file.seek(0)
+    return sniff_kind(head) != "image"
+
+
+# ?cache=bypass skips the result cache, ?cache=refresh recomputes and overwrites the entry
+CacheMode = Literal["use", "bypass", "refresh"]
+
+
+def preprocessing_profile(profile: str | None = None) -> str | None:
+    """?profile= picks a preprocessing profile or custom pipeline (see services/preprocessing.get_pipelines)."""
+    if profile is not None and profile not in get_pipelines():
+        raise HTTPException(status_code=422, detail=f"Unknown preprocessing profile '{profile}' (expected one of {', '.join(get_pipelines())})")
+    return profile
+
+
+async def run_cached(pipeline: str, upload, params: dict, fn, *args, mode: CacheMode = "use", run=run_inference, is_valid=None):
+    """
+    Serve ``fn(*args)`` from the result cache when the same bytes were
+    already processed with the same parameters and pipeline fingerprint.
+    Returns (result, cache_status).
+    """
+    cache = get_result_cache()
+    if cache is None or mode == "bypass":
+        return await run(fn, *args), "bypass"
+    key = cache_key(upload.sha256, pipeline, **params)
+    if mode != "refresh":
+        hit = await run_in_threadpool(cache.get, key)
+        if hit is not None and (is_valid is None or is_valid(hit)):
+            return hit, "hit"
+    result = await run(fn, *args)
+    if is_cacheable(result):
+        await run_in_threadpool(cache.put, key, result)
+    return result, "refresh" if mode == "refresh" else "miss"
+
+
+def _pdf_exists(result: dict) -> bool:
+    # Searchable PDFs live in output_dir and may have been cleaned up since
+    url = result.get("pdf_url")
+    return not url or os.path.exists(os.path.join(settings.output_dir, os.path.basename(url)))
+
+
 @router.get("/health")
 def health():
     return {"status": "ok"}
 
 
+@router.get("/metrics")
+def metrics(unified_ocr: UnifiedOCR = Depends(get_unified_ocr)):
+    return {
+        "easyocr_readers": get_reader_pool().stats(),
+        "easyocr_batcher": batcher.stats() if (batcher := get_crop_batcher()) else None,
+        "tesseract_pool": tesseract_pool_stats(),
+        "routed_ocr": unified_ocr.stats(),
+        "inference_executor": get_inference_executor().stats(),
+        "result_cache": cache.stats() if (cache := get_result_cache()) else None,
+    }
+
+
 @router.post("/ocr", response_model=OCRResponse)
-async def ocr(file: UploadFile = File(...), lang: str | None = None):
-    if file.content_type not in {"image/png", "image/jpeg", "image/jpg"}:
+async def ocr(
+    file: UploadFile = File(...),
+    lang: str | None = None,
+    cache: CacheMode = "use",
+    profile: str | None = Depends(preprocessing_profile),
+):
+    if not is_supported(file.content_type):
         raise HTTPException(status_code=400, detail="Unsupported file type")
-    path = await save_upload_file(file, settings.tmp_dir)
-    start = time.perf_counter()
-    result = process_image(path, lang or settings.default_lang)
+    # Single images are decoded from memory; PDFs/TIFFs go through a scoped temp file
+    multipage = await _is_multipage_upload(file)
+    async with scoped_upload(file, settings.tmp_dir, mb(settings.ocr_max_upload_mb), to_disk=multipage) as upload:
+        start = time.perf_counter()
+        lang = lang or settings.default_lang
+        profile = resolve_profile(profile)
+        pipeline: Callable[..., Any]
+        args: tuple
+        if multipage:
+            pipeline, args = process_document, (upload.source, lang, profile)
+        else:
+            pipeline, args = process_image, (upload.source, lang, True, profile)
+        result, cache_status = await run_cached(
+            pipeline.__name__, upload, {"lang": lang, "profile": profile}, pipeline, *args, mode=cache, is_valid=_pdf_exists
+        )
     elapsed_ms = int((time.perf_counter() - start) * 1000)
+    metadata = {"processing_time_ms": elapsed_ms, "cache": cache_status, "preprocessing_profile": profile}
+    for key in ("quality_gate", "resolution", "preprocessing_stages", "decoding"):
+        if key in result:
+            metadata[key] = result.pop(key)
     payload = {
         **result,
         "status": "success",
-        "metadata": {"processing_time_ms": elapsed_ms},
+        "metadata": metadata,
     }
     return JSONResponse(content=payload)
 
 
 @router.post("/v1/ocr", response_model=OCRV1Response)
-async def ocr_v1(file: UploadFile = File(...)):
-    if file.content_type not in {"image/png", "image/jpeg", "image/jpg"}:
+async def ocr_v1(file: UploadFile = File(...), cache: CacheMode = "use"):
+    if not is_supported(file.content_type):
         return JSONResponse(status_code=400, content={"status": "error", "error": {"code": "invalid_type", "message": "Unsupported file type"}})
-    data = await file.read()
-    size = len(data)
-    if size > 10 * 1024 * 1024:
-        return JSONResponse(status_code=400, content={"status": "error", "error": {"code": "file_too_large", "message": "File size exceeds 10MB"}})
-    file.file.seek(0)
-    path = await save_upload_file(file, settings.upload_tmp_dir)
+    multipage = await _is_multipage_upload(file)
     try:
-        result = run_ocr(path, original_filename=file.filename)
+        async with scoped_upload(file, settings.upload_tmp_dir, mb(settings.v1_ocr_max_upload_mb), to_disk=multipage) as upload:
+            pipeline = run_ocr_document if multipage else run_ocr
+            result, cache_status = await run_cached(
+                pipeline.__name__, upload, {}, pipeline, upload.source, file.filename,
+                mode=cache, run=get_inference_executor().run,
+            )
+        result["metadata"].update(filename=file.filename, cache=cache_status)
         return JSONResponse(content=result)
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=400, content={"status": "error", "error": {"code": "file_too_large", "message": str(e)}})
+    except TooManyPages as e:
+        return JSONResponse(status_code=413, content={"status": "error", "error": {"code": "too_many_pages", "message": str(e)}})
+    except QueueFullError:
+        return JSONResponse(status_code=503, headers=_queue_full_headers(), content={"status": "error", "error": {"code": "queue_full", "message": "Inference queue is full"}})
     except Exception:
         return JSONResponse(status_code=500, content={"status": "error", "error": {"code": "ocr_failed", "message": "OCR processing failed"}})
 
@@ -76,11 +189,11 @@ async def classify_document(file: UploadFile = File(...), current_user: User = D
     """
     Classify document type using CNN model.
     """
-    if file.content_type not in {"image/png", "image/jpeg", "image/jpg"}:
+    if file.content_type not in IMAGE_TYPES:
         raise HTTPException(status_code=400, detail="Unsupported file type")
         
-    # Save file temporarily
-    path = await save_upload_file(file, settings.tmp_dir)
+    # Decoded from memory, nothing is written to disk
+    data = (await read_upload(file, max_bytes=mb(settings.classify_max_upload_mb))).data
     
     try:
         classifier = get_classifier()
@@ -90,43 +203,57 @@ async def classify_document(file: UploadFile = File(...), current_user: User = D
                 content={"error": "Model not loaded. Please train the model first."}
             )
             
-        result = classifier.predict(path)
+        result = await run_inference(classifier.predict, data)
         return JSONResponse(content=result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         return JSONResponse(
             status_code=500, 
             content={"error": str(e)}
         )
-    finally:
-        # Cleanup
-        if os.path.exists(path):
-            os.remove(path)
 
 
 @router.post("/ocr/routed", response_model=RoutedOCRResponse)
-async def ocr_routed(file: UploadFile = File(...), current_user: User = Depends(get_current_active_user)):
+async def ocr_routed(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_user),
+    unified_ocr: UnifiedOCR = Depends(get_unified_ocr),
+    cache: CacheMode = "use",
+    budget_ms: float | None = Query(None, gt=0),
+    profile: str | None = Depends(preprocessing_profile),
+):
     """
     Intelligent OCR routing endpoint.
     Classifies document type and selects best OCR engine (TrOCR vs EasyOCR).
+    PDF and multi-page TIFF uploads are routed page by page.
+    ``budget_ms`` bounds the expected latency of a single image: the router
+    picks an engine that should fit and skips the ensemble when out of time.
+    ``profile`` overrides the preprocessing level routed for the document type.
     """
-    if file.content_type not in {"image/png", "image/jpeg", "image/jpg"}:
+    if not is_supported(file.content_type):
         raise HTTPException(status_code=400, detail="Unsupported file type")
         
-    path = await save_upload_file(file, settings.tmp_dir)
-    
-    try:
-        # Initialize UnifiedOCR
-        # In production, this should be a dependency or singleton to avoid reloading models
-        unified_ocr = UnifiedOCR() 
-        result = unified_ocr.process(path)
-        return JSONResponse(content=result)
-        
-    except Exception as e:
-        return JSONResponse(
-            status_code=500,
-            content={"error": str(e), "text": "", "structured": {}, "routing_info": {}}
-        )
-    finally:
-        if os.path.exists(path):
-            os.remove(path)
+    multipage = await _is_multipage_upload(file)
+    async with scoped_upload(file, settings.tmp_dir, mb(settings.routed_max_upload_mb), to_disk=multipage) as upload:
+        try:
+            pipeline: Callable[..., Any]
+            args: tuple
+            if multipage:
+                pipeline, args = unified_ocr.process_document, (upload.source, profile)
+            else:
+                pipeline, args = unified_ocr.process, (upload.source, None, budget_ms, profile)
+            result, cache_status = await run_cached(
+                f"routed.{pipeline.__name__}", upload, {"budget_ms": budget_ms, "profile": profile}, pipeline, *args, mode=cache
+            )
+            result.setdefault("metadata", {})["cache"] = cache_status
+            return JSONResponse(content=result)
+            
+        except (HTTPException, TooManyPages):
+            raise
+        except Exception as e:
+            return JSONResponse(
+                status_code=500,
+                content={"error": str(e), "text": "", "structured": {}, "routing_info": {}}
+            )
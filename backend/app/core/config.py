@@ -1,4 +1,5 @@
 import os
+from typing import Any
 from pydantic_settings import BaseSettings
 
 
@@ -13,6 +14,95 @@ class Settings(BaseSettings):
     tmp_dir: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "tmp"))
     upload_tmp_dir: str = os.path.join(tmp_dir, "upload_tmp")
     default_lang: str = "en"
+    # EasyOCR reader pool
+    easyocr_pool_size: int = 4
+    easyocr_gpu: bool | None = None  # None = auto-detect CUDA
+    easyocr_preload_langs: list[str] = ["en"]  # "en+fr" preloads a multi-language reader
+    # EasyOCR decoding: "greedy", "beamsearch", or "adaptive" (greedy, then beam
+    # search only for crops whose confidence is below the threshold)
+    easyocr_decoder: str = "adaptive"
+    easyocr_beam_threshold: float = 0.7
+    # EasyOCR recognition batching: crops of concurrent pages/requests share
+    # recognizer passes (batch size 1 recognizes each page's crops on its own)
+    easyocr_batch_size: int = 32
+    easyocr_batch_wait_ms: float = 10.0
+    # Tesseract fallback: long-lived worker processes (needs tesserocr; 0 forks
+    # ``tesseract`` per page through pytesseract)
+    tesseract_pool_size: int = 2
+    tesseract_timeout_s: float = 30.0
+    tesseract_health_interval_s: float = 60.0
+    tesseract_tessdata: str | None = None  # None = tesserocr's default / TESSDATA_PREFIX
+    # Inference executor (blocking OCR/ML work runs here, off the event loop)
+    inference_workers: int = 2
+    inference_queue_size: int = 8
+    inference_retry_after_s: int = 5
+    # Classifier micro-batching (batch size 1 disables it)
+    classifier_batch_size: int = 8
+    classifier_batch_wait_ms: float = 5.0
+    # TrOCR request coalescing
+    trocr_batch_size: int = 8
+    trocr_batch_wait_ms: float = 10.0
+    # Upload size limits per endpoint (MB); uploads are streamed and cut off at the limit
+    ocr_max_upload_mb: float = 25
+    v1_ocr_max_upload_mb: float = 10
+    routed_max_upload_mb: float = 25
+    classify_max_upload_mb: float = 10
+    jobs_max_upload_mb: float = 50
+    # Ensemble: "sequential" runs the secondary engine only when the primary is
+    # not confident, "parallel" runs both at once, "auto" picks per document type
+    ensemble_mode: str = "auto"
+    ensemble_parallel_min_rate: float = 0.5
+    ensemble_min_history: int = 20
+    ensemble_workers: int = 4
+    # Preprocessing profile ("fast", "balanced" or "quality") when neither the
+    # request nor the routed document type picks one; per-type overrides win
+    # over the router's table, e.g. {"receipt": "fast"}
+    preprocessing_profile: str = "quality"
+    preprocessing_profile_by_doc_type: dict[str, str] = {}
+    # Custom preprocessing pipelines, usable wherever a profile name is: name ->
+    # steps, each a stage name or {"stage": ..., "name": ..., **params}, e.g.
+    # {"receipt_lite": ["normalize", {"stage": "clahe", "clip_limit": 3.0}, "otsu"]}.
+    # The file (JSON, same shape) is read first; both may override built-ins.
+    preprocessing_pipelines: dict[str, list[str | dict[str, Any]]] = {}
+    preprocessing_pipelines_file: str = ""
+    # Image-quality gate: a cheap analysis pass that skips preprocessing stages
+    # a page does not need and OCR entirely for blank pages
+    quality_gate_enabled: bool = True
+    quality_gate_blank_ink: float = 0.001  # share of ink pixels below which a page is blank
+    quality_gate_max_skew_deg: float = 0.5  # no deskew below this estimated skew
+    quality_gate_max_clean_noise: float = 2.0  # no denoising below this noise sigma
+    quality_gate_min_good_contrast: float = 0.75  # no CLAHE above this 1-99% range
+    # Resolution normalisation: rescale so the median character height lands in
+    # [min, max] px, within a pixel budget
+    text_height_min_px: float = 18
+    text_height_max_px: float = 40
+    normalize_max_pixels: int = 20_000_000
+    # Deskew: angle estimated on a thumbnail, rotation skipped below epsilon
+    deskew_analysis_side: int = 1000
+    deskew_epsilon_deg: float = 0.3
+    # Tile-parallel denoising for large images (0 pixels disables it, 0 workers = one per core)
+    preprocessing_tile_min_pixels: int = 4_000_000
+    preprocessing_tile_size: int = 1024
+    preprocessing_tile_overlap: int = 8
+    preprocessing_tile_workers: int = 0
+    # Multi-page documents (PDF via poppler's pdftoppm, multi-page TIFF)
+    pdf_dpi: int = 200
+    page_workers: int = 2
+    max_pages: int = 200
+    # OCR result cache (keyed by upload SHA-256 + pipeline fingerprint)
+    result_cache_enabled: bool = True
+    result_cache_memory_mb: float = 64
+    result_cache_dir: str = os.path.join(tmp_dir, "result_cache")
+    result_cache_disk_mb: float = 512  # 0 disables the disk tier
+    result_cache_ttl_s: float = 7 * 24 * 3600
+    # Async job queue
+    jobs_dir: str = os.path.join(tmp_dir, "jobs")
+    jobs_database_url: str = os.environ.get("JOBS_DATABASE_URL", f"sqlite:///{os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'jobs.db'))}")
+    job_workers: int = 1
+    job_max_attempts: int = 3
+    job_retry_backoff_s: float = 5.0
+    job_poll_interval_s: float = 1.0
+    job_lease_timeout_s: float = 1800.0
     # Auth & Security
     secret_key: str = os.environ.get("SECRET_KEY", "CHANGE_ME_DEV_ONLY")
     access_token_expire_minutes: int = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
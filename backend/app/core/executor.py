@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .config import settings
+from .telemetry import LatencyStats
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the inference executor has no free worker or queue slot."""
+
+
+class InferenceExecutor:
+    """
+    Dedicated thread pool for blocking inference (OpenCV, EasyOCR, torch).
+
+    Keeps model work off the asyncio event loop so health checks and auth
+    keep answering while OCR runs. Admission is bounded to
+    ``max_workers + max_queue`` in-flight tasks; beyond that ``submit``
+    raises QueueFullError immediately instead of piling up requests.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self.wait_time = LatencyStats(cold_start=False)
+        self.run_time = LatencyStats(cold_start=False)
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise QueueFullError("Inference queue is full")
+
+        enqueued = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def task() -> Any:
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            self.wait_time.record((started - enqueued) * 1000)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                self.run_time.record((time.perf_counter() - started) * 1000)
+                with self._lock:
+                    self._running -= 1
+                    if ok:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+                self._slots.release()
+
+        try:
+            return self._pool.submit(task)
+        except RuntimeError:
+            # Pool already shut down
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` on the pool and await its result without blocking the loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+        return {
+            **counters,
+            "wait_time": self.wait_time.snapshot()["steady_state"],
+            "run_time": self.run_time.snapshot()["steady_state"],
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+# Global instance for reuse
+_executor: Optional[InferenceExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_inference_executor() -> InferenceExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = InferenceExecutor(
+                    max_workers=settings.inference_workers,
+                    max_queue=settings.inference_queue_size,
+                )
+    return _executor
+
+
+def shutdown_inference_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
@@ -0,0 +1,56 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class LatencyStats:
+    """
+    Thread-safe latency recorder.
+
+    Keeps the very first sample apart as the cold-start measurement and a
+    bounded window of later samples for steady-state percentiles. Pass
+    ``cold_start=False`` for measurements where the first sample is not
+    special (queue waits, run times).
+    """
+
+    def __init__(self, window: int = 1000, cold_start: bool = True):
+        self._track_cold_start = cold_start
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._count = 0
+        self._total_ms = 0.0
+        self._cold_start_ms: Optional[float] = None
+
+    def record(self, elapsed_ms: float) -> bool:
+        """Record one sample. Returns True if it was the cold-start sample."""
+        with self._lock:
+            self._count += 1
+            if self._track_cold_start and self._cold_start_ms is None:
+                self._cold_start_ms = elapsed_ms
+                return True
+            self._samples.append(elapsed_ms)
+            self._total_ms += elapsed_ms
+            return False
+
+    @staticmethod
+    def _percentile(ordered: list, pct: float) -> float:
+        if not ordered:
+            return 0.0
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            ordered = sorted(self._samples)
+            steady = self._count - (1 if self._cold_start_ms is not None else 0)
+            return {
+                "count": self._count,
+                "cold_start_ms": self._cold_start_ms,
+                "steady_state": {
+                    "count": steady,
+                    "mean_ms": self._total_ms / steady if steady else 0.0,
+                    "p50_ms": self._percentile(ordered, 50),
+                    "p95_ms": self._percentile(ordered, 95),
+                    "max_ms": ordered[-1] if ordered else 0.0,
+                },
+            }
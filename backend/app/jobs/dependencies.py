@@ -0,0 +1,18 @@
+from __future__ import annotations
+import threading
+from fastapi import Request
+from .queue import JobQueue
+
+_queue_lock = threading.Lock()
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """App-scoped job queue, created in the lifespan (or on first use)."""
+    queue = getattr(request.app.state, "job_queue", None)
+    if queue is None:
+        with _queue_lock:
+            queue = getattr(request.app.state, "job_queue", None)
+            if queue is None:
+                queue = JobQueue()
+                request.app.state.job_queue = queue
+    return queue
@@ -0,0 +1,23 @@
+from __future__ import annotations
+from typing import Any, Dict
+from backend.app.core.config import settings
+from backend.app.ml.unified_ocr import UnifiedOCR
+from backend.app.services.ocr_pipeline import process_image, process_document
+from backend.app.services.document_loader import is_multipage
+from .models import Job
+from .worker import JobHandler
+
+
+def default_handlers(unified_ocr: UnifiedOCR) -> Dict[str, JobHandler]:
+    """Map job kinds to the pipelines that run them."""
+
+    def run_routed(job: Job) -> Any:
+        if is_multipage(job.file_path):
+            return unified_ocr.process_document(job.file_path)
+        return unified_ocr.process(job.file_path)
+
+    def run_ocr(job: Job) -> Any:
+        pipeline = process_document if is_multipage(job.file_path) else process_image
+        return pipeline(job.file_path, job.lang or settings.default_lang)
+
+    return {"routed": run_routed, "ocr": run_ocr}
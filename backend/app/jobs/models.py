@@ -0,0 +1,29 @@
+from __future__ import annotations
+from typing import Optional, Literal
+from datetime import datetime
+from sqlalchemy.orm import declarative_base, Mapped, mapped_column
+from sqlalchemy import String, Integer, Text, DateTime
+
+Base = declarative_base()
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+JobKind = Literal["routed", "ocr"]
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    kind: Mapped[JobKind] = mapped_column(String(20), default="routed", nullable=False)
+    status: Mapped[JobStatus] = mapped_column(String(20), default="queued", index=True, nullable=False)
+    owner: Mapped[Optional[str]] = mapped_column(String(255), index=True, nullable=True)
+    file_path: Mapped[str] = mapped_column(String(1024), nullable=False)
+    original_filename: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    lang: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
+    result: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from sqlalchemy import create_engine, func, update, select
+from sqlalchemy.orm import sessionmaker
+from backend.app.core.config import settings
+from .models import Base, Job
+
+
+class JobQueue:
+    """
+    Durable job queue backed by SQLite (or any SQLAlchemy database URL).
+
+    Jobs survive restarts: anything left ``running`` by a process that no
+    longer exists (or whose lease expired) is put back on the queue by
+    ``recover``. Claiming uses a conditional UPDATE so several worker
+    threads (or gunicorn workers sharing the file) never pick up the same
+    job twice.
+    """
+
+    @staticmethod
+    def worker_id() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def __init__(self, database_url: Optional[str] = None, retry_backoff_s: Optional[float] = None):
+        url = database_url or settings.jobs_database_url
+        self.engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+        self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine, expire_on_commit=False)
+        self.retry_backoff_s = settings.job_retry_backoff_s if retry_backoff_s is None else retry_backoff_s
+        Base.metadata.create_all(bind=self.engine)
+
+    def enqueue(
+        self,
+        file_path: str,
+        kind: str = "routed",
+        owner: Optional[str] = None,
+        original_filename: Optional[str] = None,
+        lang: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Job:
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            status="queued",
+            owner=owner,
+            file_path=file_path,
+            original_filename=original_filename,
+            lang=lang,
+            attempts=0,
+            max_attempts=max_attempts or settings.job_max_attempts,
+            run_after=datetime.utcnow(),
+            created_at=datetime.utcnow(),
+        )
+        with self.Session() as db:
+            db.add(job)
+            db.commit()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.Session() as db:
+            return db.get(Job, job_id)
+
+    def claim_next(self) -> Optional[Job]:
+        """Atomically move the oldest runnable job to ``running`` and return it."""
+        now = datetime.utcnow()
+        with self.Session() as db:
+            candidates = db.scalars(
+                select(Job.id)
+                .where(Job.status == "queued", Job.run_after <= now)
+                .order_by(Job.created_at)
+                .limit(5)
+            ).all()
+            for job_id in candidates:
+                claimed = db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == "queued")
+                    .values(status="running", started_at=now, claimed_by=self.worker_id(), attempts=Job.attempts + 1)
+                )
+                db.commit()
+                if claimed.rowcount == 1:
+                    return db.get(Job, job_id)
+        return None
+
+    def complete(self, job_id: str, result: Any) -> None:
+        with self.Session() as db:
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(status="succeeded", result=json.dumps(result), error=None, finished_at=datetime.utcnow())
+            )
+            db.commit()
+
+    def fail(self, job_id: str, error: str) -> bool:
+        """
+        Record a failed attempt. Re-queues the job with a linear backoff while
+        attempts remain. Returns True if the job was re-queued.
+        """
+        with self.Session() as db:
+            job = db.get(Job, job_id)
+            if job is None:
+                return False
+            job.error = error
+            if job.attempts < job.max_attempts:
+                job.status = "queued"
+                job.run_after = datetime.utcnow() + timedelta(seconds=self.retry_backoff_s * job.attempts)
+                retry = True
+            else:
+                job.status = "failed"
+                job.finished_at = datetime.utcnow()
+                retry = False
+            db.commit()
+            return retry
+
+    @staticmethod
+    def _owner_alive(claimed_by: Optional[str]) -> bool:
+        host, _, pid = (claimed_by or "").rpartition(":")
+        if host != socket.gethostname() or not pid.isdigit():
+            # Another host: we cannot tell, rely on the lease timeout
+            return True
+        if int(pid) == os.getpid():
+            # Claimed by a previous process that happened to get our pid
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def recover(self, lease_timeout_s: Optional[float] = None) -> int:
+        """
+        Re-queue jobs interrupted by a restart or crash: running jobs whose
+        claiming process is gone, or whose lease has expired. Jobs that have
+        used up their attempts are marked failed instead, so a document that
+        kills the worker process is not claimed again after every restart.
+        Call once at startup, before this process starts claiming jobs.
+        Returns how many were re-queued.
+        """
+        lease = settings.job_lease_timeout_s if lease_timeout_s is None else lease_timeout_s
+        expired_before = datetime.utcnow() - timedelta(seconds=lease)
+        recovered = 0
+        dead = []
+        with self.Session() as db:
+            for job in db.scalars(select(Job).where(Job.status == "running")).all():
+                stale = job.started_at is None or job.started_at < expired_before
+                if not stale and self._owner_alive(job.claimed_by):
+                    continue
+                if job.attempts >= job.max_attempts:
+                    job.status = "failed"
+                    job.error = f"worker died while running the job (attempt {job.attempts} of {job.max_attempts})"
+                    job.finished_at = datetime.utcnow()
+                    dead.append(job)
+                else:
+                    job.status = "queued"
+                    job.run_after = datetime.utcnow()
+                    recovered += 1
+            db.commit()
+        for job in dead:
+            self.discard_file(job)
+        return recovered
+
+    def counts(self) -> dict:
+        with self.Session() as db:
+            rows = db.execute(select(Job.status, func.count()).group_by(Job.status)).all()
+        out = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+        out.update({status: count for status, count in rows})
+        return out
+
+    @staticmethod
+    def discard_file(job: Job) -> None:
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+import json
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
+from backend.app.auth.dependencies import get_current_active_user
+from backend.app.auth.models import User
+from backend.app.core.config import settings
+from backend.app.services.file_utils import mb, save_upload
+from backend.app.services.document_loader import is_supported
+from .dependencies import get_job_queue
+from .models import JobKind
+from .queue import JobQueue
+from .schemas import JobCreated, JobRead
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.post("", response_model=JobCreated, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    request: Request,
+    file: UploadFile = File(...),
+    kind: JobKind = "routed",
+    lang: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    queue: JobQueue = Depends(get_job_queue),
+) -> Any:
+    if not is_supported(file.content_type):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file type")
+    # Kept on disk until the job finishes; the worker removes it
+    path = (await save_upload(file, settings.jobs_dir, max_bytes=mb(settings.jobs_max_upload_mb))).path
+    job = queue.enqueue(path, kind=kind, owner=current_user.email, original_filename=file.filename, lang=lang)
+    workers = getattr(request.app.state, "job_workers", None)
+    if workers is not None:
+        workers.notify()
+    return JobCreated(job_id=job.id, status=job.status)
+
+@router.get("/{job_id}", response_model=JobRead)
+def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    queue: JobQueue = Depends(get_job_queue),
+) -> Any:
+    job = queue.get(job_id)
+    if job is None or (job.owner != current_user.email and current_user.role != "admin"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return JobRead(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        filename=job.original_filename,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=json.loads(job.result) if job.result else None,
+        error=job.error,
+    )
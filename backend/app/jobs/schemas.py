@@ -0,0 +1,21 @@
+from typing import Any, Optional
+from datetime import datetime
+from pydantic import BaseModel
+from .models import JobKind, JobStatus
+
+class JobCreated(BaseModel):
+    job_id: str
+    status: JobStatus
+
+class JobRead(BaseModel):
+    job_id: str
+    kind: JobKind
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    filename: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
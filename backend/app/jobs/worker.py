@@ -0,0 +1,85 @@
+from __future__ import annotations
+import threading
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+from backend.app.core.config import settings
+from .models import Job
+from .queue import JobQueue
+
+JobHandler = Callable[[Job], Any]
+
+
+class JobWorkerPool:
+    """
+    Background threads draining the job queue.
+
+    Each worker claims one job at a time, runs the handler registered for
+    its kind, and records the result or the failure (which re-queues the
+    job while attempts remain). Uploaded files are removed once a job
+    reaches a terminal state.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        concurrency: Optional[int] = None,
+        poll_interval_s: Optional[float] = None,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = max(1, concurrency or settings.job_workers)
+        self.poll_interval_s = settings.job_poll_interval_s if poll_interval_s is None else poll_interval_s
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"Re-queued {recovered} interrupted job(s)")
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def notify(self) -> None:
+        """Wake idle workers early, e.g. right after a job was enqueued."""
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    def run_one(self) -> bool:
+        """Claim and run a single job. Returns False if nothing was runnable."""
+        job = self.queue.claim_next()
+        if job is None:
+            return False
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind '{job.kind}'")
+            result = handler(job)
+        except Exception as e:
+            print(f"Job {job.id} attempt {job.attempts} failed: {e}")
+            traceback.print_exc()
+            if not self.queue.fail(job.id, str(e)):
+                JobQueue.discard_file(job)
+            return True
+        self.queue.complete(job.id, result)
+        JobQueue.discard_file(job)
+        return True
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.run_one():
+                    continue
+            except Exception as e:
+                print(f"Job worker error: {e}")
+            self._wake.wait(self.poll_interval_s)
+            self._wake.clear()
@@ -1,13 +1,47 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from .core.config import settings
 from .api.routes import router
 from .auth.routes import router as auth_router
+from .jobs.routes import router as jobs_router
+from .jobs.queue import JobQueue
+from .jobs.worker import JobWorkerPool
+from .jobs.handlers import default_handlers
 from .auth.dependencies import create_db_and_tables
+from .services.reader_pool import preload_configured_readers
+from .services.tesseract_pool import shutdown_tesseract_pool
+from .services.file_utils import UploadTooLarge
+from .services.document_loader import TooManyPages
+from .ml.unified_ocr import UnifiedOCR, shutdown_ensemble_pool
+from .core.executor import get_inference_executor, shutdown_inference_executor
 import os
 
-app = FastAPI(title="DocVision AI", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the EasyOCR reader pool so the first request does not pay for model load
+    try:
+        preload_configured_readers()
+    except Exception as e:
+        print(f"Warning: EasyOCR reader preload failed: {e}")
+    # One routed OCR engine per process; models inside load lazily on first use
+    app.state.unified_ocr = UnifiedOCR()
+    get_inference_executor()
+    # Background workers draining the persistent job queue
+    app.state.job_queue = JobQueue()
+    app.state.job_workers = JobWorkerPool(app.state.job_queue, default_handlers(app.state.unified_ocr))
+    app.state.job_workers.start()
+    yield
+    app.state.job_workers.stop()
+    shutdown_inference_executor()
+    shutdown_ensemble_pool()
+    shutdown_tesseract_pool()
+
+
+app = FastAPI(title="DocVision AI", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,13 +62,24 @@ async def secure_headers(request: Request, call_next):
         response.headers["X-XSS-Protection"] = "1; mode=block"
     return response
 
+@app.exception_handler(UploadTooLarge)
+async def upload_too_large(request: Request, exc: UploadTooLarge):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+
+@app.exception_handler(TooManyPages)
+async def too_many_pages(request: Request, exc: TooManyPages):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
 os.makedirs(settings.output_dir, exist_ok=True)
 os.makedirs(settings.tmp_dir, exist_ok=True)
 os.makedirs(settings.upload_tmp_dir, exist_ok=True)
+os.makedirs(settings.jobs_dir, exist_ok=True)
 create_db_and_tables()
 
 app.mount("/outputs", StaticFiles(directory=settings.output_dir), name="outputs")
 
 app.include_router(router, prefix="/api")
+app.include_router(jobs_router, prefix="/api")
 app.include_router(auth_router)
 
@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Dynamic micro-batching front-end for a batch inference function.
+
+    Callers submit single items from any thread. A background worker
+    collects them until either ``max_batch_size`` items are waiting or
+    ``max_wait_ms`` has passed since the first item of the batch arrived,
+    then calls ``batch_fn`` once with the whole list. ``batch_fn`` must
+    return one result per input, in order.
+
+    Futures cancelled before their batch runs are dropped from it.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], Sequence[R]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        name: str = "batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.name = name
+        self._queue: "queue.Queue[Optional[Tuple[T, Future]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                    self._worker.start()
+
+    def submit(self, item: T) -> "Future[R]":
+        if self._closed:
+            raise RuntimeError(f"{self.name} is closed")
+        self._ensure_worker()
+        fut: "Future[R]" = Future()
+        self._queue.put((item, fut))
+        return fut
+
+    def __call__(self, item: T) -> R:
+        return self.submit(item).result()
+
+    def _collect(self, first: Tuple[T, Future]) -> List[Tuple[T, Future]]:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is None:
+                # Close requested: run what we have, then stop
+                self._queue.put(None)
+                break
+            batch.append(nxt)
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [(item, fut) for item, fut in self._collect(first) if fut.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.batch_fn([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(batch)} items")
+                for (_, fut), res in zip(batch, results):
+                    fut.set_result(res)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._max_seen = max(self._max_seen, len(batch))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+                "largest_batch": self._max_seen,
+                "pending": self._queue.qsize(),
+            }
+
+    def close(self) -> None:
+        self._closed = True
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join(timeout=5)
@@ -0,0 +1,92 @@
+import threading
+from typing import Any, Dict, Optional
+
+from backend.app.core.config import settings
+from backend.app.core.telemetry import LatencyStats
+
+ENSEMBLE_MODES = ("sequential", "parallel")
+
+
+class EngineCancelled(Exception):
+    """Raised by an engine run whose result is no longer wanted."""
+
+
+class EnsembleStats:
+    """
+    Per document type: how often the primary engine falls short of the
+    confidence threshold (i.e. the ensemble triggers), and what requests
+    cost in each ensemble mode.
+
+    In "auto" mode, document types that trigger the ensemble at least
+    ``parallel_min_rate`` of the time (over at least ``min_history``
+    requests) run both engines in parallel; everything else stays
+    sequential, where the secondary engine only runs when needed.
+    """
+
+    def __init__(self, min_history: Optional[int] = None, parallel_min_rate: Optional[float] = None):
+        self.min_history = settings.ensemble_min_history if min_history is None else min_history
+        self.parallel_min_rate = settings.ensemble_parallel_min_rate if parallel_min_rate is None else parallel_min_rate
+        self._lock = threading.Lock()
+        self._history: Dict[str, Dict[str, int]] = {}
+        self._costs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def record_trigger(self, doc_type: str, triggered: bool) -> None:
+        with self._lock:
+            h = self._history.setdefault(doc_type, {"requests": 0, "triggered": 0})
+            h["requests"] += 1
+            h["triggered"] += int(triggered)
+
+    def trigger_rate(self, doc_type: str) -> Optional[float]:
+        with self._lock:
+            h = self._history.get(doc_type)
+            if not h or h["requests"] < self.min_history:
+                return None
+            return h["triggered"] / h["requests"]
+
+    def choose_mode(self, doc_type: str, requested: Optional[str] = None) -> str:
+        mode = requested or settings.ensemble_mode
+        if mode in ENSEMBLE_MODES:
+            return mode
+        rate = self.trigger_rate(doc_type)
+        return "parallel" if rate is not None and rate >= self.parallel_min_rate else "sequential"
+
+    def _cost(self, doc_type: str, mode: str) -> Dict[str, Any]:
+        # Caller holds the lock
+        by_mode = self._costs.setdefault(doc_type, {})
+        if mode not in by_mode:
+            by_mode[mode] = {
+                "latency": LatencyStats(cold_start=False),
+                "cpu": LatencyStats(cold_start=False),
+                "abandoned_cpu_ms": 0.0,
+            }
+        return by_mode[mode]
+
+    def record_run(self, doc_type: str, mode: str, wall_ms: float, cpu_ms: float) -> None:
+        with self._lock:
+            cost = self._cost(doc_type, mode)
+        cost["latency"].record(wall_ms)
+        cost["cpu"].record(cpu_ms)
+
+    def record_abandoned(self, doc_type: str, mode: str, cpu_ms: float) -> None:
+        """CPU spent by a cancelled engine that was already running when it lost."""
+        with self._lock:
+            self._cost(doc_type, mode)["abandoned_cpu_ms"] += cpu_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {}
+            for doc_type in set(self._history) | set(self._costs):
+                h = self._history.get(doc_type, {"requests": 0, "triggered": 0})
+                out[doc_type] = {
+                    **h,
+                    "trigger_rate": round(h["triggered"] / h["requests"], 4) if h["requests"] else None,
+                    "modes": {
+                        mode: {
+                            "latency": c["latency"].snapshot(),
+                            "cpu_ms": c["cpu"].snapshot(),
+                            "abandoned_cpu_ms": round(c["abandoned_cpu_ms"], 2),
+                        }
+                        for mode, c in self._costs.get(doc_type, {}).items()
+                    },
+                }
+            return out
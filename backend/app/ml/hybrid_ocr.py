@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from backend.app.core.config import settings
+from backend.app.ml.transformer.inference_trocr import get_trocr_model
+from backend.app.services.image_io import ImageSource
+from backend.app.services.ocr_pipeline import _read_image
+from backend.app.services.reader_pool import EasyOCRReaderPool, get_reader_pool
+
+# (x_min, x_max, y_min, y_max) in EasyOCR's horizontal_list convention
+Box = Tuple[int, int, int, int]
+
+
+class HybridOCR:
+    """
+    Hybrid OCR engine: EasyOCR (CRAFT) for text-line detection only,
+    TrOCR for recognition.
+
+    TrOCR is a line-level model, so instead of feeding it the whole page we
+    crop every detected line and recognise all crops in batched generate()
+    calls, then put the lines back together in reading order.
+    """
+
+    def __init__(
+        self,
+        lang: Optional[str] = None,
+        reader_pool: Optional[EasyOCRReaderPool] = None,
+        trocr_getter: Callable[[], Any] = get_trocr_model,
+        margin: int = 4,
+    ):
+        self.lang = lang or settings.default_lang
+        self.reader_pool = reader_pool
+        self.trocr_getter = trocr_getter
+        self.margin = margin
+
+    def detect_lines(self, img: np.ndarray) -> List[Box]:
+        pool = self.reader_pool or get_reader_pool()
+        with pool.checkout([self.lang]) as reader:
+            horizontal_list, free_list = reader.detect(img)
+        boxes: List[Box] = [(int(x0), int(x1), int(y0), int(y1)) for x0, x1, y0, y1 in horizontal_list[0]]
+        # Rotated boxes: fall back to their axis-aligned bounding rectangle
+        for quad in free_list[0]:
+            pts = np.array(quad, dtype=np.float32)
+            boxes.append((int(pts[:, 0].min()), int(pts[:, 0].max()), int(pts[:, 1].min()), int(pts[:, 1].max())))
+        return boxes
+
+    def crop_lines(self, img: np.ndarray, boxes: List[Box]) -> List[Image.Image]:
+        h, w = img.shape[:2]
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB) if img.ndim == 3 else cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+        crops = []
+        for x_min, x_max, y_min, y_max in boxes:
+            x0, x1 = max(0, x_min - self.margin), min(w, x_max + self.margin)
+            y0, y1 = max(0, y_min - self.margin), min(h, y_max + self.margin)
+            crops.append(Image.fromarray(rgb[y0:y1, x0:x1]))
+        return crops
+
+    @staticmethod
+    def reading_order(boxes: List[Box]) -> List[List[int]]:
+        """
+        Group box indices into text lines (top to bottom) and order each
+        line left to right. Boxes whose vertical centres are within half a
+        median box height of the current line join that line.
+        """
+        if not boxes:
+            return []
+        heights = [max(1, b[3] - b[2]) for b in boxes]
+        tol = 0.5 * float(np.median(heights))
+        order = sorted(range(len(boxes)), key=lambda i: (boxes[i][2] + boxes[i][3]) / 2.0)
+        lines: List[List[int]] = []
+        line_center = None
+        for i in order:
+            center = (boxes[i][2] + boxes[i][3]) / 2.0
+            if line_center is None or center - line_center > tol:
+                lines.append([i])
+                line_center = center
+            else:
+                lines[-1].append(i)
+                line_center = sum((boxes[j][2] + boxes[j][3]) / 2.0 for j in lines[-1]) / len(lines[-1])
+        return [sorted(line, key=lambda i: boxes[i][0]) for line in lines]
+
+    def process(self, image: ImageSource, cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        ``cancel`` is checked between stages, so a losing ensemble run stops
+        before the expensive TrOCR batch.
+        """
+        timings: Dict[str, float] = {}
+
+        t = time.perf_counter()
+        img = _read_image(image)
+        timings["decode_ms"] = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        boxes = self.detect_lines(img)
+        timings["detect_ms"] = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        crops = self.crop_lines(img, boxes)
+        timings["crop_ms"] = (time.perf_counter() - t) * 1000
+
+        if cancel is not None and cancel.is_set():
+            return {"text": "", "confidence": 0.0, "lines": [], "line_count": len(boxes), "error": "cancelled",
+                    "stage_timings_ms": {k: round(v, 2) for k, v in timings.items()}}
+
+        t = time.perf_counter()
+        recognised = self.trocr_getter().predict_batch(crops) if crops else []
+        timings["recognize_ms"] = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        errors = [r["error"] for r in recognised if "error" in r]
+        lines_out = []
+        text_lines = []
+        weighted, total_len = 0.0, 0
+        for line in self.reading_order(boxes):
+            parts = []
+            for i in line:
+                res = recognised[i]
+                if "error" in res or not res.get("text", "").strip():
+                    continue
+                txt = res["text"].strip()
+                parts.append(txt)
+                weighted += res["confidence"] * len(txt)
+                total_len += len(txt)
+                x_min, x_max, y_min, y_max = boxes[i]
+                lines_out.append({
+                    "text": txt,
+                    "confidence": res["confidence"],
+                    "bbox": [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]],
+                })
+            if parts:
+                text_lines.append(" ".join(parts))
+        timings["assemble_ms"] = (time.perf_counter() - t) * 1000
+
+        result = {
+            "text": "\n".join(text_lines),
+            "confidence": weighted / total_len if total_len else 0.0,
+            "lines": lines_out,
+            "line_count": len(boxes),
+            "stage_timings_ms": {k: round(v, 2) for k, v in timings.items()},
+        }
+        if errors and len(errors) == len(recognised):
+            result["error"] = errors[0]
+        return result
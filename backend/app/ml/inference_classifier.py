@@ -1,11 +1,20 @@
+import threading
 import torch
 import json
 import os
 from PIL import Image
-from typing import Dict, Union, Tuple, Optional
+from typing import Any, Dict, List, Union, Tuple, Optional
 
+from backend.app.core.config import settings
+from backend.app.ml.batching import MicroBatcher
 from backend.app.ml.models.cnn_classifier import DocumentClassifier
+from backend.app.ml.model_loader import LazyModel
 from backend.app.ml.utils import preprocess_image
+from backend.app.services.image_io import Document, ImageSource, to_pil
+
+# Longest side of the Document view fed to the classifier's 224x224 resize
+THUMBNAIL_SIDE = 512
+
 
 class ClassifierInference:
     def __init__(self, model_path: str, classes_path: str):
@@ -22,57 +31,106 @@ class ClassifierInference:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found: {model_path}")
             
-        self.model = DocumentClassifier(num_classes=len(self.classes)).to(self.device)
+        # Weights come from the checkpoint, so skip fetching ImageNet weights
+        self.model = DocumentClassifier(num_classes=len(self.classes), pretrained=False).to(self.device)
         self.model.load_state_dict(torch.load(model_path, map_location=self.device))
         self.model.eval()
         
-    def predict(self, image: Union[str, Image.Image]) -> Dict[str, Union[str, float]]:
+        # Concurrent predict() calls are coalesced into one forward pass.
+        # A batch size of 1 disables batching.
+        self.batcher: Optional[MicroBatcher] = None
+        if settings.classifier_batch_size > 1:
+            self.batcher = MicroBatcher(
+                self._forward_batch,
+                max_batch_size=settings.classifier_batch_size,
+                max_wait_ms=settings.classifier_batch_wait_ms,
+                name="classifier-batcher",
+            )
+        
+    def _load(self, image: ImageSource) -> Image.Image:
+        try:
+            if isinstance(image, Document):
+                # The model sees 224x224; a shared thumbnail avoids converting the full page
+                return image.thumbnail(THUMBNAIL_SIDE)
+            return to_pil(image)
+        except (TypeError, ValueError, OSError) as e:
+            raise ValueError(f"Could not load image: {e}")
+
+    def _forward_batch(self, tensors: List[torch.Tensor]) -> List[Dict[str, Union[str, float]]]:
         """
-        Predict document type from image path or PIL Image.
+        Run one forward pass over preprocessed (1, C, H, W) tensors.
         """
-        if isinstance(image, str):
-            try:
-                img = Image.open(image).convert('RGB')
-            except Exception as e:
-                raise ValueError(f"Could not load image from {image}: {e}")
-        elif isinstance(image, Image.Image):
-            img = image.convert('RGB')
-        else:
-            raise ValueError("Image must be a path string or PIL Image")
-            
-        # Preprocess
-        input_tensor = preprocess_image(img).to(self.device)
+        batch = torch.cat(tensors, dim=0).to(self.device)
         
         # Inference
         with torch.no_grad():
-            outputs = self.model(input_tensor)
+            outputs = self.model(batch)
             probabilities = torch.nn.functional.softmax(outputs, dim=1)
             confidence, predicted_idx = torch.max(probabilities, 1)
             
-        predicted_class = self.classes[predicted_idx.item()]
-        conf_score = confidence.item()
+        return [
+            {
+                "document_type": self.classes[idx],
+                "confidence": float(conf)
+            }
+            for idx, conf in zip(predicted_idx.tolist(), confidence.tolist())
+        ]
+
+    def predict_batch(self, images: List[ImageSource]) -> List[Dict[str, Union[str, float]]]:
+        """
+        Predict document types for several images in a single forward pass.
+        """
+        if not images:
+            return []
+        return self._forward_batch([preprocess_image(self._load(img)) for img in images])
+
+    def predict(self, image: ImageSource) -> Dict[str, Union[str, float]]:
+        """
+        Predict document type from a path, encoded bytes, array or PIL Image.
+        Decoding and resizing happen in the calling thread; the forward pass
+        is shared with other concurrent callers when batching is enabled.
+        """
+        input_tensor = preprocess_image(self._load(image))
+        if self.batcher is None:
+            return self._forward_batch([input_tensor])[0]
+        return self.batcher.submit(input_tensor).result()
+
+DEFAULT_MODEL_DIR = "backend/app/ml/artifacts"
+
+# Global model slots for reuse, one per artifacts directory
+_classifier_slots: Dict[str, LazyModel] = {}
+_classifier_slots_lock = threading.Lock()
+
+def _load_classifier(model_dir: str) -> Optional[ClassifierInference]:
+    model_path = os.path.join(model_dir, "best_model.pth")
+    classes_path = os.path.join(model_dir, "classes.json")
+    
+    # Check if model exists, if not, we might be in a state where no model is trained yet
+    # In that case, we can't initialize inference.
+    if not os.path.exists(model_path):
+        return None
         
-        return {
-            "document_type": predicted_class,
-            "confidence": float(conf_score)
-        }
+    return ClassifierInference(model_path, classes_path)
 
-# Global instance for reuse
-_classifier: Optional[ClassifierInference] = None
+def get_classifier_slot(model_dir: str = DEFAULT_MODEL_DIR) -> LazyModel:
+    with _classifier_slots_lock:
+        slot = _classifier_slots.get(model_dir)
+        if slot is None:
+            slot = LazyModel("classifier", lambda: _load_classifier(model_dir))
+            _classifier_slots[model_dir] = slot
+    return slot
 
 def get_classifier(
-    model_dir: str = "backend/app/ml/artifacts"
+    model_dir: str = DEFAULT_MODEL_DIR
 ) -> Optional[ClassifierInference]:
-    global _classifier
-    if _classifier is None:
-        model_path = os.path.join(model_dir, "best_model.pth")
-        classes_path = os.path.join(model_dir, "classes.json")
-        
-        # Check if model exists, if not, we might be in a state where no model is trained yet
-        # In that case, we can't initialize inference.
-        if not os.path.exists(model_path):
-            return None
-            
-        _classifier = ClassifierInference(model_path, classes_path)
-        
-    return _classifier
+    return get_classifier_slot(model_dir).get()
+
+def classifier_status() -> Dict[str, Any]:
+    with _classifier_slots_lock:
+        status = {}
+        for model_dir, slot in _classifier_slots.items():
+            status[model_dir] = slot.status()
+            model = slot.loaded_model
+            if model is not None and model.batcher is not None:
+                status[model_dir]["batching"] = model.batcher.stats()
+        return status
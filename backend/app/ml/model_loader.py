@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class LazyModel(Generic[T]):
+    """
+    Lazily loaded, process-wide model slot.
+
+    The first caller loads the model while holding the slot lock; concurrent
+    callers block on the same lock instead of loading a second copy. Other
+    code can check ``state`` without blocking to see whether the model is
+    still loading, ready, or failed.
+
+    A factory may return None to signal that the model is unavailable (for
+    example, no trained weights on disk yet). That result is not cached, so
+    a later call retries. Wrappers that swallow their own load errors can
+    pass ``check``, which returns an error string for an unusable instance;
+    the instance is still returned but the slot reports ``failed``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Optional[T]],
+        check: Optional[Callable[[T], Optional[str]]] = None,
+    ):
+        self.name = name
+        self._factory = factory
+        self._check = check
+        self._lock = threading.Lock()
+        self._model: Optional[T] = None
+        self.state = NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_time_ms: Optional[float] = None
+
+    def get(self) -> Optional[T]:
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is not None:
+                return self._model
+            if self.state == FAILED:
+                raise RuntimeError(f"{self.name} failed to load: {self.error}")
+            self.state = LOADING
+            start = time.perf_counter()
+            try:
+                model = self._factory()
+            except Exception as e:
+                self.state = FAILED
+                self.error = str(e)
+                raise
+            if model is None:
+                self.state = NOT_LOADED
+                return None
+            self.load_time_ms = (time.perf_counter() - start) * 1000
+            error = self._check(model) if self._check else None
+            if error:
+                self.state = FAILED
+                self.error = error
+            else:
+                self.state = READY
+            self._model = model
+            return model
+
+    @property
+    def loaded_model(self) -> Optional[T]:
+        """The loaded model, or None, without triggering a load."""
+        return self._model
+
+    def reset(self) -> None:
+        with self._lock:
+            self._model = None
+            self.state = NOT_LOADED
+            self.error = None
+            self.load_time_ms = None
+
+    def status(self) -> Dict[str, Any]:
+        return {"state": self.state, "error": self.error, "load_time_ms": self.load_time_ms}
@@ -0,0 +1,71 @@
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class EngineCostModel:
+    """
+    Online per-engine latency estimates.
+
+    Observed engine run times are kept as exponentially weighted moving
+    averages keyed by (engine, document type, image size bucket). Estimates
+    fall back from the most specific key to (engine, size bucket), then to
+    the engine alone, then to a static prior, so a cold model still gives
+    an answer and sharpens as traffic comes in.
+    """
+
+    # Rough single-core CPU figures; replaced by observations after the first runs
+    PRIORS_MS = {"trocr": 1500.0, "easyocr": 2500.0, "hybrid": 4000.0}
+    DEFAULT_PRIOR_MS = 3000.0
+    # Size buckets double in pixel count from 0.25 MP
+    BASE_PIXELS = 1 << 18
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._ewma: Dict[Tuple, Dict[str, float]] = {}
+
+    @classmethod
+    def size_bucket(cls, pixels: int) -> int:
+        return max(0, math.floor(math.log2(max(pixels, 1) / cls.BASE_PIXELS)) + 1)
+
+    def _keys(self, engine: str, doc_type: Optional[str], pixels: Optional[int]) -> List[Tuple[Tuple[Any, ...], str]]:
+        bucket = self.size_bucket(pixels) if pixels else None
+        keys = [
+            ((engine, doc_type, bucket), "doc_type+size"),
+            ((engine, None, bucket), "size"),
+            ((engine, None, None), "engine"),
+        ]
+        # Without a size the first two levels collapse into the engine-wide key
+        unique: List[Tuple[Tuple[Any, ...], str]] = []
+        for key, source in keys:
+            if all(key != k for k, _ in unique):
+                unique.append((key, source))
+        return unique
+
+    def observe(self, engine: str, doc_type: Optional[str], pixels: Optional[int], elapsed_ms: float) -> None:
+        with self._lock:
+            for key, _ in self._keys(engine, doc_type, pixels):
+                entry = self._ewma.get(key)
+                if entry is None:
+                    self._ewma[key] = {"ms": float(elapsed_ms), "n": 1}
+                else:
+                    entry["ms"] += self.alpha * (elapsed_ms - entry["ms"])
+                    entry["n"] += 1
+
+    def estimate(self, engine: str, doc_type: Optional[str] = None, pixels: Optional[int] = None) -> Tuple[float, str]:
+        """(estimated ms, which level of the fallback chain answered)."""
+        with self._lock:
+            for key, source in self._keys(engine, doc_type, pixels):
+                entry = self._ewma.get(key)
+                if entry is not None:
+                    return entry["ms"], source
+        return self.PRIORS_MS.get(engine, self.DEFAULT_PRIOR_MS), "prior"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {}
+            for (engine, doc_type, bucket), entry in self._ewma.items():
+                label = "/".join(str(p) for p in (doc_type or "*", f"size{bucket}" if bucket is not None else "*"))
+                out.setdefault(engine, {})[label] = {"ewma_ms": round(entry["ms"], 2), "samples": int(entry["n"])}
+            return out
@@ -1,6 +1,10 @@
 import os
-from typing import Dict, Any, Tuple
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from backend.app.core.config import settings
 from backend.app.ml.inference_classifier import get_classifier
+from backend.app.ml.routing.cost_model import EngineCostModel
+from backend.app.services.image_io import Document, ImageSource
 
 class OCRRouter:
     """
@@ -11,42 +15,101 @@ class OCRRouter:
     
     # Routing Rules
     # document_type -> (ocr_engine, preprocessing_level)
+    # (preprocessing_level is the profile used whenever the EasyOCR pipeline
+    # runs on the document, as primary or as ensemble fallback)
     ROUTING_TABLE = {
-        "invoice": "trocr",
-        "receipt": "trocr",
-        "note": "easyocr", 
-        "form": "hybrid",   # EasyOCR + cleanup
+        "invoice": ("trocr", "balanced"),
+        "receipt": ("trocr", "balanced"),
+        "note": ("easyocr", "quality"),
+        "form": ("hybrid", "balanced"),   # EasyOCR line detection + batched TrOCR recognition
+    }
+    
+    # Engines to try, in order of preference, when the routed one does not fit the budget
+    ENGINE_PREFERENCE = {
+        "trocr": ["trocr", "easyocr", "hybrid"],
+        "easyocr": ["easyocr", "trocr", "hybrid"],
+        "hybrid": ["hybrid", "easyocr", "trocr"],
     }
     
     def __init__(self, model_dir: str = None):
         # The inference_classifier module manages the singleton, 
         # but we can pass explicit paths if needed for testing.
-        if model_dir:
-            self.classifier = get_classifier(model_dir=model_dir)
-        else:
-            self.classifier = get_classifier()
+        self.model_dir = model_dir
+        self.costs = EngineCostModel()
+
+    @property
+    def classifier(self):
+        # Resolved on use so a long-lived router picks up the model once it
+        # has finished loading (or has been trained) without being rebuilt.
+        if self.model_dir:
+            return get_classifier(model_dir=self.model_dir)
+        return get_classifier()
         
-    def route(self, image_path: str) -> Dict[str, Any]:
+    @staticmethod
+    def pixel_count(image: ImageSource) -> Optional[int]:
+        try:
+            h, w = Document.of(image).bgr.shape[:2]
+        except Exception:
+            return None
+        return h * w
+
+    def estimate(self, engine: str, doc_type: Optional[str], pixels: Optional[int]) -> float:
+        return self.costs.estimate(engine, doc_type, pixels)[0]
+
+    def fit_budget(self, engine: str, doc_type: str, pixels: Optional[int], remaining_ms: float) -> Tuple[str, Dict[str, float]]:
         """
-        Determine the best OCR strategy for the given image.
+        Most preferred engine whose estimated cost fits ``remaining_ms``;
+        the cheapest one if none does. Returns (engine, estimates).
+        """
+        candidates: List[str] = self.ENGINE_PREFERENCE.get(engine, [engine])
+        estimates = {name: round(self.estimate(name, doc_type, pixels), 2) for name in candidates}
+        for name in candidates:
+            if estimates[name] <= remaining_ms:
+                return name, estimates
+        return min(candidates, key=lambda name: estimates[name]), estimates
+
+    @classmethod
+    def preprocessing_level(cls, doc_type: str) -> str:
+        """Preprocessing profile for a document type: settings override, routing table, then the default."""
+        override = settings.preprocessing_profile_by_doc_type.get(doc_type)
+        if override:
+            return override
+        entry = cls.ROUTING_TABLE.get(doc_type)
+        return entry[1] if entry else settings.preprocessing_profile
+
+    def route(self, image: ImageSource, budget_ms: Optional[float] = None, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Determine the best OCR strategy for the given image
+        (path, encoded bytes, array or PIL image).
+
+        With a ``budget_ms`` the routed engine is replaced by the most
+        preferred one whose estimated cost fits what is left of the budget
+        after classification. ``deadline`` (perf_counter seconds) is when
+        the caller's budget runs out; by default the budget starts here.
         
         Returns:
             dict: {
                 "document_type": str,
                 "confidence": float,
                 "ocr_engine": str,
-                "reasoning": str
+                "preprocessing_level": str,
+                "reasoning": str,
+                # only with a budget:
+                "budget_ms", "remaining_ms", "estimated_ms", "engine_estimates_ms"
             }
         """
-        if not os.path.exists(image_path):
+        start = time.perf_counter()
+        path = image.source if isinstance(image, Document) else image
+        if isinstance(path, str) and not os.path.exists(path):
             return {
                 "error": "Image not found",
-                "ocr_engine": "easyocr" # Fallback
+                "ocr_engine": "easyocr", # Fallback
+                "preprocessing_level": settings.preprocessing_profile,
             }
             
         # 1. Classify Document
         try:
-            classification = self.classifier.predict(image_path)
+            classification = self.classifier.predict(image)
             doc_type = classification.get("document_type", "unknown")
             confidence = classification.get("confidence", 0.0)
         except Exception as e:
@@ -58,14 +121,34 @@ class OCRRouter:
         # Default to easyocr if unknown or low confidence
         if confidence < 0.5:
              engine = "easyocr"
+             level = settings.preprocessing_profile
              reasoning = f"Low confidence ({confidence:.2f}) classification. Fallback to robust baseline."
         else:
-            engine = self.ROUTING_TABLE.get(doc_type, "easyocr")
+            engine = self.ROUTING_TABLE.get(doc_type, ("easyocr",))[0]
+            level = self.preprocessing_level(doc_type)
             reasoning = f"Classified as {doc_type} with {confidence:.2f} confidence."
             
-        return {
+        result = {
             "document_type": doc_type,
             "confidence": confidence,
             "ocr_engine": engine,
+            "preprocessing_level": level,
             "reasoning": reasoning
         }
+        
+        # 3. Fit the latency budget
+        if budget_ms is not None:
+            if deadline is None:
+                deadline = start + budget_ms / 1000
+            remaining = (deadline - time.perf_counter()) * 1000
+            chosen, estimates = self.fit_budget(engine, doc_type, self.pixel_count(image), remaining)
+            if chosen != engine:
+                result["reasoning"] += f" {engine} (~{estimates[engine]:.0f} ms) does not fit {remaining:.0f} ms left, using {chosen}."
+            result.update(
+                ocr_engine=chosen,
+                budget_ms=budget_ms,
+                remaining_ms=round(remaining, 2),
+                estimated_ms=estimates[chosen],
+                engine_estimates_ms=estimates,
+            )
+        return result
@@ -6,11 +6,12 @@ from tqdm import tqdm
 from PIL import Image
 from transformers import TrOCRProcessor, VisionEncoderDecoderModel
 from backend.app.ml.metrics import compute_cer, compute_wer
-from backend.app.ml.ocr_pipeline import OCRPipeline
+from backend.app.services.ocr_pipeline import OCRPipeline
 
-def evaluate_trocr_model(model_path: str, images_dir: str, labels_path: str):
+def evaluate_trocr_model(model_path: str, images_dir: str, labels_path: str, batch_size: int = 8):
     """
     Evaluate a trained TrOCR model.
+    Images are decoded ``batch_size`` at a time in a single generate() call.
     """
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"Loading TrOCR model from {model_path}...")
@@ -45,19 +46,23 @@ def evaluate_trocr_model(model_path: str, images_dir: str, labels_path: str):
     count = 0
 
     print("Running TrOCR evaluation...")
-    for filename in tqdm(files):
-        image_path = os.path.join(images_dir, filename)
-        if not os.path.exists(image_path):
-            continue
-            
-        ground_truth = str(labels_map[filename])
+    existing = [f for f in files if os.path.exists(os.path.join(images_dir, f))]
+    for i in tqdm(range(0, len(existing), batch_size)):
+        chunk = existing[i:i + batch_size]
         
         try:
-            image = Image.open(image_path).convert("RGB")
-            pixel_values = processor(image, return_tensors="pt").pixel_values.to(device)
+            images = [Image.open(os.path.join(images_dir, f)).convert("RGB") for f in chunk]
+            pixel_values = processor(images=images, return_tensors="pt").pixel_values.to(device)
             
-            generated_ids = model.generate(pixel_values)
-            generated_text = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
+            with torch.no_grad():
+                generated_ids = model.generate(pixel_values)
+            generated_texts = processor.batch_decode(generated_ids, skip_special_tokens=True)
+        except Exception as e:
+            print(f"Error processing batch starting at {chunk[0]}: {e}")
+            continue
+            
+        for filename, generated_text in zip(chunk, generated_texts):
+            ground_truth = str(labels_map[filename])
             
             cer = compute_cer(ground_truth, generated_text)
             wer = compute_wer(ground_truth, generated_text)
@@ -73,9 +78,6 @@ def evaluate_trocr_model(model_path: str, images_dir: str, labels_path: str):
                 "cer": cer,
                 "wer": wer
             })
-            
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
 
     avg_cer = total_cer / count if count > 0 else 0
     avg_wer = total_wer / count if count > 0 else 0
@@ -85,7 +87,7 @@ def evaluate_trocr_model(model_path: str, images_dir: str, labels_path: str):
         "details": results
     }
 
-def compare_models(trocr_model_path: str, eval_dir: str):
+def compare_models(trocr_model_path: str, eval_dir: str, batch_size: int = 8):
     """
     Compare TrOCR, EasyOCR, and Tesseract.
     """
@@ -100,7 +102,7 @@ def compare_models(trocr_model_path: str, eval_dir: str):
         labels_path = labels_json
         
     print("Evaluating TrOCR...")
-    trocr_results = evaluate_trocr_model(trocr_model_path, images_dir, labels_path)
+    trocr_results = evaluate_trocr_model(trocr_model_path, images_dir, labels_path, batch_size=batch_size)
     
     print("Evaluating Baseline (EasyOCR/Tesseract)...")
     # Initialize pipeline with defaults
@@ -1,14 +1,23 @@
+import threading
 import torch
 from PIL import Image
 import os
+from typing import Any, Dict, List, Optional
 from transformers import TrOCRProcessor, VisionEncoderDecoderModel
+from backend.app.core.config import settings
+from backend.app.ml.batching import MicroBatcher
 from backend.app.ml.metrics import compute_cer, compute_wer
+from backend.app.ml.model_loader import LazyModel
+from backend.app.services.image_io import ImageSource, to_pil
 
-# Global instance for caching
-_trocr_instance = None
+DEFAULT_TROCR_MODEL = "microsoft/trocr-small-stage1"
+
+# Global model slots for caching, one per model path
+_trocr_slots: Dict[str, "LazyModel[TrOCRInference]"] = {}
+_trocr_slots_lock = threading.Lock()
 
 class TrOCRInference:
-    def __init__(self, model_path: str = "microsoft/trocr-small-stage1"):
+    def __init__(self, model_path: str = DEFAULT_TROCR_MODEL):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"Loading TrOCR model from {model_path} on {self.device}...")
         
@@ -19,6 +28,13 @@ class TrOCRInference:
             self.model.eval()
             print("TrOCR model loaded successfully.")
             self.loaded = True
+            # Concurrent recognize() calls share generate() batches
+            self.batcher = MicroBatcher(
+                self._generate_batch,
+                max_batch_size=settings.trocr_batch_size,
+                max_wait_ms=settings.trocr_batch_wait_ms,
+                name="trocr-batcher",
+            )
         except Exception as e:
             print(f"Error loading TrOCR model: {e}")
             self.loaded = False
@@ -26,62 +42,141 @@ class TrOCRInference:
             # Do not raise exception, allow fallback
             # raise e
 
-    def predict(self, image_path: str, ground_truth: str = None) -> dict:
+    @staticmethod
+    def _to_image(image: ImageSource) -> Image.Image:
+        return to_pil(image)
+
+    def _generate_batch(self, images: List[Image.Image]) -> List[Dict[str, Any]]:
         """
-        Run inference on a single image.
+        Run a single generate() over a batch of RGB images.
+        The processor resizes every image to the encoder input size, so the
+        batch stacks into one pixel_values tensor without extra padding.
+        """
+        pixel_values = self.processor(images=images, return_tensors="pt").pixel_values.to(self.device)
+
+        with torch.no_grad():
+            outputs = self.model.generate(
+                pixel_values,
+                return_dict_in_generate=True,
+                output_scores=True
+            )
+            sequences = outputs.sequences
+            texts = self.processor.batch_decode(sequences, skip_special_tokens=True)
+            
+            # Compute confidence score
+            # Average probability of the generated tokens of each item,
+            # ignoring the padding that follows shorter sequences
+            token_scores = self.model.compute_transition_scores(
+                sequences, outputs.scores, getattr(outputs, "beam_indices", None), normalize_logits=True
+            )
+            generated = sequences[:, -token_scores.shape[1]:]
+            pad_id = self.model.generation_config.pad_token_id
+            mask = (generated != pad_id) if pad_id is not None else torch.ones_like(generated, dtype=torch.bool)
+            probs = token_scores.exp() * mask
+            confidences = (probs.sum(dim=1) / mask.sum(dim=1).clamp(min=1)).tolist()
+
+        return [{"text": t, "confidence": float(c)} for t, c in zip(texts, confidences)]
+
+    def predict_batch(self, images: List[ImageSource], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Run inference on many images or line crops, ``batch_size`` per generate() call.
+        Returns one {"text", "confidence"} (or {"error"}) dict per input, in order.
         """
         if not hasattr(self, 'loaded') or not self.loaded:
-            return {"error": f"TrOCR model not loaded: {getattr(self, 'load_error', 'Unknown error')}"}
+            return [{"error": f"TrOCR model not loaded: {getattr(self, 'load_error', 'Unknown error')}"} for _ in images]
 
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Image not found at {image_path}")
+        batch_size = batch_size or settings.trocr_batch_size
+        results: List[Dict[str, Any]] = []
+        for i in range(0, len(images), batch_size):
+            chunk = images[i:i + batch_size]
+            try:
+                results.extend(self._generate_batch([self._to_image(img) for img in chunk]))
+            except Exception as e:
+                results.extend({"error": str(e)} for _ in chunk)
+        return results
 
+    def recognize(self, image: ImageSource, cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Recognise one image, coalescing with concurrent callers into shared batches.
+        Setting ``cancel`` withdraws the image from its batch if generate() has
+        not started on it yet.
+        """
+        if not hasattr(self, 'loaded') or not self.loaded:
+            return {"error": f"TrOCR model not loaded: {getattr(self, 'load_error', 'Unknown error')}"}
         try:
-            image = Image.open(image_path).convert("RGB")
-            pixel_values = self.processor(image, return_tensors="pt").pixel_values.to(self.device)
-
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    pixel_values,
-                    return_dict_in_generate=True,
-                    output_scores=True
-                )
-                generated_ids = outputs.sequences
-                generated_text = self.processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-                
-                # Compute confidence score
-                # Taking the average probability of the generated tokens
-                probs = torch.stack(outputs.scores, dim=1).softmax(-1)
-                # Get max probability for each token
-                max_probs, _ = torch.max(probs, dim=-1)
-                # Average probability across sequence
-                confidence = max_probs[0].mean().item()
-
-            result = {
-                "text": generated_text,
-                "confidence": confidence,
-                "cer": None,
-                "wer": None
-            }
-
-            if ground_truth:
-                result["cer"] = compute_cer(ground_truth, generated_text)
-                result["wer"] = compute_wer(ground_truth, generated_text)
-
-            return result
-            
+            fut = self.batcher.submit(self._to_image(image))
+            if cancel is not None:
+                while not fut.done():
+                    if cancel.wait(0.005):
+                        fut.cancel()
+                        return {"error": "cancelled"}
+            return fut.result()
         except Exception as e:
             return {"error": str(e)}
 
-def get_trocr_model(model_path: str = None) -> TrOCRInference:
+    def predict(self, image: ImageSource, ground_truth: Optional[str] = None) -> dict:
+        """
+        Run inference on a single image.
+        """
+        if not hasattr(self, 'loaded') or not self.loaded:
+            return {"error": f"TrOCR model not loaded: {getattr(self, 'load_error', 'Unknown error')}"}
+
+        if isinstance(image, str) and not os.path.exists(image):
+            raise FileNotFoundError(f"Image not found at {image}")
+
+        res = self.predict_batch([image])[0]
+        if "error" in res:
+            return res
+
+        result = {
+            "text": res["text"],
+            "confidence": res["confidence"],
+            "cer": None,
+            "wer": None
+        }
+
+        if ground_truth:
+            result["cer"] = compute_cer(ground_truth, res["text"])
+            result["wer"] = compute_wer(ground_truth, res["text"])
+
+        return result
+
+def _check_trocr(model: TrOCRInference):
+    if not getattr(model, "loaded", False):
+        return getattr(model, "load_error", "Unknown error")
+    return None
+
+
+def get_trocr_slot(model_path: Optional[str] = None) -> "LazyModel[TrOCRInference]":
+    """
+    Get the lazily loaded model slot for a TrOCR checkpoint.
+    Use ``slot.state`` to check loading progress without blocking.
+    """
+    if model_path is None:
+        model_path = DEFAULT_TROCR_MODEL
+    with _trocr_slots_lock:
+        slot = _trocr_slots.get(model_path)
+        if slot is None:
+            slot = LazyModel("trocr", lambda: TrOCRInference(model_path), check=_check_trocr)
+            _trocr_slots[model_path] = slot
+    return slot
+
+
+def get_trocr_model(model_path: Optional[str] = None) -> Optional[TrOCRInference]:
     """
     Get or create global TrOCR inference instance.
     If model_path is None, uses default pretrained.
-    If model_path is provided, loads from there (overwriting global if different? No, simple singleton).
+    Concurrent first callers share a single load.
     """
-    global _trocr_instance
-    if _trocr_instance is None:
-        if model_path is None:
-            model_path = "microsoft/trocr-small-stage1"
-        _trocr_instance = TrOCRInference(model_path)
-    return _trocr_instance
+    return get_trocr_slot(model_path).get()
+
+
+def trocr_status() -> Dict[str, Any]:
+    with _trocr_slots_lock:
+        status = {}
+        for path, slot in _trocr_slots.items():
+            status[path] = slot.status()
+            model = slot.loaded_model
+            if model is not None and getattr(model, "batcher", None) is not None:
+                status[path]["batching"] = model.batcher.stats()
+        return status
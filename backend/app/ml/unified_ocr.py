@@ -1,9 +1,21 @@
-from typing import Dict, Any, Optional, List
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, Optional, List, Tuple
 import os
+import threading
+import time
 
+from backend.app.core.config import settings
+from backend.app.core.telemetry import LatencyStats
+from backend.app.ml.ensemble import EngineCancelled, EnsembleStats
+from backend.app.ml.hybrid_ocr import HybridOCR
+from backend.app.ml.inference_classifier import classifier_status
 from backend.app.ml.routing.ocr_router import OCRRouter
-from backend.app.ml.transformer.inference_trocr import get_trocr_model
+from backend.app.ml.transformer.inference_trocr import get_trocr_model, trocr_status
 from backend.app.services.ocr_pipeline import OCRPipeline
+from backend.app.services.image_io import Document, ImageSource
+from backend.app.services.preprocessing import resolve_profile
+from backend.app.services.quality_gate import gate_or_none
+from backend.app.services.document_loader import process_pages, merge_page_texts, mean_confidence
 from backend.app.ml.postprocessing.field_extractor import FieldExtractor
 from backend.app.ml.postprocessing.validators import FieldValidator
 
@@ -16,36 +28,211 @@ class UnifiedOCR:
     3. Execute OCR with Ensemble Strategy
     4. Post-process (Extract & Validate)
     5. Return standardized result
+
+    Instances are meant to be long-lived (one per app). Models are loaded
+    lazily on first use through the shared, lock-guarded model slots.
     """
     
     CONFIDENCE_THRESHOLD = 0.85
     
     def __init__(self):
         self.router = OCRRouter()
-        self.trocr = get_trocr_model()
         self.easyocr_pipeline = OCRPipeline() # This wraps EasyOCR/Tesseract
+        self.hybrid = HybridOCR() # EasyOCR line detection + batched TrOCR
         self.extractor = FieldExtractor()
         self.validator = FieldValidator()
+        self.latency = LatencyStats()
+        self.ensemble_stats = EnsembleStats()
+
+    @property
+    def trocr(self):
+        return get_trocr_model()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency.snapshot(),
+            "models": {"trocr": trocr_status(), "classifier": classifier_status()},
+            "ensemble": self.ensemble_stats.snapshot(),
+            "engine_latency_estimates": self.router.costs.snapshot(),
+        }
         
-    def _run_trocr(self, image_path: str) -> Dict[str, Any]:
-        res = self.trocr.predict(image_path)
+    def _run_trocr(self, image: ImageSource, cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        # recognize() shares generate() batches with concurrent requests
+        res = self.trocr.recognize(image, cancel=cancel)
         if "error" in res:
             return {"text": "", "confidence": 0.0, "error": res["error"]}
         return {"text": res.get("text", ""), "confidence": res.get("confidence", 0.0)}
 
-    def _run_easyocr(self, image_path: str) -> Dict[str, Any]:
-        res = self.easyocr_pipeline.process_image(image_path, use_easyocr=True)
-        return {"text": res.get("text", ""), "confidence": res.get("confidence", 0.0), "structured": res.get("structured", {})}
+    def _run_easyocr(self, image: ImageSource, profile: Optional[str] = None) -> Dict[str, Any]:
+        res = self.easyocr_pipeline.process_image(image, use_easyocr=True, profile=profile)
+        out = {"text": res.get("text", ""), "confidence": res.get("confidence", 0.0), "structured": res.get("structured", {})}
+        if "decoding" in res:
+            out["decoding"] = res["decoding"]
+        return out
+
+    def _run_hybrid(self, image: ImageSource, cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        res = self.hybrid.process(image, cancel=cancel)
+        out = {"text": res["text"], "confidence": res["confidence"], "stage_timings_ms": res["stage_timings_ms"]}
+        if "error" in res:
+            out["error"] = res["error"]
+        return out
+
+    # Engine to fall back to when the primary result is not confident enough
+    SECONDARY_ENGINE = {"trocr": "easyocr", "hybrid": "easyocr", "easyocr": "trocr"}
 
-    def process(self, image_path: str) -> Dict[str, Any]:
+    def _run_engine(
+        self, engine: str, image: ImageSource, cancel: Optional[threading.Event] = None, profile: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if cancel is not None and cancel.is_set():
+            raise EngineCancelled(engine)
+        if engine == "trocr":
+            res = self._run_trocr(image, cancel)
+        elif engine == "hybrid":
+            res = self._run_hybrid(image, cancel)
+        else:
+            res = self._run_easyocr(image, profile)
+        if cancel is not None and cancel.is_set():
+            raise EngineCancelled(engine)
+        return res
+
+    def _timed_engine(
+        self,
+        engine: str,
+        image: ImageSource,
+        cancel: Optional[threading.Event] = None,
+        doc_type: Optional[str] = None,
+        profile: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], float, float]:
         """
-        Process an image using the routed OCR engine with ensemble fallback.
+        Run an engine and return (result, wall_ms, cpu_ms). CPU time is that
+        of the calling thread, so it covers Python, OpenCV and EasyOCR work
+        done there but not torch's own intra-op worker threads.
+        Successful runs feed the router's latency estimates.
         """
-        # 1. Route
-        route_info = self.router.route(image_path)
-        engine = route_info.get("ocr_engine", "easyocr")
+        t, c = time.perf_counter(), time.thread_time()
+        res = self._run_engine(engine, image, cancel, profile=profile)
+        wall_ms, cpu_ms = (time.perf_counter() - t) * 1000, (time.thread_time() - c) * 1000
+        if "error" not in res:
+            self.router.costs.observe(engine, doc_type, self.router.pixel_count(image), wall_ms)
+        return res, wall_ms, cpu_ms
+
+    def _fits(self, engine: str, doc_type: str, image: Document, deadline: Optional[float]) -> bool:
+        """Whether ``engine`` is expected to finish before ``deadline`` (perf_counter seconds)."""
+        if deadline is None:
+            return True
+        remaining_ms = (deadline - time.perf_counter()) * 1000
+        return self.router.estimate(engine, doc_type, self.router.pixel_count(image)) <= remaining_ms
+
+    def _ensemble_sequential(
+        self, engine: str, image: Document, result: Dict[str, Any], timings: Dict[str, float], deadline: Optional[float] = None
+    ) -> Tuple[float, Optional[float]]:
+        """
+        Secondary engine runs only if the primary is not confident and,
+        with a deadline, is expected to finish in time.
+        Returns (engine CPU ms, primary confidence).
+        """
+        doc_type = result["metadata"]["document_type"]
+        profile = result["metadata"]["preprocessing_profile"]
+        primary_res, ms, cpu_ms = self._timed_engine(engine, image, doc_type=doc_type, profile=profile)
+        timings[f"{engine}_ms"] = round(ms, 2)
+        if "stage_timings_ms" in primary_res:
+            result["metadata"][f"{engine}_stage_timings_ms"] = primary_res["stage_timings_ms"]
+        if "decoding" in primary_res:
+            result["metadata"][f"{engine}_decoding"] = primary_res["decoding"]
         
-        result = {
+        result["text"] = primary_res["text"]
+        result["confidence_score"] = primary_res["confidence"]
+        
+        # Ensemble Trigger
+        secondary_engine = self.SECONDARY_ENGINE.get(engine, "trocr")
+        if result["confidence_score"] < self.CONFIDENCE_THRESHOLD and not self._fits(secondary_engine, doc_type, image, deadline):
+            result["metadata"]["ensemble_skipped"] = "latency_budget"
+        elif result["confidence_score"] < self.CONFIDENCE_THRESHOLD:
+            result["ensemble_triggered"] = True
+            
+            secondary_res, ms, secondary_cpu_ms = self._timed_engine(secondary_engine, image, doc_type=doc_type, profile=profile)
+            timings[f"{secondary_engine}_ms"] = round(ms, 2)
+            cpu_ms += secondary_cpu_ms
+            if "decoding" in secondary_res:
+                result["metadata"][f"{secondary_engine}_decoding"] = secondary_res["decoding"]
+            
+            if secondary_res["confidence"] > result["confidence_score"]:
+                result["text"] = secondary_res["text"]
+                result["confidence_score"] = secondary_res["confidence"]
+                result["metadata"]["engine_used"] = f"ensemble_{secondary_engine}"
+            else:
+                result["metadata"]["engine_used"] = f"ensemble_{engine}"
+        return cpu_ms, primary_res["confidence"]
+
+    def _ensemble_parallel(self, engine: str, image: Document, result: Dict[str, Any], timings: Dict[str, float]) -> Tuple[float, Optional[float]]:
+        """
+        Start primary and secondary together. The first one to clear the
+        confidence threshold wins and the other is cancelled: dropped if it
+        has not started, told to stop at its next checkpoint otherwise.
+        EasyOCR has no checkpoint inside a page, so a losing EasyOCR run
+        finishes in the background and only its result is discarded.
+        If neither clears it, the more confident result is used.
+        Returns (engine CPU ms, primary confidence or None if it was cancelled).
+        """
+        doc_type = result["metadata"]["document_type"]
+        profile = result["metadata"]["preprocessing_profile"]
+        secondary_engine = self.SECONDARY_ENGINE.get(engine, "trocr")
+        cancels = {engine: threading.Event(), secondary_engine: threading.Event()}
+        futures: Dict[Future, str] = {
+            get_ensemble_pool().submit(self._timed_engine, name, image, cancels[name], doc_type, profile): name
+            for name in (engine, secondary_engine)
+        }
+        results: Dict[str, Dict[str, Any]] = {}
+        errors: List[str] = []
+        cpu_ms = 0.0
+        winner = None
+        pending = set(futures)
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = futures[fut]
+                try:
+                    res, ms, engine_cpu_ms = fut.result()
+                except EngineCancelled:
+                    continue
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    continue
+                timings[f"{name}_ms"] = round(ms, 2)
+                cpu_ms += engine_cpu_ms
+                if "stage_timings_ms" in res:
+                    result["metadata"][f"{name}_stage_timings_ms"] = res["stage_timings_ms"]
+                if "decoding" in res:
+                    result["metadata"][f"{name}_decoding"] = res["decoding"]
+                results[name] = res
+                if winner is None and "error" not in res and res["confidence"] >= self.CONFIDENCE_THRESHOLD:
+                    winner = name
+
+        for fut in pending:
+            name = futures[fut]
+            cancels[name].set()
+            if not fut.cancel():
+                # Already running: let it finish in the background, but account for its CPU
+                fut.add_done_callback(lambda f: self._account_abandoned(f, doc_type))
+            result["metadata"].setdefault("cancelled_engines", []).append(name)
+
+        if not results:
+            raise RuntimeError("; ".join(errors) or "all ensemble engines failed")
+        if winner is None:
+            winner = max(results, key=lambda name: results[name]["confidence"])
+        primary_confidence = results[engine]["confidence"] if engine in results else None
+        result["ensemble_triggered"] = (
+            winner != engine or primary_confidence is None or primary_confidence < self.CONFIDENCE_THRESHOLD
+        )
+        result["text"] = results[winner]["text"]
+        result["confidence_score"] = results[winner]["confidence"]
+        if result["ensemble_triggered"]:
+            result["metadata"]["engine_used"] = f"ensemble_{winner}"
+        return cpu_ms, primary_confidence
+
+    @staticmethod
+    def _empty_result(route_info: Dict[str, Any], engine: Optional[str]) -> Dict[str, Any]:
+        return {
             "routing_info": route_info,
             "text": "",
             "raw_text": "",
@@ -58,49 +245,104 @@ class UnifiedOCR:
             "metadata": {
                 "engine_used": engine,
                 "classifier_confidence": route_info.get("confidence", 0.0),
-                "document_type": route_info.get("document_type", "unknown")
+                "document_type": route_info.get("document_type", "unknown"),
             }
         }
+
+    def _blank_result(self, gate: Dict[str, Any], start: float) -> Dict[str, Any]:
+        route_info = {
+            "document_type": "blank",
+            "confidence": 1.0,
+            "ocr_engine": None,
+            "reasoning": f"Blank page ({gate['metrics']['ink']:.2%} ink). OCR skipped.",
+        }
+        result = self._empty_result(route_info, "none")
+        result["metadata"]["quality_gate"] = gate
+        result["metadata"]["processing_time_ms"] = int((time.perf_counter() - start) * 1000)
+        return result
+
+    def _account_abandoned(self, fut: Future, doc_type: str) -> None:
+        try:
+            _, _, cpu_ms = fut.result()
+        except Exception:
+            return
+        self.ensemble_stats.record_abandoned(doc_type, "parallel", cpu_ms)
+
+    def process(
+        self,
+        image: ImageSource,
+        ensemble_mode: Optional[str] = None,
+        budget_ms: Optional[float] = None,
+        profile: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process an image using the routed OCR engine with ensemble fallback.
+        ``ensemble_mode`` ("sequential", "parallel" or "auto") overrides
+        settings.ensemble_mode for this call. With ``budget_ms`` the router
+        picks an engine expected to fit the budget and the ensemble is
+        skipped when the secondary engine would not finish in time.
+        ``profile`` overrides the preprocessing level routed for the document type.
+        """
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000 if budget_ms is not None else None
+        # Decoded once and shared by the router, the engines and the ensemble
+        image = Document.of(image)
+        # 0. Quality gate: blank pages skip routing and both engines
+        gate = gate_or_none(image, profile)
+        if gate and gate["blank"]:
+            return self._blank_result(gate, start)
+        # 1. Route
+        route_info = self.router.route(image, budget_ms=budget_ms, deadline=deadline)
+        engine = route_info.get("ocr_engine", "easyocr")
+        profile = resolve_profile(profile or route_info.get("preprocessing_level"))
+        
+        result = self._empty_result(route_info, engine)
+        result["metadata"]["preprocessing_profile"] = profile
+        gate = gate_or_none(image, profile)
+        if gate:
+            result["metadata"]["quality_gate"] = gate
         
         # 2. Execute with Ensemble Strategy
+        doc_type = result["metadata"]["document_type"]
+        mode = self.ensemble_stats.choose_mode(doc_type, ensemble_mode)
+        if mode == "parallel" and not self._fits(self.SECONDARY_ENGINE.get(engine, "trocr"), doc_type, image, deadline):
+            # No time for a second engine: run the primary alone
+            mode = "sequential"
+        result["metadata"]["ensemble_mode"] = mode
+        timings = result["metadata"]["stage_timings_ms"] = {"route_ms": round((time.perf_counter() - start) * 1000, 2)}
+        ensemble_start = time.perf_counter()
         try:
-            primary_res = {}
-            if engine == "trocr":
-                primary_res = self._run_trocr(image_path)
+            if mode == "parallel":
+                cpu_ms, primary_confidence = self._ensemble_parallel(engine, image, result, timings)
             else:
-                primary_res = self._run_easyocr(image_path)
-            
-            result["text"] = primary_res["text"]
-            result["confidence_score"] = primary_res["confidence"]
-            
-            # Ensemble Trigger
-            if result["confidence_score"] < self.CONFIDENCE_THRESHOLD:
-                result["ensemble_triggered"] = True
-                secondary_engine = "easyocr" if engine == "trocr" else "trocr"
-                
-                secondary_res = {}
-                if secondary_engine == "trocr":
-                    secondary_res = self._run_trocr(image_path)
-                else:
-                    secondary_res = self._run_easyocr(image_path)
-                
-                if secondary_res["confidence"] > result["confidence_score"]:
-                    result["text"] = secondary_res["text"]
-                    result["confidence_score"] = secondary_res["confidence"]
-                    result["metadata"]["engine_used"] = f"ensemble_{secondary_engine}"
-                else:
-                    result["metadata"]["engine_used"] = f"ensemble_{engine}"
+                cpu_ms, primary_confidence = self._ensemble_sequential(engine, image, result, timings, deadline)
+            # History drives the auto mode choice for this document type. A primary
+            # cancelled or failed in parallel mode counts as a trigger: the secondary
+            # answered, and skipping it would freeze the rate on parallel
+            self.ensemble_stats.record_trigger(
+                doc_type, primary_confidence is None or primary_confidence < self.CONFIDENCE_THRESHOLD
+            )
+            self.ensemble_stats.record_run(doc_type, mode, (time.perf_counter() - ensemble_start) * 1000, cpu_ms)
+            result["metadata"]["engine_cpu_ms"] = round(cpu_ms, 2)
                     
         except Exception as e:
             result["error"] = str(e)
             # Last resort fallback
             if result["text"] == "":
-                fallback_res = self._run_easyocr(image_path)
+                fallback_res = self._run_easyocr(image, profile)
                 result["text"] = fallback_res["text"]
                 result["confidence_score"] = fallback_res["confidence"]
                 result["metadata"]["engine_used"] = "fallback_easyocr"
                     
+        # Per-step timings and the resolution normaliser's pixel counts, if the EasyOCR pipeline ran
+        reports = image.preprocess_reports(profile)
+        if "normalize" in reports:
+            result["metadata"]["resolution"] = reports["normalize"]
+        if image.preprocess_trace(profile):
+            result["metadata"]["preprocessing_stages"] = image.preprocess_trace(profile)
+
         # 3. Post-Process (Extract & Validate)
+        t = time.perf_counter()
         if result["text"]:
             result["raw_text"] = result["text"]
             
@@ -131,4 +373,50 @@ class UnifiedOCR:
                 "corrections": corrections
             }
             
+        timings["postprocess_ms"] = round((time.perf_counter() - t) * 1000, 2)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result["metadata"]["processing_time_ms"] = int(elapsed_ms)
+        result["metadata"]["cold_start"] = self.latency.record(elapsed_ms)
+        if budget_ms is not None:
+            route_info["actual_ms"] = round(elapsed_ms, 2)
+            route_info["within_budget"] = elapsed_ms <= budget_ms
         return result
+
+    def process_document(self, path: str, profile: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Multi-page variant of process() for PDF/TIFF uploads.
+        Each page is routed independently (pages of one upload can differ).
+        """
+        start = time.perf_counter()
+        pages = process_pages(path, lambda page: self.process(page, profile=profile))
+        return {
+            "text": merge_page_texts(pages),
+            "confidence_score": mean_confidence(pages, key="confidence_score"),
+            "ensemble_triggered": any(p.get("ensemble_triggered") for p in pages),
+            "routing_info": {"pages": [{"page": p["page"], **p.get("routing_info", {})} for p in pages]},
+            "page_count": len(pages),
+            "pages": pages,
+            "metadata": {"processing_time_ms": int((time.perf_counter() - start) * 1000)},
+        }
+
+
+# Runs the two engines of a parallel ensemble side by side, shared by every UnifiedOCR instance
+_ensemble_pool: Optional[ThreadPoolExecutor] = None
+_ensemble_pool_lock = threading.Lock()
+
+
+def get_ensemble_pool() -> ThreadPoolExecutor:
+    global _ensemble_pool
+    if _ensemble_pool is None:
+        with _ensemble_pool_lock:
+            if _ensemble_pool is None:
+                _ensemble_pool = ThreadPoolExecutor(max_workers=max(2, settings.ensemble_workers), thread_name_prefix="ensemble")
+    return _ensemble_pool
+
+
+def shutdown_ensemble_pool() -> None:
+    global _ensemble_pool
+    with _ensemble_pool_lock:
+        if _ensemble_pool is not None:
+            _ensemble_pool.shutdown(wait=False, cancel_futures=True)
+            _ensemble_pool = None
@@ -26,23 +26,30 @@ class EnterpriseOCRResponse(BaseModel):
     validation_report: ValidationReport
     error: Optional[str] = None
 
-class OCRResponse(BaseModel):
+class OCRBlock(BaseModel):
     text: str
-    structured: Any
     confidence: float
-    language: str
-    pdf_url: str
+    bbox: List[List[float]]
+    page: Optional[int] = None
 
 
-class OCRBlock(BaseModel):
+class OCRResponse(BaseModel):
     text: str
+    structured: Any
     confidence: float
-    bbox: List[List[float]]
+    language: str
+    pdf_url: str
+    blocks: Optional[List[OCRBlock]] = None
+    page_count: Optional[int] = None
+    pages: Optional[List[Any]] = None
 
 
 class OCRMetadata(BaseModel):
     filename: str
     processing_time_ms: int
+    page_count: Optional[int] = None
+    cache: Optional[str] = None
+    quality_gate: Optional[Dict[str, Any]] = None
 
 
 class OCRV1Response(BaseModel):
@@ -50,6 +57,7 @@ class OCRV1Response(BaseModel):
     text: str
     blocks: List[OCRBlock]
     metadata: OCRMetadata
+    pages: Optional[List[Any]] = None
 
 
 class RoutedOCRResponse(BaseModel):
@@ -58,4 +66,6 @@ class RoutedOCRResponse(BaseModel):
     routing_info: Any
     raw_output: Any = None
     error: str = None
+    page_count: Optional[int] = None
+    pages: Optional[List[Any]] = None
 
@@ -0,0 +1,163 @@
+import re
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ..core.config import settings
+
+IMAGE_TYPES = {"image/png", "image/jpeg", "image/jpg"}
+PDF_TYPES = {"application/pdf"}
+TIFF_TYPES = {"image/tiff", "image/tif"}
+SUPPORTED_TYPES = IMAGE_TYPES | PDF_TYPES | TIFF_TYPES
+
+# Leading bytes of the upload; the client's filename and content type are not trusted
+_MAGIC_KIND = ((b"%PDF-", "pdf"), (b"II*\x00", "tiff"), (b"MM\x00*", "tiff"))
+
+
+class TooManyPages(ValueError):
+    def __init__(self, pages: int, limit: int):
+        super().__init__(f"Document has {pages} pages, limit is {limit}")
+        self.pages = pages
+        self.limit = limit
+
+
+def is_supported(content_type: Optional[str]) -> bool:
+    return content_type in SUPPORTED_TYPES
+
+
+def sniff_kind(head: bytes) -> str:
+    """'pdf', 'tiff' or 'image', from the first bytes of a document."""
+    return next((kind for magic, kind in _MAGIC_KIND if head.startswith(magic)), "image")
+
+
+def document_kind(path: str) -> str:
+    """'pdf', 'tiff' or 'image', based on the stored file's magic bytes."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(8)
+    except OSError:
+        return "image"
+    return sniff_kind(head)
+
+
+def is_multipage(path: str) -> bool:
+    return document_kind(path) != "image"
+
+
+def count_pages(path: str) -> int:
+    kind = document_kind(path)
+    if kind == "pdf":
+        out = subprocess.run(["pdfinfo", path], capture_output=True, text=True, check=True).stdout
+        match = re.search(r"^Pages:\s+(\d+)", out, re.MULTILINE)
+        if not match:
+            raise ValueError("Could not read PDF page count")
+        return int(match.group(1))
+    if kind == "tiff":
+        with Image.open(path) as im:
+            return getattr(im, "n_frames", 1)
+    return 1
+
+
+def _rasterize_pdf_page(path: str, page: int, dpi: int) -> np.ndarray:
+    # pdftoppm (poppler-utils) writes the single page PNG to stdout
+    png = subprocess.run(
+        ["pdftoppm", "-png", "-r", str(dpi), "-f", str(page), "-l", str(page), path],
+        capture_output=True, check=True,
+    ).stdout
+    img = cv2.imdecode(np.frombuffer(png, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"Could not rasterize page {page}")
+    return img
+
+
+def _read_tiff_page(path: str, page: int) -> np.ndarray:
+    with Image.open(path) as im:
+        im.seek(page - 1)
+        rgb = np.asarray(im.convert("RGB"))
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+
+def _load_page(path: str, kind: str, page: int, dpi: int) -> np.ndarray:
+    if kind == "pdf":
+        return _rasterize_pdf_page(path, page, dpi)
+    if kind == "tiff":
+        return _read_tiff_page(path, page)
+    return cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def _page_count(path: str, max_pages: Optional[int]) -> int:
+    max_pages = max_pages or settings.max_pages
+    total = count_pages(path)
+    if total > max_pages:
+        raise TooManyPages(total, max_pages)
+    return total
+
+
+def iter_pages(path: str, dpi: Optional[int] = None, max_pages: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Lazily yield (page_number, BGR image) one page at a time.
+    Only the page being yielded is held in memory.
+    """
+    dpi = dpi or settings.pdf_dpi
+    kind = document_kind(path)
+    for page in range(1, _page_count(path, max_pages) + 1):
+        yield page, _load_page(path, kind, page, dpi)
+
+
+def process_pages(
+    path: str,
+    fn: Callable[[np.ndarray], Dict[str, Any]],
+    workers: Optional[int] = None,
+    dpi: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run ``fn(page_image)`` on every page with a page-level worker pool.
+
+    Pages are rasterised lazily by this thread and handed to at most
+    ``workers`` concurrent tasks, so peak memory is bounded by the number of
+    pages in flight rather than the page count. Results come back in page
+    order; a failing page yields {"page", "error"} instead of aborting the
+    document, whether it failed to rasterise or inside ``fn``.
+    """
+    dpi = dpi or settings.pdf_dpi
+    kind = document_kind(path)
+    total = _page_count(path, None)
+    workers = max(1, workers or settings.page_workers)
+    in_flight = threading.BoundedSemaphore(workers)
+    futures: List[Tuple[int, Future]] = []
+
+    def run(page_no: int, img: np.ndarray) -> Dict[str, Any]:
+        try:
+            return {"page": page_no, **fn(img)}
+        except Exception as e:
+            return {"page": page_no, "error": str(e)}
+        finally:
+            in_flight.release()
+
+    results: Dict[int, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page") as pool:
+        for page_no in range(1, total + 1):
+            try:
+                img = _load_page(path, kind, page_no, dpi)
+            except Exception as e:
+                results[page_no] = {"page": page_no, "error": f"Could not read page {page_no}: {e}"}
+                continue
+            in_flight.acquire()
+            futures.append((page_no, pool.submit(run, page_no, img)))
+            del img
+    results.update((page_no, f.result()) for page_no, f in futures)
+    return [results[page_no] for page_no in sorted(results)]
+
+
+def merge_page_texts(pages: List[Dict[str, Any]], key: str = "text") -> str:
+    return "\n\n".join(p.get(key, "") for p in pages if p.get(key))
+
+
+def mean_confidence(pages: List[Dict[str, Any]], key: str = "confidence") -> float:
+    values = [float(p[key]) for p in pages if key in p and "error" not in p]
+    return float(np.mean(values)) if values else 0.0
@@ -0,0 +1,237 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from PIL import Image
+from easyocr import easyocr as easyocr_reader
+from easyocr.recognition import AlignCollate, custom_mean
+from easyocr.utils import get_image_list, reformat_input
+
+from ..core.config import settings
+from ..ml.batching import MicroBatcher
+
+DECODERS = ("greedy", "beamsearch", "adaptive")
+
+# EasyOCR retries crops below this confidence with boosted contrast (Reader.recognize defaults)
+CONTRAST_THS = 0.1
+ADJUST_CONTRAST = 0.5
+BEAM_WIDTH = 5
+
+# Beam-search decode cost per recognizer time step, averaged over recent pages;
+# used to estimate what decoding every crop with beam search would have cost
+_beam_ms_per_step: Optional[float] = None
+_beam_cost_lock = threading.Lock()
+
+
+def _observe_beam_cost(ms: float, steps: int) -> None:
+    global _beam_ms_per_step
+    if steps <= 0:
+        return
+    with _beam_cost_lock:
+        per_step = ms / steps
+        _beam_ms_per_step = per_step if _beam_ms_per_step is None else 0.8 * _beam_ms_per_step + 0.2 * per_step
+
+
+def _ignore_idx(reader: Any) -> List[int]:
+    # Characters of the model outside the reader's languages (as Reader.recognize without allowlist)
+    ignore = set(reader.character) - set(reader.lang_char)
+    return [reader.character.index(c) + 1 for c in ignore if c in reader.character]
+
+
+def _probabilities(
+    reader: Any, crops: Sequence[np.ndarray], width: int, ignore_idx: List[int], adjust_contrast: float = 0.0
+) -> np.ndarray:
+    """
+    Per-time-step character probabilities (batch x T x classes) of crops
+    padded to ``width``, as easyocr.recognition.recognizer_predict.
+    """
+    height = easyocr_reader.imgH
+    batch = AlignCollate(imgH=height, imgW=width, keep_ratio_with_pad=True, adjust_contrast=adjust_contrast)(
+        [Image.fromarray(crop, "L") for crop in crops]
+    )
+    reader.recognizer.eval()
+    with torch.no_grad():
+        text_for_pred = torch.LongTensor(len(crops), int(width / 10) + 1).fill_(0).to(reader.device)
+        preds = reader.recognizer(batch.to(reader.device), text_for_pred)
+        probs = F.softmax(preds, dim=2).cpu().numpy()
+    probs[:, :, ignore_idx] = 0.0
+    return probs / probs.sum(axis=2, keepdims=True)
+
+
+def _confidence(probs: np.ndarray) -> float:
+    # Same score whatever the decoder: EasyOCR rates the best path of every time step
+    best = probs.max(axis=1)[probs.argmax(axis=1) != 0]
+    return float(custom_mean(best if len(best) else np.array([0])))
+
+
+def recognize_crops(
+    reader: Any, crops: Sequence[Tuple[np.ndarray, int]], thresholds: Sequence[float], batch_size: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Text of each (crop, width) from easyocr.utils.get_image_list. One
+    recognizer pass per crop, then greedy decoding, or beam search from the
+    same probabilities when the crop's confidence is below its threshold.
+    Crops of the same width (get_image_list rounds widths up to a multiple
+    of the model height) run up to ``batch_size`` per recognizer call, so
+    nothing is padded beyond what Reader.recognize pads and the output does
+    not depend on how crops were batched.
+    Returns {"text", "confidence", "beam", "steps", "batch", "decode_ms"} per crop, in order.
+    """
+    ignore_idx = _ignore_idx(reader)
+    batch_size = max(1, batch_size)
+    probs: List[Optional[np.ndarray]] = [None] * len(crops)
+    confs = [0.0] * len(crops)
+    batches = [1] * len(crops)
+
+    def run(indices: List[int], adjust_contrast: float = 0.0) -> None:
+        by_width: Dict[int, List[int]] = {}
+        for i in indices:
+            by_width.setdefault(crops[i][1], []).append(i)
+        for width, group in by_width.items():
+            for start in range(0, len(group), batch_size):
+                chunk = group[start:start + batch_size]
+                out = _probabilities(reader, [crops[i][0] for i in chunk], width, ignore_idx, adjust_contrast)
+                for i, p in zip(chunk, out):
+                    conf = _confidence(p)
+                    # The contrast retry only replaces a result it beats
+                    if probs[i] is None or conf >= confs[i]:
+                        probs[i], confs[i] = p, conf
+                    batches[i] = max(batches[i], len(chunk))
+
+    run(list(range(len(crops))))
+    # EasyOCR retries crops it can barely read with boosted contrast
+    run([i for i in range(len(crops)) if confs[i] < CONTRAST_THS], adjust_contrast=ADJUST_CONTRAST)
+
+    results = []
+    for p, conf, threshold, batch in zip(probs, confs, thresholds, batches):
+        # Every crop went through the first pass
+        assert p is not None
+        t = time.perf_counter()
+        beam = conf < threshold
+        if beam:
+            text = reader.converter.decode_beamsearch(p[None], beamWidth=BEAM_WIDTH)[0]
+        else:
+            indices = p.argmax(axis=1)
+            text = reader.converter.decode_greedy(indices, [len(indices)])[0]
+        results.append({
+            "text": text, "confidence": conf, "beam": beam, "steps": len(p), "batch": batch, "decode_ms": (time.perf_counter() - t) * 1000,
+        })
+    return results
+
+
+def _recognize_batch(items: List[Tuple[Any, np.ndarray, int, float]]) -> List[Dict[str, Any]]:
+    """MicroBatcher batch_fn: (reader, crop, width, threshold) items of any images, grouped per reader."""
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    by_reader: Dict[int, List[int]] = {}
+    for i, item in enumerate(items):
+        by_reader.setdefault(id(item[0]), []).append(i)
+    for indices in by_reader.values():
+        reader = items[indices[0]][0]
+        out = recognize_crops(
+            reader, [(items[i][1], items[i][2]) for i in indices], [items[i][3] for i in indices], batch_size=len(indices)
+        )
+        for i, res in zip(indices, out):
+            results[i] = res
+    return [res for res in results if res is not None]
+
+
+_crop_batcher: Optional[MicroBatcher] = None
+_crop_batcher_lock = threading.Lock()
+
+
+def get_crop_batcher() -> Optional[MicroBatcher]:
+    """
+    Process-wide batcher that pools recognition crops of concurrent
+    readtext() calls (pages of a document, parallel requests, evaluation
+    workers). None when settings.easyocr_batch_size is 1.
+    """
+    global _crop_batcher
+    if settings.easyocr_batch_size <= 1:
+        return None
+    if _crop_batcher is None:
+        with _crop_batcher_lock:
+            if _crop_batcher is None:
+                _crop_batcher = MicroBatcher(
+                    _recognize_batch,
+                    max_batch_size=settings.easyocr_batch_size,
+                    max_wait_ms=settings.easyocr_batch_wait_ms,
+                    name="easyocr-batcher",
+                )
+    return _crop_batcher
+
+
+def readtext(
+    reader: Any, img: np.ndarray, decoder: Optional[str] = None, threshold: Optional[float] = None, stats: Optional[Dict[str, Any]] = None
+) -> List[Tuple[Any, str, float]]:
+    """
+    ``reader.readtext(img)`` word detections (bbox, text, confidence) with
+    ``decoder`` (default settings.easyocr_decoder). "adaptive" decodes every
+    crop greedily and re-decodes with beam search, from the same recognizer
+    output, only the crops below ``threshold`` (settings.easyocr_beam_threshold).
+    Confidences do not depend on the decoder, so they match either mode.
+    Detection runs here; recognition crops go through the shared batcher
+    (see get_crop_batcher) when batching is on.
+    When given, ``stats`` gets the decoder used, the share of crops
+    re-decoded with beam search and the estimated decoding time saved.
+    """
+    decoder = decoder or settings.easyocr_decoder
+    if decoder not in DECODERS:
+        raise ValueError(f"Unknown EasyOCR decoder '{decoder}' (expected one of {', '.join(DECODERS)})")
+    stats = {} if stats is None else stats
+    # Left to EasyOCR: Reader.recognize forces greedy decoding for Chinese
+    # models, and Arabic needs its right-to-left reordering
+    if reader.model_lang in ("chinese_tra", "chinese_sim", "arabic"):
+        if reader.model_lang != "arabic":
+            decoder = "greedy"
+        elif decoder == "adaptive":
+            decoder = "beamsearch"
+        results = reader.readtext(img, decoder=decoder)
+        stats.update({"decoder": decoder, "crops": len(results)})
+        return results
+
+    if decoder == "adaptive":
+        threshold = settings.easyocr_beam_threshold if threshold is None else threshold
+        stats["threshold"] = threshold
+    else:
+        threshold = float("inf") if decoder == "beamsearch" else float("-inf")
+    t = time.perf_counter()
+    img, grey = reformat_input(img)
+    horizontal_list, free_list = reader.detect(img, reformat=False)
+    crops = []
+    # One crop per box, as Reader.recognize on CPU (each box is cut and resized on its own)
+    for h_list, f_list in [([box], []) for box in horizontal_list[0]] + [([], [box]) for box in free_list[0]]:
+        image_list, max_width = get_image_list(h_list, f_list, grey, model_height=easyocr_reader.imgH)
+        if image_list:
+            crops.append((image_list[0][0], image_list[0][1], int(max_width)))
+    stats.update({"decoder": decoder, "detect_ms": round((time.perf_counter() - t) * 1000, 2)})
+
+    t = time.perf_counter()
+    batcher = get_crop_batcher()
+    if batcher is not None:
+        futures = [batcher.submit((reader, crop, width, threshold)) for _, crop, width in crops]
+        recognized = [f.result() for f in futures]
+    else:
+        recognized = recognize_crops(reader, [(crop, width) for _, crop, width in crops], [threshold] * len(crops))
+    stats["recognize_ms"] = round((time.perf_counter() - t) * 1000, 2)
+
+    beam = [r for r in recognized if r["beam"]]
+    greedy = [r for r in recognized if not r["beam"]]
+    beam_ms, greedy_ms = sum(r["decode_ms"] for r in beam), sum(r["decode_ms"] for r in greedy)
+    _observe_beam_cost(beam_ms, sum(r["steps"] for r in beam))
+    saved = None
+    if _beam_ms_per_step is not None:
+        # Beam search on the crops that were only decoded greedily, minus what greedy cost
+        saved = round(_beam_ms_per_step * sum(r["steps"] for r in greedy) - greedy_ms, 2)
+    stats.update({
+        "crops": len(recognized),
+        "mean_recognizer_batch": round(sum(r["batch"] for r in recognized) / len(recognized), 2) if recognized else 0.0,
+        "redecoded": len(beam),
+        "redecoded_fraction": round(len(beam) / len(recognized), 3) if recognized else 0.0,
+        "greedy_decode_ms": round(greedy_ms, 2),
+        "beam_decode_ms": round(beam_ms, 2),
+        "beam_ms_saved_est": saved if decoder == "adaptive" else None,
+    })
+    return [(coord, r["text"], r["confidence"]) for (coord, _, _), r in zip(crops, recognized)]
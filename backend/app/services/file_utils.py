@@ -1,14 +1,140 @@
+import hashlib
+import mimetypes
 import os
 import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Union
+
+import aiofiles
 from fastapi import UploadFile
 
+CHUNK_SIZE = 1024 * 1024
 
-async def save_upload_file(file: UploadFile, target_dir: str) -> str:
-    os.makedirs(target_dir, exist_ok=True)
+
+class UploadTooLarge(Exception):
+    def __init__(self, limit_bytes: int):
+        super().__init__(f"File size exceeds {limit_bytes / (1024 * 1024):g}MB")
+        self.limit_bytes = limit_bytes
+
+
+@dataclass
+class SavedUpload:
+    path: str
+    size: int
+    sha256: str
+
+    @property
+    def source(self) -> str:
+        return self.path
+
+
+@dataclass
+class BufferedUpload:
+    data: bytes
+    size: int
+    sha256: str
+
+    @property
+    def source(self) -> bytes:
+        return self.data
+
+
+def mb(n: Optional[float]) -> Optional[int]:
+    return int(n * 1024 * 1024) if n else None
+
+
+def _target_path(file: UploadFile, target_dir: str) -> str:
     fname = file.filename or ""
     ext = os.path.splitext(fname)[1].lower()
-    name = f"{uuid.uuid4().hex}{ext}"
-    path = os.path.join(target_dir, name)
-    with open(path, "wb") as f:
-        f.write(await file.read())
-    return path
+    if not ext and file.content_type:
+        # Cosmetic only: page handling (PDF/TIFF) is chosen from the file's magic bytes
+        ext = mimetypes.guess_extension(file.content_type) or ""
+    return os.path.join(target_dir, f"{uuid.uuid4().hex}{ext}")
+
+
+async def _read_chunks(file: UploadFile, max_bytes: Optional[int], chunk_size: int) -> AsyncIterator[bytes]:
+    """Yield the upload in chunks, raising UploadTooLarge once ``max_bytes`` is crossed."""
+    if max_bytes and file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+    size = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            return
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        yield chunk
+
+
+async def save_upload(
+    file: UploadFile,
+    target_dir: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> SavedUpload:
+    """
+    Stream an upload to disk chunk by chunk, hashing it in the same pass.
+
+    Raises UploadTooLarge as soon as the running byte count crosses
+    ``max_bytes`` (or up front when the size is already known); the partial
+    file is removed. Starlette has spooled the whole multipart body before
+    the endpoint runs, so ``max_bytes`` caps this copy, not the bytes the
+    server receives; that needs a body limit in front of the app.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    path = _target_path(file, target_dir)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in _read_chunks(file, max_bytes, chunk_size):
+                size += len(chunk)
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        remove_file(path)
+        raise
+    return SavedUpload(path=path, size=size, sha256=digest.hexdigest())
+
+
+async def read_upload(
+    file: UploadFile,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> BufferedUpload:
+    """Same as save_upload, but keeps the bytes in memory for in-memory decoding."""
+    buf = bytearray()
+    digest = hashlib.sha256()
+    async for chunk in _read_chunks(file, max_bytes, chunk_size):
+        digest.update(chunk)
+        buf += chunk
+    return BufferedUpload(data=bytes(buf), size=len(buf), sha256=digest.hexdigest())
+
+
+@asynccontextmanager
+async def scoped_upload(
+    file: UploadFile,
+    target_dir: str,
+    max_bytes: Optional[int] = None,
+    to_disk: bool = False,
+) -> AsyncIterator[Union[SavedUpload, BufferedUpload]]:
+    """
+    Receive an upload for the duration of a request. Held in memory unless
+    ``to_disk`` is set (e.g. for PDFs, which are rasterized from a file);
+    a file written here is removed on exit.
+    """
+    if not to_disk:
+        yield await read_upload(file, max_bytes=max_bytes)
+        return
+    saved = await save_upload(file, target_dir, max_bytes=max_bytes)
+    try:
+        yield saved
+    finally:
+        remove_file(saved.path)
+
+
+def remove_file(path: Optional[str]) -> None:
+    if path and os.path.exists(path):
+        os.remove(path)
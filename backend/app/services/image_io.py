@@ -0,0 +1,178 @@
+import io
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ..core.config import settings
+from .preprocessing import get_pipelines, preprocess, resolve_profile
+from .quality_gate import analyze, decide
+
+# Anything an engine entry point accepts: a file path, encoded bytes,
+# a decoded OpenCV array (BGR or grayscale) or a PIL image.
+# A Document (below) is accepted wherever an ImageSource is.
+ImageSource = Union[str, bytes, bytearray, memoryview, np.ndarray, Image.Image, "Document"]
+
+
+def describe(source: ImageSource) -> str:
+    """Short label for error messages and logs."""
+    if isinstance(source, str):
+        return source
+    if isinstance(source, Document):
+        return describe(source.source)
+    if isinstance(source, np.ndarray):
+        return f"<array {source.shape}>"
+    if isinstance(source, Image.Image):
+        return f"<PIL {source.size}>"
+    return f"<{len(source)} bytes>"
+
+
+def to_bgr(source: ImageSource) -> np.ndarray:
+    """
+    Decode any ImageSource to a 3-channel BGR array without touching disk
+    (paths are, of course, read). Arrays are passed through, not copied,
+    when they already are BGR.
+    """
+    if isinstance(source, Document):
+        return source.bgr
+    if isinstance(source, np.ndarray):
+        if source.ndim == 2:
+            return cv2.cvtColor(source, cv2.COLOR_GRAY2BGR)
+        if source.shape[2] == 4:
+            return cv2.cvtColor(source, cv2.COLOR_BGRA2BGR)
+        return source
+    if isinstance(source, Image.Image):
+        return cv2.cvtColor(np.asarray(source.convert("RGB")), cv2.COLOR_RGB2BGR)
+    if isinstance(source, str):
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Image not found at {source}")
+        buf = np.fromfile(source, dtype=np.uint8)
+    else:
+        buf = np.frombuffer(source, dtype=np.uint8)
+    # imdecode asserts on empty buffers instead of returning None
+    img = cv2.imdecode(buf, cv2.IMREAD_COLOR) if buf.size else None
+    if img is None:
+        raise ValueError(f"Could not decode image {describe(source)}")
+    return img
+
+
+def to_pil(source: ImageSource) -> Image.Image:
+    """Decode any ImageSource to an RGB PIL image."""
+    if isinstance(source, Document):
+        return source.rgb
+    if isinstance(source, Image.Image):
+        return source.convert("RGB")
+    if isinstance(source, np.ndarray):
+        return Image.fromarray(cv2.cvtColor(to_bgr(source), cv2.COLOR_BGR2RGB))
+    if isinstance(source, str) and not os.path.exists(source):
+        raise FileNotFoundError(f"Image not found at {source}")
+    try:
+        with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as im:
+            return im.convert("RGB")
+    except Exception as e:
+        raise ValueError(f"Could not decode image {describe(source)}: {e}")
+
+
+class Document:
+    """
+    Request-scoped image shared by routing, the OCR engines and the ensemble.
+
+    The source is decoded at most once; the views the engines need (BGR,
+    RGB PIL, grayscale, thumbnails, the OCR preprocessing output) are built
+    on first use and memoized for the life of the object. Views are shared,
+    not copied: treat them as read-only. Safe to use from several threads.
+    """
+
+    def __init__(self, source: ImageSource):
+        self.source = source
+        self.decodes = 0
+        self._views: Dict[Any, Any] = {}
+        self._locks: Dict[Any, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, source: Union["Document", ImageSource]) -> "Document":
+        return source if isinstance(source, Document) else cls(source)
+
+    def view(self, name: Any, build: Callable[[], Any]) -> Any:
+        """Return the memoized view ``name``, building it on first use."""
+        if name in self._views:
+            return self._views[name]
+        # One lock per view: engines running in parallel only wait for the views they share
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._views:
+                self._views[name] = build()
+            return self._views[name]
+
+    def _decode(self) -> np.ndarray:
+        if isinstance(self.source, (str, bytes, bytearray, memoryview)):
+            self.decodes += 1
+        return to_bgr(self.source)
+
+    @property
+    def bgr(self) -> np.ndarray:
+        return self.view("bgr", self._decode)
+
+    @property
+    def rgb(self) -> Image.Image:
+        source = self.source
+        if isinstance(source, Image.Image):
+            return self.view("rgb", lambda: source.convert("RGB"))
+        return self.view("rgb", lambda: Image.fromarray(cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)))
+
+    @property
+    def gray(self) -> np.ndarray:
+        return self.view("gray", lambda: cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY))
+
+    def thumbnail(self, max_side: int = 512) -> Image.Image:
+        """RGB view whose longer side is at most ``max_side`` (e.g. for the classifier)."""
+        def build() -> Image.Image:
+            h, w = self.bgr.shape[:2]
+            scale = max_side / float(max(h, w))
+            if scale >= 1:
+                return self.rgb
+            small = cv2.resize(self.bgr, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+            return Image.fromarray(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+        return self.view(("thumbnail", max_side), build)
+
+    @property
+    def quality(self) -> Dict[str, float]:
+        """Image-quality metrics (see quality_gate.analyze)."""
+        return self.view("quality", lambda: analyze(self.gray))
+
+    def quality_gate(self, profile: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Quality gate decision for ``profile``'s stages, or None when the gate is disabled."""
+        if not settings.quality_gate_enabled:
+            return None
+        profile = resolve_profile(profile)
+        return self.view(("quality_gate", profile), lambda: decide(self.quality, get_pipelines()[profile]))
+
+    def preprocessed(self, profile: Optional[str] = None) -> np.ndarray:
+        """
+        Output of the OCR preprocessing pipeline for ``profile`` (see
+        preprocessing.get_pipelines), minus the stages the quality gate skips.
+        """
+        profile = resolve_profile(profile)
+
+        def build() -> np.ndarray:
+            gate = self.quality_gate(profile)
+            reports: Dict[str, Any] = {}
+            trace: List[Dict[str, Any]] = []
+            out = preprocess(self.bgr, profile, stages=gate["stages"] if gate else None, reports=reports, trace=trace)
+            self._views[("preprocess_reports", profile)] = reports
+            self._views[("preprocess_trace", profile)] = trace
+            return out
+        return self.view(("preprocessed", profile), build)
+
+    def preprocess_reports(self, profile: Optional[str] = None) -> Dict[str, Any]:
+        """Stage reports (e.g. normalize's pixel counts) of preprocessed(profile), once it has been built."""
+        return self._views.get(("preprocess_reports", resolve_profile(profile)), {})
+
+    def preprocess_trace(self, profile: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Wall time and output shape of each step of preprocessed(profile), once it has been built."""
+        return self._views.get(("preprocess_trace", resolve_profile(profile)), [])
@@ -0,0 +1,166 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+def _length(text: str) -> int:
+    return len(text) - text.count(" ") - text.count("\n")
+
+
+def weighted_confidence(items: Sequence[Dict[str, Any]]) -> float:
+    """
+    Mean confidence weighted by text length (non-space characters), so stray
+    1-character boxes count less than long words. Weighting lines or
+    paragraphs gives the same result as weighting their words.
+    """
+    total = sum(_length(i["text"]) for i in items)
+    if not total:
+        return 0.0
+    return float(sum(i["confidence"] * _length(i["text"]) for i in items) / total)
+
+
+def _quad(x0: float, y0: float, x1: float, y1: float) -> List[List[float]]:
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+def _group(words: List[Dict[str, Any]], text: str) -> Dict[str, Any]:
+    x0, y0 = min(w["x0"] for w in words), min(w["y0"] for w in words)
+    x1, y1 = max(w["x1"] for w in words), max(w["y1"] for w in words)
+    return {"text": text, "confidence": weighted_confidence(words), "words": words, "x0": x0, "y0": y0, "x1": x1, "y1": y1}
+
+
+def _lines(words: List[Dict[str, Any]], height: float, x_ths: float, y_ths: float) -> List[Dict[str, Any]]:
+    """Words sorted into rows by vertical centre, each row split into lines at wide horizontal gaps."""
+    words = sorted(words, key=lambda w: w["cy"])
+    rows: List[List[Dict[str, Any]]] = []
+    row_cy = 0.0
+    for w in words:
+        if rows and w["cy"] - row_cy <= y_ths * height:
+            rows[-1].append(w)
+            row_cy += (w["cy"] - row_cy) / len(rows[-1])
+        else:
+            rows.append([w])
+            row_cy = w["cy"]
+
+    lines = []
+    for row in rows:
+        row.sort(key=lambda w: w["x0"])
+        current, right = [row[0]], row[0]["x1"]
+        for w in row[1:]:
+            if w["x0"] - right > x_ths * height:
+                lines.append(current)
+                current, right = [], w["x1"]
+            current.append(w)
+            right = max(right, w["x1"])
+        lines.append(current)
+    return [_group(line, " ".join(w["text"] for w in line)) for line in lines]
+
+
+def _paragraphs(lines: List[Dict[str, Any]], height: float, x_ths: float, y_ths: float) -> List[List[Dict[str, Any]]]:
+    """
+    Chains each line to the closest line right above it that overlaps it
+    horizontally. Candidates come from a grid index of line bottoms (one
+    row per text height), so each lookup only scans a few nearby lines.
+    """
+    lines = sorted(lines, key=lambda line: (line["y0"], line["x0"]))
+    by_bottom: Dict[int, List[int]] = {}
+    paragraph_of: List[int] = []
+    has_child: List[bool] = []
+    paragraphs: List[List[Dict[str, Any]]] = []
+    for i, line in enumerate(lines):
+        parent, parent_y1 = None, None
+        lo, hi = int((line["y0"] - y_ths * height) // height), int(line["y1"] // height)
+        for row in range(lo, hi + 1):
+            for j in by_bottom.get(row, ()):
+                above = lines[j]
+                if not (line["y0"] - y_ths * height <= above["y1"] and above["y0"] < line["y0"]):
+                    continue
+                if above["x0"] - x_ths * height > line["x1"] or line["x0"] > above["x1"] + x_ths * height:
+                    continue
+                if parent_y1 is None or above["y1"] > parent_y1:
+                    parent, parent_y1 = j, above["y1"]
+        if parent is not None and not has_child[parent]:
+            has_child[parent] = True
+            paragraph_of.append(paragraph_of[parent])
+            paragraphs[paragraph_of[parent]].append(line)
+        else:
+            paragraph_of.append(len(paragraphs))
+            paragraphs.append([line])
+        has_child.append(False)
+        by_bottom.setdefault(int(line["y1"] // height), []).append(i)
+    return paragraphs
+
+
+def group_words(detections: Sequence[Any], x_ths: float = 1.0, y_ths: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    Reading-order paragraphs from raw EasyOCR ``readtext`` detections
+    (bbox, text, confidence). Replaces ``readtext(paragraph=True)``, which
+    drops the confidences and merges boxes pairwise in O(n^2); this is
+    O(n log n). ``x_ths``/``y_ths`` are the horizontal word gap and vertical
+    line gap, in text heights, that still join boxes (EasyOCR's defaults).
+
+    Returns [{"text", "confidence", "bbox", "lines": [{"text", "confidence", "bbox"}]}],
+    lines of a paragraph joined by newlines; confidences are length-weighted
+    over the words (see weighted_confidence).
+    """
+    words: List[Dict[str, Any]] = []
+    for det in detections:
+        text = str(det[1]).strip()
+        if not text:
+            continue
+        pts = np.asarray(det[0], dtype=np.float64)
+        x0, y0 = (float(v) for v in pts.min(axis=0))
+        x1, y1 = (float(v) for v in pts.max(axis=0))
+        conf = float(det[2]) if len(det) > 2 else 0.0
+        words.append({"text": text, "confidence": conf, "x0": x0, "y0": y0, "x1": x1, "y1": y1, "cy": (y0 + y1) / 2})
+    if not words:
+        return []
+
+    height = max(1.0, float(np.median([w["y1"] - w["y0"] for w in words])))
+    paragraphs = _paragraphs(_lines(words, height, x_ths, y_ths), height, x_ths, y_ths)
+    return [_paragraph(lines) for lines in paragraphs]
+
+
+def _paragraph(lines: List[Dict[str, Any]]) -> Dict[str, Any]:
+    para = _group([w for line in lines for w in line["words"]], "\n".join(line["text"] for line in lines))
+    return {
+        "text": para["text"],
+        "confidence": para["confidence"],
+        "bbox": _quad(para["x0"], para["y0"], para["x1"], para["y1"]),
+        "lines": [
+            {"text": line["text"], "confidence": line["confidence"], "bbox": _quad(line["x0"], line["y0"], line["x1"], line["y1"])}
+            for line in lines
+        ],
+    }
+
+
+def tesseract_paragraphs(data: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Paragraphs in the group_words format from pytesseract
+    ``image_to_data(..., output_type=Output.DICT)``. Tesseract segments the
+    page itself, so words are grouped by its block/paragraph/line numbers,
+    in its reading order. Word confidences are rescaled from 0-100 to 0-1.
+    """
+    paragraphs: Dict[Tuple[Any, ...], Dict[Any, List[Dict[str, Any]]]] = {}
+    for i, text in enumerate(data.get("text", [])):
+        text = str(text).strip()
+        conf = float(data["conf"][i])
+        # Page, block, paragraph and line rows have conf -1 and no text
+        if not text or conf < 0:
+            continue
+        x0, y0 = float(data["left"][i]), float(data["top"][i])
+        word = {
+            "text": text, "confidence": min(conf, 100.0) / 100.0,
+            "x0": x0, "y0": y0, "x1": x0 + float(data["width"][i]), "y1": y0 + float(data["height"][i]),
+        }
+        para = (data["page_num"][i], data["block_num"][i], data["par_num"][i])
+        paragraphs.setdefault(para, {}).setdefault(data["line_num"][i], []).append(word)
+    return [
+        _paragraph([_group(words, " ".join(w["text"] for w in words)) for words in lines.values()])
+        for lines in paragraphs.values()
+    ]
+
+
+def page_text(paragraphs: Sequence[Dict[str, Any]]) -> str:
+    """Paragraph texts separated by blank lines (see postprocessing.to_structured)."""
+    return "\n\n".join(p["text"] for p in paragraphs)
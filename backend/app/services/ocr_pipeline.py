@@ -1,61 +1,112 @@
 import os
 import uuid
 import numpy as np
-import cv2
 from langdetect import detect
 from PIL import Image
-import easyocr
 import pytesseract
-from .preprocessing import preprocess
+from .preprocessing import preprocess, resolve_profile
+from .reader_pool import get_reader_pool
 from .postprocessing import clean_text, to_structured
+from .document_loader import process_pages, merge_page_texts, mean_confidence
+from .image_io import Document, ImageSource, to_bgr
+from .easyocr_decoding import readtext
+from .layout import group_words, page_text, tesseract_paragraphs, weighted_confidence
+from .quality_gate import gate_or_none
+from .tesseract_pool import TesseractPageError, TesseractWorkerError, get_tesseract_pool
 from ..utils.pdf_utils import generate_searchable_pdf
 from ..core.config import settings
 
 
-def _read_image(path: str) -> np.ndarray:
-    img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
-    if isinstance(img, np.ndarray):
-        return img
-    return np.zeros((1, 1, 3), dtype=np.uint8)
+def _read_image(source: ImageSource) -> np.ndarray:
+    try:
+        return to_bgr(source)
+    except ValueError:
+        # Undecodable input OCRs as an empty page
+        return np.zeros((1, 1, 3), dtype=np.uint8)
 
 
-def _easyocr_text(img: np.ndarray, lang: str):
-    # Set gpu=True if available, otherwise False
-    import torch
-    use_gpu = torch.cuda.is_available()
-    reader = easyocr.Reader([lang], gpu=use_gpu)
-    
-    # Use paragraph=True to handle multi-line text blocks better
-    results = reader.readtext(img, paragraph=True, decoder='beamsearch')
-    
-    texts = [r[1] for r in results]
-    confs = [float(r[2]) for r in results if len(r) > 2]
-    
-    # If paragraph=True is used, the results are already grouped.
-    # If we still see fragmentation, we might need custom grouping logic here.
-    text = "\n".join(texts)
-    conf = float(np.mean(confs)) if confs else 0.0
-    return text, conf
+def _preprocessed(source: ImageSource, profile: str = None) -> np.ndarray:
+    # Memoized on the Document (per profile), so ensemble re-runs do not preprocess again
+    doc = Document.of(source)
+    profile = resolve_profile(profile)
+    try:
+        return doc.preprocessed(profile)
+    except ValueError:
+        return preprocess(np.zeros((1, 1, 3), dtype=np.uint8), profile)
+
+
+def _easyocr_text(img: np.ndarray, lang: str, decoding: dict = None, blocks: list = None):
+    # Readers come from the shared pool; device is auto-detected there
+    with get_reader_pool().checkout([lang]) as reader:
+        # Word-level detections (paragraph=True would drop the confidences);
+        # ``decoding`` gets the decoder stats, e.g. the share of crops re-decoded with beam search
+        results = readtext(reader, img, stats=decoding)
+    # Lines and paragraphs in reading order, confidence weighted by word length
+    paragraphs = group_words(results)
+    if blocks is not None:
+        blocks.extend(line for p in paragraphs for line in p["lines"])
+    return page_text(paragraphs), weighted_confidence(paragraphs)
+
 
+# Tesseract names its traineddata by ISO 639-2 code
+TESSERACT_LANGS = {
+    "en": "eng", "fr": "fra", "de": "deu", "es": "spa", "it": "ita", "pt": "por", "nl": "nld",
+    "ru": "rus", "ar": "ara", "hi": "hin", "ja": "jpn", "ko": "kor", "ch_sim": "chi_sim", "ch_tra": "chi_tra",
+}
 
-def _tesseract_text(img: np.ndarray, lang: str):
-    pil = Image.fromarray(img)
-    text = pytesseract.image_to_string(pil, lang=lang)
-    conf = 0.0
-    return text, conf
 
+def _tesseract_lang(lang: str) -> str:
+    # "en+fr" (a multi-language EasyOCR reader) -> "eng+fra"
+    return "+".join(TESSERACT_LANGS.get(code, code) for code in lang.split("+"))
 
-def process_image(path: str, lang_hint: str = None):
-    img = _read_image(path)
-    pre = preprocess(img)
+
+def _tesseract_text(img: np.ndarray, lang: str, blocks: list = None):
+    # Word boxes and confidences, grouped by Tesseract's own block/paragraph/line segmentation
+    data = None
+    pool = get_tesseract_pool()
+    if pool is not None:
+        try:
+            data = pool.image_to_data(img, _tesseract_lang(lang))
+        except (TesseractWorkerError, TesseractPageError) as e:
+            # Crashed workers have been replaced, broken ones disable the pool;
+            # either way this page takes the fork-per-call path
+            print(f"Warning: Tesseract worker failed ({e}); running tesseract directly")
+    if data is None:
+        pil = Image.fromarray(img)
+        data = pytesseract.image_to_data(pil, lang=_tesseract_lang(lang), output_type=pytesseract.Output.DICT)
+    paragraphs = tesseract_paragraphs(data)
+    if blocks is not None:
+        blocks.extend(line for p in paragraphs for line in p["lines"])
+    return page_text(paragraphs), weighted_confidence(paragraphs)
+
+
+def _add_preprocessing_info(result: dict, doc: Document, profile: str = None) -> None:
+    # Per-step timings/shapes and the resolution normaliser's pixel counts, when preprocessing ran
+    trace = doc.preprocess_trace(profile)
+    if trace:
+        result["preprocessing_stages"] = trace
+    if "normalize" in doc.preprocess_reports(profile):
+        result["resolution"] = doc.preprocess_reports(profile)["normalize"]
+
+
+def process_image(source: ImageSource, lang_hint: str = None, make_pdf: bool = True, profile: str = None):
+    doc = Document.of(source)
+    gate = gate_or_none(doc, profile)
     
     # Use default language if no hint provided
     ocr_lang = lang_hint if lang_hint else settings.default_lang
     
-    try:
-        text, conf = _easyocr_text(pre, ocr_lang)
-    except Exception:
-        text, conf = _tesseract_text(pre, ocr_lang)
+    decoding, blocks = {}, []
+    if gate and gate["blank"]:
+        # Nothing to read: skip preprocessing and OCR
+        text, conf = "", 0.0
+    else:
+        pre = _preprocessed(doc, profile)
+        try:
+            text, conf = _easyocr_text(pre, ocr_lang, decoding, blocks)
+        except Exception:
+            decoding, blocks = {}, []
+            text, conf = _tesseract_text(pre, ocr_lang, blocks)
     
     if not lang_hint:
         try:
@@ -66,45 +117,90 @@ def process_image(path: str, lang_hint: str = None):
         language = lang_hint
     cleaned = clean_text(text)
     structured = to_structured(cleaned)
-    base = uuid.uuid4().hex
-    pdf_path = generate_searchable_pdf(cleaned, settings.output_dir, base)
-    pdf_url = f"/outputs/{os.path.basename(pdf_path)}"
-    return {
+    result = {
         "text": cleaned,
         "structured": structured,
         "confidence": conf,
         "language": language,
-        "pdf_url": pdf_url,
+        "pdf_url": _make_pdf(cleaned) if make_pdf else None,
+        # Line boxes in the block format of run_ocr (original text, before clean_text)
+        "blocks": blocks,
+    }
+    if gate:
+        result["quality_gate"] = gate
+    if decoding:
+        result["decoding"] = decoding
+    _add_preprocessing_info(result, doc, profile)
+    return result
+
+
+def _make_pdf(text: str) -> str:
+    base = uuid.uuid4().hex
+    pdf_path = generate_searchable_pdf(text, settings.output_dir, base)
+    return f"/outputs/{os.path.basename(pdf_path)}"
+
+
+def process_document(path: str, lang_hint: str = None, profile: str = None):
+    """
+    Multi-page variant of process_image for PDF/TIFF uploads.
+    Pages run through the pipeline in parallel; one searchable PDF is
+    generated for the whole document.
+    """
+    pages = process_pages(path, lambda page: process_image(page, lang_hint, make_pdf=False, profile=profile))
+    text = merge_page_texts(pages)
+    paragraphs = [para for p in pages for para in p.get("structured", {}).get("paragraphs", [])]
+    languages = [p["language"] for p in pages if p.get("language")]
+    return {
+        "text": text,
+        "structured": {"paragraphs": paragraphs},
+        "confidence": mean_confidence(pages),
+        "language": languages[0] if languages else (lang_hint or settings.default_lang),
+        "pdf_url": _make_pdf(text),
+        "blocks": [{**b, "page": p["page"]} for p in pages for b in p.get("blocks", [])],
+        "page_count": len(pages),
+        "pages": [{k: v for k, v in p.items() if k not in ("pdf_url", "blocks")} for p in pages],
     }
 
 class OCRPipeline:
     """
     Wrapper class for OCR operations to be used in UnifiedOCR.
     """
-    def process_image(self, path: str, lang_hint: str = None, use_easyocr: bool = True):
+    def process_image(self, source: ImageSource, lang_hint: str = None, use_easyocr: bool = True, profile: str = None):
         # Determine language
         lang = lang_hint if lang_hint else settings.default_lang
         
-        # Read and preprocess
-        img = _read_image(path)
-        pre = preprocess(img)
+        doc = Document.of(source)
+        gate = gate_or_none(doc, profile)
         
-        # Run OCR
-        if use_easyocr:
-            try:
-                text, conf = _easyocr_text(pre, lang)
-            except Exception:
-                text, conf = _tesseract_text(pre, lang)
+        # Read and preprocess, then run OCR (blank pages skip both)
+        decoding, blocks = {}, []
+        if gate and gate["blank"]:
+            text, conf = "", 0.0
         else:
-            text, conf = _tesseract_text(pre, lang)
+            pre = _preprocessed(doc, profile)
+            if use_easyocr:
+                try:
+                    text, conf = _easyocr_text(pre, lang, decoding, blocks)
+                except Exception:
+                    decoding, blocks = {}, []
+                    text, conf = _tesseract_text(pre, lang, blocks)
+            else:
+                text, conf = _tesseract_text(pre, lang, blocks)
             
         # Post-process
         cleaned = clean_text(text)
         structured = to_structured(cleaned)
         
-        return {
+        result = {
             "text": cleaned,
             "structured": structured,
             "confidence": conf,
-            "language": lang
+            "language": lang,
+            "blocks": blocks,
         }
+        if gate:
+            result["quality_gate"] = gate
+        if decoding:
+            result["decoding"] = decoding
+        _add_preprocessing_info(result, doc, profile)
+        return result
@@ -1,14 +1,23 @@
 import time
 from typing import Any, Dict, List
-import easyocr
 from .preprocessing_service import preprocess_image
+from .document_loader import process_pages, merge_page_texts
+from .image_io import Document, ImageSource
+from .quality_gate import gate_or_none
+from .reader_pool import get_reader_pool
 
 
-def run_ocr(path: str, original_filename: str) -> Dict[str, Any]:
+def run_ocr(source: ImageSource, original_filename: str) -> Dict[str, Any]:
     start = time.perf_counter()
-    img = preprocess_image(path)
-    reader = easyocr.Reader(["en"], gpu=False)
-    results = reader.readtext(img)
+    doc = Document.of(source)
+    gate = gate_or_none(doc, "fast")
+    if gate and gate["blank"]:
+        results = []
+    else:
+        # The "fast" profile is preprocess_image's Otsu pipeline, minus the stages the gate skips
+        img = doc.preprocessed("fast") if gate else preprocess_image(source)
+        with get_reader_pool().checkout(["en"], gpu=False) as reader:
+            results = reader.readtext(img)
     blocks: List[Dict[str, Any]] = []
     for r in results:
         bbox = r[0]
@@ -17,9 +26,40 @@ def run_ocr(path: str, original_filename: str) -> Dict[str, Any]:
         blocks.append({"text": text, "confidence": conf, "bbox": [[float(p[0]), float(p[1])] for p in bbox]})
     full_text = "\n".join([b["text"] for b in blocks])
     elapsed_ms = int((time.perf_counter() - start) * 1000)
+    metadata = {"filename": original_filename, "processing_time_ms": elapsed_ms}
+    if gate:
+        metadata["quality_gate"] = gate
     return {
         "status": "success",
         "text": full_text,
         "blocks": blocks,
-        "metadata": {"filename": original_filename, "processing_time_ms": elapsed_ms},
+        "metadata": metadata,
+    }
+
+
+def run_ocr_document(path: str, original_filename: str) -> Dict[str, Any]:
+    """
+    Multi-page variant of run_ocr for PDF/TIFF uploads.
+    Blocks keep their page-local coordinates and carry a ``page`` number.
+    """
+    start = time.perf_counter()
+    pages = process_pages(path, lambda page: run_ocr(page, original_filename))
+    blocks: List[Dict[str, Any]] = []
+    for p in pages:
+        blocks.extend({**b, "page": p["page"]} for b in p.get("blocks", []))
+    elapsed_ms = int((time.perf_counter() - start) * 1000)
+    return {
+        "status": "success",
+        "text": merge_page_texts(pages),
+        "blocks": blocks,
+        "pages": [
+            {
+                "page": p["page"],
+                "text": p.get("text", ""),
+                **({"error": p["error"]} if "error" in p else {}),
+                **({"quality_gate": p["metadata"]["quality_gate"]} if "quality_gate" in p.get("metadata", {}) else {}),
+            }
+            for p in pages
+        ],
+        "metadata": {"filename": original_filename, "processing_time_ms": elapsed_ms, "page_count": len(pages)},
     }
@@ -0,0 +1,92 @@
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from ..core.config import settings
+from .preprocessing import Step, parse_step, projection_skew
+
+# Longest side of the downsampled copy used for ink, contrast and skew
+ANALYSIS_SIDE = 800
+# Side of the full-resolution centre crop used for noise and blur, which downsampling would hide
+DETAIL_CROP = 512
+
+DENOISE_STAGES = ("gaussian_blur", "median_denoise", "nl_means_denoise")
+
+
+def _noise_sigma(gray: np.ndarray) -> float:
+    """
+    Gaussian noise estimate (Immerkaer's Laplacian-difference kernel), using
+    the median absolute response so sparse text edges do not count as noise.
+    """
+    kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+    response = np.abs(cv2.filter2D(gray.astype(np.float32), -1, kernel))[1:-1, 1:-1]
+    if response.size == 0:
+        return 0.0
+    # |N(0, 36 sigma^2)| has median 0.6745 * 6 sigma
+    return float(np.median(response) / (0.6745 * 6))
+
+
+def analyze(gray: np.ndarray) -> Dict[str, float]:
+    """
+    Cheap image-quality metrics of a grayscale page:
+    blur (variance of the Laplacian, higher is sharper), noise (sigma in
+    grey levels), contrast (ink to paper spread, 0-1), ink (share
+    of pixels clearly darker than the background) and skew (degrees).
+    """
+    start = time.perf_counter()
+    h, w = gray.shape[:2]
+    cy, cx = max(0, (h - DETAIL_CROP) // 2), max(0, (w - DETAIL_CROP) // 2)
+    crop = gray[cy:cy + DETAIL_CROP, cx:cx + DETAIL_CROP]
+    scale = ANALYSIS_SIDE / float(max(h, w))
+    small = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA) if scale < 1 else gray
+
+    noise = _noise_sigma(crop)
+    p1, p50, p99 = np.percentile(small, (1, 50, 99))
+    # Ink: darker than the (paper) median by more than the noise could explain
+    ink_mask = small < p50 - max(25.0, 3 * noise)
+    # Sparse ink (a line of text) does not reach the 1st percentile: measure it directly
+    dark = min(p1, float(np.percentile(small[ink_mask], 10))) if ink_mask.any() else p1
+    return {
+        "blur": round(float(cv2.Laplacian(crop, cv2.CV_64F).var()), 2),
+        "noise": round(noise, 2),
+        "contrast": round(float(p99 - dark) / 255, 3),
+        "ink": round(float(ink_mask.mean()), 5),
+        "skew_deg": projection_skew(ink_mask),
+        "analysis_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def is_blank(metrics: Dict[str, float]) -> bool:
+    return metrics["ink"] < settings.quality_gate_blank_ink
+
+
+def decide(metrics: Dict[str, float], stages: Sequence[Step]) -> Dict[str, Any]:
+    """
+    Which of a pipeline's steps (``stages``) to run for an image with these metrics.
+    Returns {"blank", "metrics", "stages", "skipped": {step name: reason}}.
+    """
+    skipped: Dict[str, str] = {}
+    kept = []
+    for step in stages:
+        name, stage, _ = parse_step(step)
+        if is_blank(metrics):
+            skipped[name] = "blank page"
+        elif stage == "deskew" and abs(metrics["skew_deg"]) < settings.quality_gate_max_skew_deg:
+            skipped[name] = f"skew {metrics['skew_deg']} deg"
+        elif stage in DENOISE_STAGES and metrics["noise"] < settings.quality_gate_max_clean_noise:
+            skipped[name] = f"noise {metrics['noise']}"
+        elif stage == "clahe" and metrics["contrast"] >= settings.quality_gate_min_good_contrast:
+            skipped[name] = f"contrast {metrics['contrast']}"
+        else:
+            kept.append(step)
+    return {"blank": is_blank(metrics), "metrics": metrics, "stages": kept, "skipped": skipped}
+
+
+def gate_or_none(doc: Any, profile: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """``doc.quality_gate(profile)``, or None when the gate is off or the image does not decode."""
+    try:
+        return doc.quality_gate(profile)
+    except (ValueError, FileNotFoundError):
+        return None
@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import easyocr
+
+from ..core.config import settings
+
+ReaderKey = Tuple[Tuple[str, ...], str]
+
+
+def _resolve_device(gpu: Optional[bool]) -> str:
+    if gpu is None:
+        gpu = settings.easyocr_gpu
+    if gpu is None:
+        import torch
+        gpu = torch.cuda.is_available()
+    return "cuda" if gpu else "cpu"
+
+
+class _PoolEntry:
+    def __init__(self, reader: Any):
+        self.reader = reader
+        self.in_use = 0
+
+
+class EasyOCRReaderPool:
+    """
+    Process-wide pool of loaded ``easyocr.Reader`` instances.
+
+    Readers are keyed by (language set, device) and kept in LRU order.
+    Loading a reader is expensive (CRAFT detector + recognizer weights),
+    so each key is loaded at most once while it stays in the pool.
+    Readers that are checked out are never evicted.
+    """
+
+    def __init__(self, max_size: int = 4):
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[ReaderKey, _PoolEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[ReaderKey, threading.Lock] = {}
+        self._stats: Dict[ReaderKey, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(langs: Sequence[str], device: str) -> ReaderKey:
+        return tuple(sorted(set(langs))), device
+
+    def _stat(self, key: ReaderKey) -> Dict[str, int]:
+        return self._stats.setdefault(key, {"hits": 0, "loads": 0, "evictions": 0})
+
+    def _load_reader(self, langs: List[str], device: str) -> Any:
+        return easyocr.Reader(langs, gpu=(device == "cuda"))
+
+    def _evict_locked(self) -> None:
+        # Drop least recently used idle readers until we are within budget.
+        while len(self._entries) > self.max_size:
+            victim = next((k for k, e in self._entries.items() if e.in_use == 0), None)
+            if victim is None:
+                break
+            del self._entries[victim]
+            self._stat(victim)["evictions"] += 1
+
+    def _acquire(self, key: ReaderKey) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.in_use += 1
+                self._entries.move_to_end(key)
+                self._stat(key)["hits"] += 1
+                return entry.reader
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the pool lock so other keys stay available,
+        # but serialise loads of the same key.
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.in_use += 1
+                    self._entries.move_to_end(key)
+                    self._stat(key)["hits"] += 1
+                    return entry.reader
+
+            reader = self._load_reader(list(key[0]), key[1])
+
+            with self._lock:
+                entry = _PoolEntry(reader)
+                entry.in_use = 1
+                self._entries[key] = entry
+                self._stat(key)["loads"] += 1
+                self._evict_locked()
+            return reader
+
+    def _release(self, key: ReaderKey) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.in_use = max(0, entry.in_use - 1)
+            self._evict_locked()
+
+    @contextmanager
+    def checkout(self, langs: Sequence[str], gpu: Optional[bool] = None) -> Iterator[Any]:
+        """
+        Borrow a reader for the given languages.
+
+        The reader is shared: concurrent checkouts of the same key receive
+        the same instance, which only pins it against eviction.
+        """
+        key = self.make_key(langs, _resolve_device(gpu))
+        reader = self._acquire(key)
+        try:
+            yield reader
+        finally:
+            self._release(key)
+
+    def preload(self, lang_sets: Sequence[Sequence[str]], gpu: Optional[bool] = None) -> None:
+        for langs in lang_sets:
+            with self.checkout(langs, gpu=gpu):
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            readers = {}
+            for key, counters in self._stats.items():
+                entry = self._entries.get(key)
+                readers[f"{'+'.join(key[0])}@{key[1]}"] = {
+                    **counters,
+                    "loaded": entry is not None,
+                    "in_use": entry.in_use if entry is not None else 0,
+                }
+            return {"max_size": self.max_size, "size": len(self._entries), "readers": readers}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+# Global instance for reuse
+_reader_pool: Optional[EasyOCRReaderPool] = None
+_reader_pool_lock = threading.Lock()
+
+
+def get_reader_pool() -> EasyOCRReaderPool:
+    global _reader_pool
+    if _reader_pool is None:
+        with _reader_pool_lock:
+            if _reader_pool is None:
+                _reader_pool = EasyOCRReaderPool(max_size=settings.easyocr_pool_size)
+    return _reader_pool
+
+
+def preload_configured_readers() -> None:
+    """Load the readers listed in ``settings.easyocr_preload_langs``."""
+    lang_sets = [[lang for lang in spec.split("+") if lang] for spec in settings.easyocr_preload_langs]
+    get_reader_pool().preload([langs for langs in lang_sets if langs])
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from importlib import metadata
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from .preprocessing import get_pipelines
+
+# Bump when the shape of cached results changes
+CACHE_FORMAT_VERSION = 2
+
+
+class ResultCache:
+    """
+    Two-tier cache for OCR results, keyed by content hash.
+
+    The memory tier is an LRU bounded by the size of the serialized results;
+    the disk tier keeps one JSON file per key, expires entries ``ttl_s``
+    after they were written and drops the oldest files once ``disk_bytes``
+    is exceeded. Values are stored as JSON, so every ``get`` returns a fresh
+    copy that callers may modify.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_bytes: int = 0,
+        ttl_s: float = 0,
+    ):
+        self.memory_bytes = max(0, memory_bytes)
+        self.disk_dir = disk_dir if disk_dir and disk_bytes > 0 else None
+        self.disk_bytes = disk_bytes
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._disk_used = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_used = sum(size for _, size, _ in self._disk_entries())
+
+    # -- public API -------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return json.loads(blob)
+        blob = self._disk_get(key)
+        with self._lock:
+            if blob is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._memory_put(key, blob)
+        return json.loads(blob)
+
+    def put(self, key: str, value: Any) -> None:
+        blob = json.dumps(value).encode("utf-8")
+        with self._lock:
+            self._counters["writes"] += 1
+            self._memory_put(key, blob)
+        self._disk_put(key, blob)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            blob = self._memory.pop(key, None)
+            if blob is not None:
+                self._memory_used -= len(blob)
+        self._disk_remove(self._disk_path(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+        for path, _, _ in self._disk_entries():
+            self._disk_remove(path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "memory_budget_bytes": self.memory_bytes,
+                "disk_bytes": self._disk_used,
+                "disk_budget_bytes": self.disk_bytes if self.disk_dir else 0,
+            }
+
+    # -- memory tier ------------------------------------------------------
+
+    def _memory_put(self, key: str, blob: bytes) -> None:
+        # Caller holds the lock
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old)
+        if len(blob) > self.memory_bytes:
+            return
+        self._memory[key] = blob
+        self._memory_used += len(blob)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self._counters["evictions"] += 1
+
+    # -- disk tier --------------------------------------------------------
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_entries(self):
+        """(path, size, mtime) of every cached file."""
+        if not self.disk_dir:
+            return []
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        if not path:
+            return None
+        try:
+            st = os.stat(path)
+            if self.ttl_s and time.time() - st.st_mtime > self.ttl_s:
+                self._disk_remove(path)
+                with self._lock:
+                    self._counters["expired"] += 1
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _disk_put(self, key: str, blob: bytes) -> None:
+        path = self._disk_path(key)
+        if not path or len(blob) > self.disk_bytes:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            # Atomic: readers never see a half-written entry
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Result cache write failed: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        with self._lock:
+            self._disk_used += len(blob) - previous
+            over = self._disk_used > self.disk_bytes
+        if over:
+            self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        """Expire stale files, then remove the oldest until under budget."""
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        used = sum(size for _, size, _ in entries)
+        now = time.time()
+        for path, size, mtime in entries:
+            expired = self.ttl_s and now - mtime > self.ttl_s
+            if not expired and used <= self.disk_bytes:
+                break
+            self._disk_remove(path)
+            used -= size
+            with self._lock:
+                self._counters["expired" if expired else "evictions"] += 1
+        with self._lock:
+            self._disk_used = used
+
+    def _disk_remove(self, path: Optional[str]) -> None:
+        if not path:
+            return
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._disk_used = max(0, self._disk_used - size)
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "none"
+
+
+def _file_signature(path: str) -> str:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    return f"{st.st_size}:{int(st.st_mtime)}"
+
+
+_versions: Optional[Dict[str, str]] = None
+
+
+def pipeline_fingerprint() -> str:
+    """
+    Hash of everything that changes OCR output besides the image itself:
+    engine/library versions, model identities and pipeline settings.
+    Retraining the classifier changes its checkpoint, and with it the key.
+    """
+    global _versions
+    if _versions is None:
+        _versions = {name: _package_version(name) for name in ("easyocr", "pytesseract", "opencv-python", "torch", "transformers")}
+    from ..ml.inference_classifier import DEFAULT_MODEL_DIR
+    from ..ml.transformer.inference_trocr import DEFAULT_TROCR_MODEL
+    parts = {
+        "format": CACHE_FORMAT_VERSION,
+        "versions": _versions,
+        "classifier": _file_signature(os.path.join(DEFAULT_MODEL_DIR, "best_model.pth")),
+        "trocr": DEFAULT_TROCR_MODEL,
+        "settings": {
+            "default_lang": settings.default_lang,
+            "easyocr_decoding": [settings.easyocr_decoder, settings.easyocr_beam_threshold],
+            "pdf_dpi": settings.pdf_dpi,
+            "max_pages": settings.max_pages,
+            "preprocessing_profile": settings.preprocessing_profile,
+            "preprocessing_profile_by_doc_type": settings.preprocessing_profile_by_doc_type,
+            "preprocessing_pipelines": get_pipelines(),
+            "deskew": [settings.deskew_analysis_side, settings.deskew_epsilon_deg],
+            "resolution": [settings.text_height_min_px, settings.text_height_max_px, settings.normalize_max_pixels],
+            "quality_gate": [
+                settings.quality_gate_enabled,
+                settings.quality_gate_blank_ink,
+                settings.quality_gate_max_skew_deg,
+                settings.quality_gate_max_clean_noise,
+                settings.quality_gate_min_good_contrast,
+            ],
+        },
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def cache_key(content_sha256: str, pipeline: str, **params: Any) -> str:
+    """Key for ``pipeline`` run on the given bytes with the given request parameters."""
+    payload = {"sha256": content_sha256, "pipeline": pipeline, "params": params, "fingerprint": pipeline_fingerprint()}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def is_cacheable(result: Any) -> bool:
+    """Failed runs (or documents with a failed page) are not cached."""
+    if not isinstance(result, dict) or result.get("error"):
+        return False
+    return not any("error" in p for p in result.get("pages") or [])
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Process-wide result cache, or None when disabled."""
+    global _result_cache
+    if not settings.result_cache_enabled:
+        return None
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(
+                    memory_bytes=int(settings.result_cache_memory_mb * 1024 * 1024),
+                    disk_dir=settings.result_cache_dir,
+                    disk_bytes=int(settings.result_cache_disk_mb * 1024 * 1024),
+                    ttl_s=settings.result_cache_ttl_s,
+                )
+    return _result_cache
@@ -0,0 +1,293 @@
+import functools
+import multiprocessing
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from ..core.config import settings
+
+# Column order of Tesseract's TSV renderer (what pytesseract.image_to_data parses)
+TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+class TesseractWorkerError(RuntimeError):
+    """Raised when a Tesseract worker dies or hangs (the worker is replaced)."""
+
+
+class TesseractPageError(RuntimeError):
+    """Raised when Tesseract itself fails inside a healthy worker, e.g. missing traineddata."""
+
+
+@functools.lru_cache(maxsize=None)
+def tesserocr_available() -> bool:
+    try:
+        import tesserocr  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def tsv_to_data(tsv: str) -> Dict[str, List[Any]]:
+    """TSV rows (no header, as TessBaseAPI.GetTSVText) in pytesseract's image_to_data DICT format."""
+    from pytesseract.pytesseract import file_to_dict
+    return file_to_dict(f"{TSV_HEADER}\n{tsv}", "\t", -1)
+
+
+def _worker_main(conn: Any, tessdata: Optional[str]) -> None:
+    """
+    Worker process loop: one TessBaseAPI per language, initialised on first
+    use and kept for the life of the process, so traineddata loads once.
+    Messages are ("ping",), ("stop",) or ("ocr", lang, image).
+    """
+    from PIL import Image
+    import tesserocr
+
+    apis: Dict[str, Any] = {}
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                break
+            if msg[0] == "stop":
+                break
+            if msg[0] == "ping":
+                conn.send(("ok", None))
+                continue
+            _, lang, image = msg
+            try:
+                api = apis.get(lang)
+                if api is None:
+                    api = apis[lang] = tesserocr.PyTessBaseAPI(lang=lang, **({"path": tessdata} if tessdata else {}))
+                api.SetImage(Image.fromarray(image))
+                conn.send(("ok", tsv_to_data(api.GetTSVText(0))))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        for api in apis.values():
+            api.End()
+
+
+class _Worker:
+    def __init__(self, ctx: Any, target: Callable[..., None], tessdata: Optional[str]):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=target, args=(child, tessdata), daemon=True, name="tesseract-worker")
+        self.process.start()
+        child.close()
+        self.last_used = time.monotonic()
+
+    def call(self, msg: tuple, timeout: float) -> Any:
+        try:
+            self.conn.send(msg)
+            if not self.conn.poll(timeout):
+                raise TesseractWorkerError(f"Tesseract worker did not answer within {timeout:g}s")
+            status, payload = self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise TesseractWorkerError(f"Tesseract worker died (exit code {self.process.exitcode})") from e
+        self.last_used = time.monotonic()
+        if status != "ok":
+            raise TesseractPageError(payload)
+        return payload
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class TesseractPool:
+    """
+    Fixed pool of long-lived Tesseract worker processes.
+
+    pytesseract forks a ``tesseract`` binary per call, which reloads the
+    traineddata and round-trips the image through temp files. Workers here
+    keep a TessBaseAPI loaded and receive pages over a pipe. A worker that
+    crashes or exceeds ``timeout_s`` is killed and replaced; idle workers
+    are pinged before reuse once ``health_interval_s`` has passed. After
+    ``max_consecutive_failures`` failed pages in a row (typically a
+    TessBaseAPI that cannot initialise) the pool marks itself disabled.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        timeout_s: float = 30.0,
+        health_interval_s: float = 60.0,
+        tessdata: Optional[str] = None,
+        max_consecutive_failures: int = 3,
+        target: Callable[..., None] = _worker_main,
+    ):
+        self.size = max(1, size)
+        self.timeout_s = timeout_s
+        self.health_interval_s = health_interval_s
+        self._tessdata = tessdata
+        self._target = target
+        self.max_consecutive_failures = max(1, max_consecutive_failures)
+        self.disabled = False
+        self._consecutive_failures = 0
+        # Spawn, not fork: the parent holds torch/OpenCV threads and locks
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers: List[_Worker] = []
+        self._closed = False
+        self._calls = 0
+        self._failures = 0
+        self._restarts = 0
+        self._health_checks = 0
+        for _ in range(self.size):
+            worker = self._start()
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+    def _start(self) -> _Worker:
+        return _Worker(self._ctx, self._target, self._tessdata)
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.stop()
+        fresh = self._start()
+        with self._lock:
+            self._restarts += 1
+            self._workers = [fresh if w is worker else w for w in self._workers]
+        return fresh
+
+    def _healthy(self, worker: _Worker) -> _Worker:
+        """The worker itself if it answers, otherwise a replacement."""
+        if worker.alive() and time.monotonic() - worker.last_used < self.health_interval_s:
+            return worker
+        with self._lock:
+            self._health_checks += 1
+        try:
+            if worker.alive():
+                worker.call(("ping",), timeout=min(self.timeout_s, 5.0))
+                return worker
+        except TesseractWorkerError:
+            pass
+        return self._replace(worker)
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[_Worker]:
+        if self._closed:
+            raise TesseractWorkerError("Tesseract pool is closed")
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TesseractWorkerError("No idle Tesseract worker") from None
+        try:
+            worker = self._healthy(worker)
+            yield worker
+        except TesseractWorkerError:
+            # Crashed or hung mid-page: never hand that process out again
+            worker = self._replace(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def image_to_data(self, image: np.ndarray, lang: str = "eng") -> Dict[str, List[Any]]:
+        """``pytesseract.image_to_data(image, lang, output_type=Output.DICT)`` on a pooled worker."""
+        with self._lock:
+            self._calls += 1
+        try:
+            with self.checkout() as worker:
+                data = worker.call(("ocr", lang, np.ascontiguousarray(image)), timeout=self.timeout_s)
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= self.max_consecutive_failures and not self.disabled:
+                    self.disabled = True
+                    print(f"Warning: Tesseract pool disabled after {self._consecutive_failures} failed pages in a row ({e})")
+            raise
+        with self._lock:
+            self._consecutive_failures = 0
+        return data
+
+    def check_health(self) -> int:
+        """Ping every idle worker now and replace the ones that do not answer; returns how many were replaced."""
+        replaced = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.last_used = float("-inf")
+            healthy = self._healthy(worker)
+            replaced += healthy is not worker
+            self._idle.put(healthy)
+        return replaced
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "disabled": self.disabled,
+                "alive": sum(w.alive() for w in self._workers),
+                "idle": self._idle.qsize(),
+                "calls": self._calls,
+                "failures": self._failures,
+                "restarts": self._restarts,
+                "health_checks": self._health_checks,
+            }
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+
+# Global instance for reuse
+_tesseract_pool: Optional[TesseractPool] = None
+_tesseract_pool_lock = threading.Lock()
+
+
+def get_tesseract_pool() -> Optional[TesseractPool]:
+    """
+    Process-wide worker pool, started on first use. None when
+    settings.tesseract_pool_size is 0, tesserocr is not installed or the
+    pool has disabled itself, in which case callers fork ``tesseract`` per
+    page through pytesseract.
+    """
+    global _tesseract_pool
+    if settings.tesseract_pool_size <= 0 or not tesserocr_available():
+        return None
+    if _tesseract_pool is not None and _tesseract_pool.disabled:
+        return None
+    if _tesseract_pool is None:
+        with _tesseract_pool_lock:
+            if _tesseract_pool is None:
+                _tesseract_pool = TesseractPool(
+                    size=settings.tesseract_pool_size,
+                    timeout_s=settings.tesseract_timeout_s,
+                    health_interval_s=settings.tesseract_health_interval_s,
+                    tessdata=settings.tesseract_tessdata,
+                )
+    return _tesseract_pool
+
+
+def shutdown_tesseract_pool() -> None:
+    global _tesseract_pool
+    with _tesseract_pool_lock:
+        if _tesseract_pool is not None:
+            _tesseract_pool.close()
+            _tesseract_pool = None
+
+
+def tesseract_pool_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the pool if it has been started (does not start it)."""
+    pool = _tesseract_pool
+    return pool.stats() if pool is not None else None
@@ -0,0 +1,101 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+
+from ..core.config import settings
+
+
+def _axis_weights(start: int, stop: int, lo: int, hi: int, size: int, overlap: int) -> np.ndarray:
+    """
+    Blend weights along one axis for the span [lo, hi) of a tile whose own
+    share of the image is [start, stop). Weights ramp linearly across the
+    2 * overlap pixels centred on each inner seam, so two neighbouring tiles
+    always sum to 1 there; image borders keep full weight.
+    """
+    x = np.arange(lo, hi, dtype=np.float32) + 0.5
+    w = np.ones(hi - lo, dtype=np.float32)
+    if overlap <= 0:
+        return ((x >= start) & (x < stop)).astype(np.float32)
+    if start > 0:
+        w = np.minimum(w, np.clip((x - (start - overlap)) / (2 * overlap), 0, 1))
+    if stop < size:
+        w = np.minimum(w, np.clip(((stop + overlap) - x) / (2 * overlap), 0, 1))
+    return w
+
+
+def run_tiled(
+    fn: Callable[[np.ndarray], np.ndarray],
+    img: np.ndarray,
+    halo: int,
+    tile_size: Optional[int] = None,
+    overlap: Optional[int] = None,
+    pool: Optional[ThreadPoolExecutor] = None,
+) -> np.ndarray:
+    """
+    Apply a shape-preserving, per-pixel filter ``fn`` to ``img`` tile by tile
+    on a thread pool (OpenCV releases the GIL, so tiles run on separate cores).
+
+    Each tile is processed with ``halo`` extra pixels of context on every
+    side, at least the filter's footprint, which are discarded afterwards;
+    neighbouring tiles then overlap by ``2 * overlap`` pixels and are
+    feather-blended across the seam.
+    """
+    tile_size = tile_size or settings.preprocessing_tile_size
+    overlap = settings.preprocessing_tile_overlap if overlap is None else overlap
+    h, w = img.shape[:2]
+    if h <= tile_size and w <= tile_size:
+        return fn(img)
+    pool = pool or get_tile_pool()
+
+    tiles = []
+    for y0 in range(0, h, tile_size):
+        for x0 in range(0, w, tile_size):
+            y1, x1 = min(y0 + tile_size, h), min(x0 + tile_size, w)
+            # Blended extent, then the extent actually filtered
+            by0, by1, bx0, bx1 = max(0, y0 - overlap), min(h, y1 + overlap), max(0, x0 - overlap), min(w, x1 + overlap)
+            py0, py1, px0, px1 = max(0, by0 - halo), min(h, by1 + halo), max(0, bx0 - halo), min(w, bx1 + halo)
+            future = pool.submit(fn, img[py0:py1, px0:px1])
+            tiles.append((future, (y0, y1, x0, x1), (by0, by1, bx0, bx1), (py0, py1, px0, px1)))
+
+    acc = np.zeros(img.shape, dtype=np.float32)
+    for future, (y0, y1, x0, x1), (by0, by1, bx0, bx1), (py0, py1, px0, px1) in tiles:
+        out = future.result()
+        if out.shape != (py1 - py0, px1 - px0) + img.shape[2:]:
+            raise ValueError("run_tiled needs a filter that preserves the image shape")
+        crop = out[by0 - py0:by1 - py0, bx0 - px0:bx1 - px0].astype(np.float32)
+        weight = np.outer(_axis_weights(y0, y1, by0, by1, h, overlap), _axis_weights(x0, x1, bx0, bx1, w, overlap))
+        if img.ndim == 3:
+            weight = weight[:, :, None]
+        acc[by0:by1, bx0:bx1] += crop * weight
+
+    if np.issubdtype(img.dtype, np.integer):
+        info = np.iinfo(img.dtype)
+        return np.clip(np.rint(acc), info.min, info.max).astype(img.dtype)
+    return acc.astype(img.dtype)
+
+
+_tile_pool: Optional[ThreadPoolExecutor] = None
+_tile_pool_lock = threading.Lock()
+
+
+def tile_workers() -> int:
+    return settings.preprocessing_tile_workers or os.cpu_count() or 1
+
+
+def should_tile(img: np.ndarray) -> bool:
+    """Tiling only pays off for large images and with more than one worker."""
+    min_pixels = settings.preprocessing_tile_min_pixels
+    return bool(min_pixels) and img.shape[0] * img.shape[1] >= min_pixels and tile_workers() > 1
+
+
+def get_tile_pool() -> ThreadPoolExecutor:
+    """Process-wide pool for tiled preprocessing (one thread per core by default)."""
+    global _tile_pool
+    if _tile_pool is None:
+        with _tile_pool_lock:
+            if _tile_pool is None:
+                _tile_pool = ThreadPoolExecutor(max_workers=tile_workers(), thread_name_prefix="tile")
+    return _tile_pool
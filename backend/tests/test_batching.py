@@ -0,0 +1,74 @@
+import json
+import threading
+import pytest
+import torch
+from PIL import Image
+from backend.app.ml.batching import MicroBatcher
+from backend.app.ml.models.cnn_classifier import DocumentClassifier
+from backend.app.ml.inference_classifier import ClassifierInference
+
+CLASSES = ["invoice", "receipt", "form", "note"]
+
+def test_concurrent_submissions_share_a_batch():
+    seen_batches = []
+    gate = threading.Event()
+
+    def batch_fn(items):
+        seen_batches.append(list(items))
+        return [x * 2 for x in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=200)
+    results = {}
+
+    def call(i):
+        gate.wait()
+        results[i] = batcher(i)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == {i: i * 2 for i in range(4)}
+    assert max(len(b) for b in seen_batches) > 1
+    assert batcher.stats()["items"] == 4
+
+def test_batch_errors_reach_every_caller():
+    def batch_fn(items):
+        raise ValueError("forward failed")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        batcher(1)
+    batcher.close()
+
+def test_cancelled_items_are_skipped():
+    batches = []
+    batcher = MicroBatcher(lambda items: batches.append(items) or items, max_batch_size=2, max_wait_ms=50)
+    fut = batcher.submit("dropped")
+    fut.cancel()
+    assert batcher("kept") == "kept"
+    batcher.close()
+    assert all("dropped" not in b for b in batches)
+
+@pytest.fixture
+def classifier(tmp_path):
+    weights = tmp_path / "best_model.pth"
+    classes = tmp_path / "classes.json"
+    torch.save(DocumentClassifier(num_classes=len(CLASSES), pretrained=False).state_dict(), weights)
+    classes.write_text(json.dumps(CLASSES))
+    clf = ClassifierInference(str(weights), str(classes))
+    yield clf
+    if clf.batcher:
+        clf.batcher.close()
+
+def test_predict_batch_matches_single_predictions(classifier):
+    images = [Image.new("RGB", (120, 160), color=c) for c in ("white", "black", "red")]
+    batched = classifier.predict_batch(images)
+    single = [classifier.predict(img) for img in images]
+    assert [b["document_type"] for b in batched] == [s["document_type"] for s in single]
+    for b, s in zip(batched, single):
+        assert b["confidence"] == pytest.approx(s["confidence"], abs=1e-4)
@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+from backend.app.ml.inference_classifier import ClassifierInference
+from backend.app.services import image_io, ocr_pipeline
+from backend.app.services.image_io import Document, to_pil
+import backend.app.ml.routing.ocr_router as ocr_router_mod
+import backend.app.ml.unified_ocr as unified_ocr_mod
+
+
+def png_bytes():
+    img = np.full((100, 200, 3), 255, dtype=np.uint8)
+    cv2.putText(img, "Total 42", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+    return cv2.imencode(".png", img)[1].tobytes()
+
+
+class CountingDecodes:
+    def __init__(self, monkeypatch):
+        self.decodes = 0
+        self.preprocesses = 0
+        real_decode, real_preprocess = cv2.imdecode, image_io.preprocess
+
+        def decode(*args, **kwargs):
+            self.decodes += 1
+            return real_decode(*args, **kwargs)
+
+        def preprocess(img, profile=None, **kw):
+            self.preprocesses += 1
+            return real_preprocess(img, profile, **kw)
+
+        monkeypatch.setattr(cv2, "imdecode", decode)
+        monkeypatch.setattr(image_io, "preprocess", preprocess)
+
+
+def test_document_views_are_memoized(monkeypatch):
+    counts = CountingDecodes(monkeypatch)
+    doc = Document(png_bytes())
+    assert doc.bgr.shape == (100, 200, 3)
+    assert doc.rgb.size == (200, 100)
+    assert doc.gray.shape == (100, 200)
+    assert doc.thumbnail(50).size == (50, 25)
+    assert doc.thumbnail(50) is doc.thumbnail(50)
+    assert doc.preprocessed() is doc.preprocessed()
+    assert doc.preprocessed("fast") is not doc.preprocessed()
+    assert to_pil(doc) is doc.rgb
+    assert (counts.decodes, doc.decodes, counts.preprocesses) == (1, 1, 2)
+
+
+class FakeClassifier:
+    def predict(self, image):
+        # Goes through the real image loading of the classifier
+        ClassifierInference._load(None, image)
+        return {"document_type": "note", "confidence": 0.9}
+
+
+class FakeTrOCR:
+    def recognize(self, image, cancel=None):
+        to_pil(image)
+        return {"text": "Total 42", "confidence": 0.95}
+
+
+def test_routed_request_with_ensemble_decodes_once(monkeypatch):
+    counts = CountingDecodes(monkeypatch)
+    monkeypatch.setattr(ocr_router_mod, "get_classifier", lambda **kw: FakeClassifier())
+    monkeypatch.setattr(unified_ocr_mod, "get_trocr_model", lambda: FakeTrOCR())
+    easyocr_inputs = []
+
+    def fake_easyocr(img, lang, decoding=None, blocks=None):
+        easyocr_inputs.append(img)
+        return "T0tal 42", 0.4
+
+    monkeypatch.setattr(ocr_pipeline, "_easyocr_text", fake_easyocr)
+
+    ocr = unified_ocr_mod.UnifiedOCR()
+    # Primary EasyOCR is not confident: the ensemble runs TrOCR on the same Document
+    ocr.CONFIDENCE_THRESHOLD = 0.85
+    result = ocr.process(png_bytes())
+    assert result["ensemble_triggered"]
+    assert result["metadata"]["engine_used"] == "ensemble_trocr"
+
+    assert counts.decodes == 1
+    assert counts.preprocesses == 1
+
+    # Re-running EasyOCR on the same Document (fallback path) reuses the preprocessed view
+    doc = Document(png_bytes())
+    ocr._run_easyocr(doc)
+    ocr._run_easyocr(doc)
+    assert easyocr_inputs[-1] is easyocr_inputs[-2]
+    assert (counts.decodes, counts.preprocesses) == (2, 2)
@@ -0,0 +1,106 @@
+import time
+from backend.app.ml.ensemble import EngineCancelled, EnsembleStats
+from backend.app.ml.unified_ocr import UnifiedOCR, get_ensemble_pool, shutdown_ensemble_pool
+
+
+def test_auto_mode_follows_trigger_history():
+    stats = EnsembleStats(min_history=4, parallel_min_rate=0.5)
+    assert stats.choose_mode("receipt", "auto") == "sequential"  # no history yet
+    for triggered in (True, True, True, False):
+        stats.record_trigger("receipt", triggered)
+        stats.record_trigger("invoice", not triggered)
+    assert stats.choose_mode("receipt", "auto") == "parallel"
+    assert stats.choose_mode("invoice", "auto") == "sequential"
+    # Explicit modes always win
+    assert stats.choose_mode("receipt", "sequential") == "sequential"
+    assert stats.choose_mode("invoice", "parallel") == "parallel"
+
+
+def make_engine(monkeypatch, delays, confidences):
+    """UnifiedOCR whose engines sleep in small steps and honour cancellation."""
+    ocr = UnifiedOCR()
+    monkeypatch.setattr(ocr.router, "route", lambda image, **kw: {"document_type": "receipt", "confidence": 0.9, "ocr_engine": "trocr"})
+    runs = {"calls": [], "stopped": [], "cancels": {}}
+
+    def run_engine(engine, image, cancel=None, **kw):
+        runs["calls"].append(engine)
+        runs["cancels"][engine] = cancel
+        deadline = time.perf_counter() + delays[engine]
+        while time.perf_counter() < deadline:
+            if cancel is not None and cancel.wait(0.005):
+                runs["stopped"].append(engine)
+                raise EngineCancelled(engine)
+        return {"text": engine, "confidence": confidences[engine]}
+
+    monkeypatch.setattr(ocr, "_run_engine", run_engine)
+    return ocr, runs
+
+
+def test_parallel_cancels_the_loser_once_one_clears_the_threshold(monkeypatch):
+    # The slow primary would run for a minute unless cancelled
+    ocr, runs = make_engine(monkeypatch, {"trocr": 60, "easyocr": 0.05}, {"trocr": 0.5, "easyocr": 0.95})
+    res = ocr.process(b"ignored", ensemble_mode="parallel")
+    assert res["text"] == "easyocr"
+    assert res["ensemble_triggered"]
+    assert res["metadata"]["engine_used"] == "ensemble_easyocr"
+    assert res["metadata"]["ensemble_mode"] == "parallel"
+    assert res["metadata"]["cancelled_engines"] == ["trocr"]
+    assert runs["cancels"]["trocr"].is_set() and not runs["cancels"]["easyocr"].is_set()
+    # The cancelled primary still counts towards the trigger rate auto mode uses
+    snap = ocr.stats()["ensemble"]["receipt"]
+    assert (snap["requests"], snap["triggered"]) == (1, 1)
+    # The loser stops at its next checkpoint instead of running to the end
+    for _ in range(200):
+        if runs["stopped"]:
+            break
+        time.sleep(0.01)
+    assert runs["stopped"] == ["trocr"]
+
+
+def test_instances_share_one_ensemble_pool(monkeypatch):
+    ocr, _ = make_engine(monkeypatch, {"trocr": 0.01, "easyocr": 0.01}, {"trocr": 0.5, "easyocr": 0.9})
+    pool = get_ensemble_pool()
+    UnifiedOCR()
+    ocr.process(b"ignored", ensemble_mode="parallel")
+    assert get_ensemble_pool() is pool
+    shutdown_ensemble_pool()
+    assert get_ensemble_pool() is not pool
+
+
+def test_parallel_keeps_confident_primary(monkeypatch):
+    ocr, _ = make_engine(monkeypatch, {"trocr": 0.02, "easyocr": 0.4}, {"trocr": 0.9, "easyocr": 0.99})
+    res = ocr.process(b"ignored", ensemble_mode="parallel")
+    assert res["text"] == "trocr"
+    assert not res["ensemble_triggered"]
+    assert res["metadata"]["engine_used"] == "trocr"
+
+
+def test_parallel_picks_most_confident_when_none_clears(monkeypatch):
+    ocr, _ = make_engine(monkeypatch, {"trocr": 0.02, "easyocr": 0.05}, {"trocr": 0.6, "easyocr": 0.7})
+    res = ocr.process(b"ignored", ensemble_mode="parallel")
+    assert res["text"] == "easyocr"
+    assert res["confidence_score"] == 0.7
+    assert "cancelled_engines" not in res["metadata"]
+
+
+def test_modes_are_accounted_per_document_type(monkeypatch):
+    ocr, _ = make_engine(monkeypatch, {"trocr": 0.01, "easyocr": 0.01}, {"trocr": 0.5, "easyocr": 0.9})
+    ocr.process(b"ignored", ensemble_mode="sequential")
+    ocr.process(b"ignored", ensemble_mode="parallel")
+    snap = ocr.stats()["ensemble"]["receipt"]
+    assert snap["requests"] == 2
+    assert snap["triggered"] == 2
+    assert set(snap["modes"]) == {"sequential", "parallel"}
+    assert snap["modes"]["sequential"]["latency"]["count"] == 1
+    assert "engine_cpu_ms" in ocr.process(b"ignored")["metadata"]
+
+
+def test_budget_skips_ensemble_that_would_not_finish(monkeypatch):
+    ocr, runs = make_engine(monkeypatch, {"trocr": 0.01, "easyocr": 0.01}, {"trocr": 0.5, "easyocr": 0.9})
+    ocr.router.costs.observe("easyocr", "receipt", None, 10_000.0)
+    res = ocr.process(b"ignored", ensemble_mode="parallel", budget_ms=500)
+    assert res["text"] == "trocr"
+    assert not res["ensemble_triggered"]
+    assert res["metadata"]["ensemble_skipped"] == "latency_budget"
+    assert res["metadata"]["ensemble_mode"] == "sequential"
+    assert runs["calls"] == ["trocr"]
@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+import cv2
+import numpy as np
+from backend.app.ml.hybrid_ocr import HybridOCR
+
+class FakeReader:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+    def detect(self, img):
+        return [self.boxes], [[]]
+
+class FakePool:
+    def __init__(self, reader):
+        self.reader = reader
+
+    @contextmanager
+    def checkout(self, langs, gpu=None):
+        yield self.reader
+
+class FakeTrOCR:
+    def __init__(self):
+        self.calls = []
+
+    def predict_batch(self, crops):
+        self.calls.append(len(crops))
+        # Encode the crop width so the test can tell which box it was
+        return [{"text": f"w{c.width}", "confidence": 0.9} for c in crops]
+
+def test_reading_order_groups_lines_left_to_right():
+    boxes = [
+        (200, 300, 12, 30),  # line 1, right
+        (10, 100, 10, 30),   # line 1, left
+        (10, 120, 60, 80),   # line 2
+    ]
+    assert HybridOCR.reading_order(boxes) == [[1, 0], [2]]
+
+def test_hybrid_recognises_all_lines_in_one_batch(tmp_path):
+    img = np.full((120, 400, 3), 255, dtype=np.uint8)
+    path = str(tmp_path / "form.png")
+    cv2.imwrite(path, img)
+
+    boxes = [(200, 300, 12, 30), (10, 100, 10, 30), (10, 120, 60, 80)]
+    trocr = FakeTrOCR()
+    engine = HybridOCR(reader_pool=FakePool(FakeReader(boxes)), trocr_getter=lambda: trocr, margin=0)
+    res = engine.process(path)
+
+    assert trocr.calls == [3]
+    assert res["text"] == "w90 w100\nw110"
+    assert res["confidence"] == 0.9
+    assert set(res["stage_timings_ms"]) == {"decode_ms", "detect_ms", "crop_ms", "recognize_ms", "assemble_ms"}
+
+def test_hybrid_without_detections_returns_empty(tmp_path):
+    path = str(tmp_path / "blank.png")
+    cv2.imwrite(path, np.full((50, 50, 3), 255, dtype=np.uint8))
+    trocr = FakeTrOCR()
+    res = HybridOCR(reader_pool=FakePool(FakeReader([])), trocr_getter=lambda: trocr).process(path)
+    assert res["text"] == ""
+    assert res["confidence"] == 0.0
+    assert trocr.calls == []
+
+def test_unified_ocr_dispatches_form_to_hybrid(monkeypatch):
+    from backend.app.ml.unified_ocr import UnifiedOCR
+
+    engine = UnifiedOCR()
+    monkeypatch.setattr(engine.router, "route", lambda path, **kw: {"document_type": "form", "confidence": 0.9, "ocr_engine": "hybrid"})
+    monkeypatch.setattr(engine.hybrid, "process", lambda path, cancel=None: {"text": "Name: Jane", "confidence": 0.5, "stage_timings_ms": {"detect_ms": 1.0}})
+    monkeypatch.setattr(engine, "_run_easyocr", lambda path, profile=None: {"text": "Name Jane", "confidence": 0.4})
+
+    res = engine.process("form.png")
+    assert res["text"] == "Name: Jane"
+    assert res["ensemble_triggered"]
+    assert res["metadata"]["engine_used"] == "ensemble_hybrid"
+    assert "hybrid_ms" in res["metadata"]["stage_timings_ms"]
+    assert "easyocr_ms" in res["metadata"]["stage_timings_ms"]
+    assert res["metadata"]["hybrid_stage_timings_ms"] == {"detect_ms": 1.0}
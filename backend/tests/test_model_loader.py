@@ -0,0 +1,63 @@
+import threading
+import time
+import pytest
+from backend.app.ml.model_loader import LazyModel, NOT_LOADED, READY, FAILED
+from backend.app.core.telemetry import LatencyStats
+
+def test_concurrent_first_calls_load_once():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    slot = LazyModel("dummy", factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slot.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len({id(r) for r in results}) == 1
+    assert slot.state == READY
+    assert slot.status()["load_time_ms"] is not None
+
+def test_unavailable_model_is_retried():
+    available = {"ready": False}
+    slot = LazyModel("dummy", lambda: object() if available["ready"] else None)
+    assert slot.get() is None
+    assert slot.state == NOT_LOADED
+    available["ready"] = True
+    assert slot.get() is not None
+    assert slot.state == READY
+
+def test_failed_load_is_sticky():
+    def factory():
+        raise IOError("corrupt weights")
+
+    slot = LazyModel("dummy", factory)
+    with pytest.raises(IOError):
+        slot.get()
+    assert slot.state == FAILED
+    with pytest.raises(RuntimeError):
+        slot.get()
+
+def test_check_marks_instance_failed():
+    slot = LazyModel("dummy", lambda: "model", check=lambda m: "no weights")
+    assert slot.get() == "model"
+    assert slot.state == FAILED
+    assert slot.error == "no weights"
+
+def test_latency_stats_separates_cold_start():
+    stats = LatencyStats()
+    assert stats.record(900.0) is True
+    for ms in (10.0, 20.0, 30.0):
+        assert stats.record(ms) is False
+    snap = stats.snapshot()
+    assert snap["cold_start_ms"] == 900.0
+    assert snap["steady_state"]["count"] == 3
+    assert snap["steady_state"]["mean_ms"] == 20.0
+    assert snap["steady_state"]["max_ms"] == 30.0
@@ -38,3 +38,64 @@ class TestOCRRouter:
         router = OCRRouter()
         result = router.route("nonexistent.jpg")
         assert "error" in result
+
+
+    @patch('backend.app.ml.routing.ocr_router.os.path.exists')
+    @patch('backend.app.ml.routing.ocr_router.get_classifier')
+    def test_preprocessing_level_per_doc_type(self, mock_get_classifier, mock_exists, monkeypatch):
+        from backend.app.core.config import settings
+        mock_classifier = MagicMock()
+        mock_get_classifier.return_value = mock_classifier
+        mock_exists.return_value = True
+        router = OCRRouter()
+
+        mock_classifier.predict.return_value = {"document_type": "note", "confidence": 0.9}
+        assert router.route("dummy_path.jpg")["preprocessing_level"] == "quality"
+        mock_classifier.predict.return_value = {"document_type": "receipt", "confidence": 0.9}
+        assert router.route("dummy_path.jpg")["preprocessing_level"] == "balanced"
+        # Settings override the routing table
+        monkeypatch.setattr(settings, "preprocessing_profile_by_doc_type", {"receipt": "fast"})
+        assert router.route("dummy_path.jpg")["preprocessing_level"] == "fast"
+        # Low confidence falls back to the default profile
+        monkeypatch.setattr(settings, "preprocessing_profile", "balanced")
+        mock_classifier.predict.return_value = {"document_type": "receipt", "confidence": 0.2}
+        assert router.route("dummy_path.jpg")["preprocessing_level"] == "balanced"
+
+
+class TestLatencyBudget:
+
+    def test_cost_model_falls_back_from_specific_to_prior(self):
+        from backend.app.ml.routing.cost_model import EngineCostModel
+        costs = EngineCostModel(alpha=0.5)
+        assert costs.estimate("trocr", "invoice", 1_000_000) == (EngineCostModel.PRIORS_MS["trocr"], "prior")
+        costs.observe("trocr", "invoice", 1_000_000, 100.0)
+        costs.observe("trocr", "invoice", 1_000_000, 200.0)
+        assert costs.estimate("trocr", "invoice", 1_000_000) == (150.0, "doc_type+size")
+        assert costs.estimate("trocr", "receipt", 1_000_000)[1] == "size"
+        assert costs.estimate("trocr", "receipt", 50_000_000)[1] == "engine"
+
+    @patch('backend.app.ml.routing.ocr_router.get_classifier')
+    def test_budget_swaps_in_an_engine_that_fits(self, mock_get_classifier):
+        import numpy as np
+        mock_classifier = MagicMock()
+        mock_classifier.predict.return_value = {"document_type": "invoice", "confidence": 0.9}
+        mock_get_classifier.return_value = mock_classifier
+        router = OCRRouter()
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        router.costs.observe("trocr", "invoice", 10_000, 5000.0)
+        router.costs.observe("easyocr", "invoice", 10_000, 300.0)
+
+        assert "budget_ms" not in router.route(image)
+        result = router.route(image, budget_ms=1000)
+        assert result["ocr_engine"] == "easyocr"
+        assert result["budget_ms"] == 1000
+        assert result["estimated_ms"] == 300.0
+        assert result["engine_estimates_ms"]["trocr"] == 5000.0
+        # Nothing fits: cheapest engine
+        assert router.route(image, budget_ms=10)["ocr_engine"] == "easyocr"
+        # Plenty of time: the routed engine
+        assert router.route(image, budget_ms=60000)["ocr_engine"] == "trocr"
+        # The caller already spent most of the budget (decoding, quality gate)
+        import time
+        result = router.route(image, budget_ms=60000, deadline=time.perf_counter() + 1)
+        assert result["ocr_engine"] == "easyocr" and result["remaining_ms"] <= 1000
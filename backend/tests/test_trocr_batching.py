@@ -0,0 +1,55 @@
+import threading
+from PIL import Image
+from backend.app.ml.batching import MicroBatcher
+from backend.app.ml.transformer.inference_trocr import TrOCRInference
+
+def make_trocr(batch_size=4, wait_ms=100):
+    """TrOCRInference with generate() replaced by a recorder (no weights needed)."""
+    trocr = TrOCRInference.__new__(TrOCRInference)
+    trocr.loaded = True
+    trocr.batches = []
+
+    def fake_generate(images):
+        trocr.batches.append(len(images))
+        return [{"text": f"{img.width}px", "confidence": 0.9} for img in images]
+
+    trocr._generate_batch = fake_generate
+    trocr.batcher = MicroBatcher(fake_generate, max_batch_size=batch_size, max_wait_ms=wait_ms)
+    return trocr
+
+def test_predict_batch_chunks_and_keeps_order():
+    trocr = make_trocr()
+    images = [Image.new("RGB", (10 + i, 10)) for i in range(5)]
+    results = trocr.predict_batch(images, batch_size=2)
+    assert trocr.batches == [2, 2, 1]
+    assert [r["text"] for r in results] == [f"{10 + i}px" for i in range(5)]
+
+def test_concurrent_recognize_calls_share_generate():
+    trocr = make_trocr(batch_size=4, wait_ms=200)
+    gate = threading.Event()
+    results = []
+
+    def call():
+        gate.wait()
+        results.append(trocr.recognize(Image.new("RGB", (20, 10))))
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+    trocr.batcher.close()
+
+    assert len(results) == 4
+    assert sum(trocr.batches) == 4
+    assert max(trocr.batches) > 1
+
+def test_unloaded_model_reports_errors_per_item():
+    trocr = TrOCRInference.__new__(TrOCRInference)
+    trocr.loaded = False
+    trocr.load_error = "offline"
+    results = trocr.predict_batch([Image.new("RGB", (5, 5))] * 2)
+    assert len(results) == 2
+    assert all("offline" in r["error"] for r in results)
+    assert "error" in trocr.recognize(Image.new("RGB", (5, 5)))
@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+from tabulate import tabulate
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import torch
+from PIL import Image
+from backend.app.core.config import settings
+from backend.app.ml.models.cnn_classifier import DocumentClassifier
+from backend.app.ml.inference_classifier import ClassifierInference
+
+CLASSES = ["invoice", "receipt", "form", "note"]
+
+# (max_batch_size, max_wait_ms); batch size 1 is the unbatched baseline
+CONFIGS = [(1, 0.0), (4, 2.0), (8, 5.0), (16, 10.0)]
+
+
+def build_artifacts(model_dir: str, model_path: str = None):
+    """Use trained weights if given, otherwise random weights of the same architecture."""
+    if model_path:
+        return model_path, os.path.join(os.path.dirname(model_path), "classes.json")
+    weights = os.path.join(model_dir, "best_model.pth")
+    classes = os.path.join(model_dir, "classes.json")
+    torch.save(DocumentClassifier(num_classes=len(CLASSES), pretrained=False).state_dict(), weights)
+    with open(classes, "w") as f:
+        json.dump(CLASSES, f)
+    return weights, classes
+
+
+def run_config(weights: str, classes: str, batch_size: int, wait_ms: float, clients: int, requests: int):
+    settings.classifier_batch_size = batch_size
+    settings.classifier_batch_wait_ms = wait_ms
+    classifier = ClassifierInference(weights, classes)
+    image = Image.new("RGB", (850, 1100), color="white")
+    classifier.predict(image)  # warm-up
+
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        for _ in range(requests):
+            start = time.perf_counter()
+            classifier.predict(image)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    stats = classifier.batcher.stats() if classifier.batcher else {"mean_batch_size": 1.0}
+    if classifier.batcher:
+        classifier.batcher.close()
+    return {
+        "batch_size": batch_size,
+        "wait_ms": wait_ms,
+        "throughput_ips": len(latencies) / wall,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "mean_batch": stats["mean_batch_size"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classifier micro-batching throughput vs latency benchmark")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent callers")
+    parser.add_argument("--requests", type=int, default=16, help="Predictions per caller")
+    parser.add_argument("--model_path", default=None, help="Trained best_model.pth (random weights if omitted)")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        weights, classes = build_artifacts(tmp, args.model_path)
+        rows = []
+        for batch_size, wait_ms in CONFIGS:
+            r = run_config(weights, classes, batch_size, wait_ms, args.clients, args.requests)
+            rows.append([
+                r["batch_size"], r["wait_ms"], f"{r['throughput_ips']:.1f}",
+                f"{r['p50_ms']:.1f}", f"{r['p95_ms']:.1f}", f"{r['mean_batch']:.2f}",
+            ])
+
+    print(f"\n{args.clients} clients x {args.requests} requests, torch threads={torch.get_num_threads()}")
+    print(tabulate(rows, headers=["Batch", "Wait (ms)", "Img/s", "p50 (ms)", "p95 (ms)", "Mean batch"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
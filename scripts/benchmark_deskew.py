@@ -0,0 +1,79 @@
+import sys
+import os
+import time
+import argparse
+import tracemalloc
+from tabulate import tabulate
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+from backend.app.services.preprocessing import deskew, estimate_skew
+
+
+def legacy_deskew(img: np.ndarray):
+    """The previous full-resolution minAreaRect deskew; returns (image, angle it rotated by)."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    thresh = cv2.threshold(cv2.bitwise_not(gray), 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+    coords = np.column_stack(np.where(thresh > 0))
+    if len(coords) < 10:
+        return img, 0.0
+    angle = cv2.minAreaRect(coords)[-1]
+    angle = -(90 + angle) if angle < -45 else -angle
+    if abs(angle) > 15:
+        return img, 0.0
+    h, w = img.shape[:2]
+    m = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    return cv2.warpAffine(img, m, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE), angle
+
+
+def make_page(width: int, height: int, angle: float) -> np.ndarray:
+    page = np.full((height, width), 245, dtype=np.uint8)
+    for i, y in enumerate(range(150, height - 100, 60)):
+        cv2.putText(page, f"Line {i}: Invoice 2024-{i:04d} qty 3 x 19.99 = 59.97 total", (100, y), cv2.FONT_HERSHEY_SIMPLEX, 1.5, 20, 3)
+    m = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(page, m, (width, height), borderValue=245)
+
+
+def measure(fn, img):
+    """(result, ms, peak traced MB) of fn(img)."""
+    tracemalloc.start()
+    t = time.perf_counter()
+    out = fn(img)
+    ms = (time.perf_counter() - t) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return out, ms, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deskew: full-resolution minAreaRect vs thumbnail projection profiles")
+    parser.add_argument("--width", type=int, default=2480, help="Default: A4 at 300 DPI")
+    parser.add_argument("--height", type=int, default=3508)
+    parser.add_argument("--angles", default="0,0.2,1,-3,8")
+    args = parser.parse_args()
+
+    rows = []
+    for angle in [float(a) for a in args.angles.split(",")]:
+        page = make_page(args.width, args.height, angle)
+        (_, legacy_angle), legacy_ms, legacy_mb = measure(legacy_deskew, page)
+        _, new_ms, new_mb = measure(deskew, page)
+        # The page was rotated by +angle; a correct deskew rotates by -angle
+        new_angle = estimate_skew(page)
+        rows.append([
+            angle,
+            f"{legacy_ms:.0f}", f"{legacy_mb:.0f}", f"{abs(legacy_angle + angle):.2f}",
+            f"{new_ms:.0f}", f"{new_mb:.0f}", f"{abs(new_angle - angle):.2f}",
+        ])
+
+    print(f"\nPage {args.width}x{args.height}; peak memory = numpy/Python allocations traced by tracemalloc")
+    print(tabulate(rows, headers=[
+        "True angle", "minAreaRect ms", "peak MB", "angle error",
+        "projection ms", "peak MB", "angle error",
+    ], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
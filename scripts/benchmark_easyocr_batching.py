@@ -0,0 +1,141 @@
+import sys
+import os
+import time
+import argparse
+import threading
+from tabulate import tabulate
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import torch
+from easyocr.config import recognition_models
+from easyocr.model.vgg_model import Model
+from easyocr.utils import CTCLabelConverter
+from backend.app.core.config import settings
+from backend.app.services import easyocr_decoding
+from backend.app.services.easyocr_decoding import readtext
+
+CHARACTERS = recognition_models["gen2"]["english_g2"]["characters"]
+
+# (max_batch_size, max_wait_ms); batch size 1 recognizes each image's crops one by one
+CONFIGS = [(1, 0.0), (4, 2.0), (8, 5.0), (16, 5.0), (32, 10.0)]
+
+
+class UntrainedReader:
+    """EasyOCR's English recognizer with random weights and a projection-profile stand-in for CRAFT."""
+    model_lang = "english"
+    device = "cpu"
+    character = CHARACTERS
+    lang_char = CHARACTERS
+
+    def __init__(self):
+        torch.manual_seed(0)
+        self.recognizer = Model(1, 256, 256, len(CHARACTERS) + 1)
+        self.converter = CTCLabelConverter(CHARACTERS)
+
+    def detect(self, img, reformat=True):
+        ink = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) < 128
+        rows = np.flatnonzero(ink.any(axis=1))
+        boxes = []
+        for run in np.split(rows, np.flatnonzero(np.diff(rows) > 1) + 1):
+            if len(run):
+                cols = np.flatnonzero(ink[run[0]:run[-1] + 1].any(axis=0))
+                boxes.append([int(cols[0]) - 5, int(cols[-1]) + 5, int(run[0]) - 5, int(run[-1]) + 5])
+        return [boxes], [[]]
+
+
+def receipts(count: int, seed: int = 0):
+    """Small grayscale receipts of 2-8 lines of varying length, like phone photos of till slips."""
+    rng = np.random.default_rng(seed)
+    pages = []
+    for _ in range(count):
+        lines = int(rng.integers(2, 9))
+        page = np.full((40 * lines + 20, 600), 240, dtype=np.uint8)
+        for i in range(lines):
+            text = " ".join(["Item"] * int(rng.integers(1, 4))) + f" {rng.uniform(1, 99):.2f}"
+            cv2.putText(page, text, (20, 40 * i + 35), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+        pages.append(page)
+    return pages
+
+
+def run_config(reader, pages, batch_size: int, wait_ms: float, clients: int):
+    settings.easyocr_batch_size = batch_size
+    settings.easyocr_batch_wait_ms = wait_ms
+    easyocr_decoding._crop_batcher = None
+    readtext(reader, pages[0], decoder="greedy")  # warm-up
+
+    latencies, crops, batched = [], [], []
+    lock = threading.Lock()
+    todo = list(range(len(pages)))
+
+    def client():
+        while True:
+            with lock:
+                if not todo:
+                    return
+                page = pages[todo.pop()]
+            stats = {}
+            start = time.perf_counter()
+            readtext(reader, page, decoder="greedy", stats=stats)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                crops.append(stats["crops"])
+                batched.append(stats["mean_recognizer_batch"] * stats["crops"])
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    batcher = easyocr_decoding.get_crop_batcher()
+    pooled = batcher.stats()["mean_batch_size"] if batcher else 1.0
+    if batcher:
+        batcher.close()
+    latencies.sort()
+    return {
+        "batch_size": batch_size,
+        "wait_ms": wait_ms,
+        "images_per_s": len(latencies) / wall,
+        "crops_per_s": sum(crops) / wall,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "mean_pooled": pooled,
+        # Crops only share a recognizer pass with crops of the same width
+        "mean_forward": sum(batched) / sum(crops),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EasyOCR recognition batched across images: throughput vs latency")
+    parser.add_argument("--images", type=int, default=48, help="Synthetic receipts to recognize")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent callers (pages or requests)")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    reader, pages = UntrainedReader(), receipts(args.images)
+    rows, baseline = [], None
+    for batch_size, wait_ms in CONFIGS:
+        r = run_config(reader, pages, batch_size, wait_ms, args.clients)
+        baseline = baseline or r["images_per_s"]
+        rows.append([
+            r["batch_size"], r["wait_ms"], f"{r['images_per_s']:.2f}", f"{r['crops_per_s']:.1f}",
+            f"{r['p50_ms']:.0f}", f"{r['p95_ms']:.0f}", f"{r['mean_pooled']:.2f}", f"{r['mean_forward']:.2f}", f"{r['images_per_s'] / baseline:.2f}x",
+        ])
+
+    print(f"\n{args.images} receipts, {args.clients} clients, torch threads={torch.get_num_threads()}")
+    print(tabulate(rows, headers=["Batch", "Wait (ms)", "Img/s", "Crops/s", "p50 (ms)", "p95 (ms)", "Crops pooled", "Crops/forward", "Speedup"], tablefmt="grid"))
+    print("Detection is the stand-in above; untrained weights: times are real, texts are not.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import sys
+import os
+import time
+import argparse
+from tabulate import tabulate
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+from easyocr.utils import get_paragraph
+from backend.app.ml.dataset_loader import load_dataset
+from backend.app.ml.metrics import compute_cer
+from backend.app.ml.unified_ocr import UnifiedOCR
+from backend.app.services.layout import group_words, page_text, weighted_confidence
+from backend.app.services.postprocessing import clean_text
+from backend.app.services.preprocessing import preprocess
+from backend.app.services.reader_pool import get_reader_pool
+
+
+def synthetic_page(lines: int, words_per_line: int, seed: int = 0):
+    """Shuffled word detections (bbox, text, confidence) of a page of jittered text lines."""
+    rng = np.random.default_rng(seed)
+    dets = []
+    for r in range(lines):
+        for c in range(words_per_line):
+            x, y = 10 + 70 * c + rng.uniform(-2, 2), 10 + 32 * r + rng.uniform(-2, 2)
+            dets.append(([[x, y], [x + 60, y], [x + 60, y + 22], [x, y + 22]], "word", float(rng.uniform(0.5, 1.0))))
+    return [dets[i] for i in rng.permutation(len(dets))]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+def grouping_speed(sizes, repeat: int):
+    rows = []
+    for lines, words in sizes:
+        dets = synthetic_page(lines, words)
+        ours = timed(lambda: group_words(dets), repeat)
+        # EasyOCR's pairwise merging is quadratic: time it once on big pages
+        theirs = timed(lambda: get_paragraph(dets), 1 if len(dets) > 1000 else repeat)
+        rows.append([len(dets), f"{theirs:.1f}", f"{ours:.1f}", f"{theirs / ours:.1f}x"])
+    print("\nGrouping time on synthetic pages (best of runs)")
+    print(tabulate(rows, headers=["Words", "paragraph=True ms", "group_words ms", "Speedup"], tablefmt="grid"))
+
+
+def trigger_rate(dataset: str, profile: str, lang: str):
+    items = load_dataset(os.path.abspath(dataset))
+    threshold = UnifiedOCR.CONFIDENCE_THRESHOLD
+    rows, old_triggers, new_triggers = [], 0, 0
+    for item in items:
+        img = preprocess(cv2.imread(item.image_path, cv2.IMREAD_COLOR), profile)
+        try:
+            with get_reader_pool().checkout([lang]) as reader:
+                raw = reader.readtext(img, decoder="beamsearch")
+        except Exception as e:
+            print(f"\nEasyOCR unavailable ({e}); ensemble trigger rate not measured")
+            return
+        # Before: paragraph=True results carry no confidence, so the page scored 0.0
+        old_text = "\n".join(p[1] for p in get_paragraph(raw))
+        paragraphs = group_words(raw)
+        new_text, new_conf = page_text(paragraphs), weighted_confidence(paragraphs)
+        old_triggers += 1
+        new_triggers += new_conf < threshold
+        rows.append([
+            item.filename, "0.000", f"{new_conf:.3f}",
+            f"{compute_cer(item.ground_truth, clean_text(old_text)):.4f}",
+            f"{compute_cer(item.ground_truth, clean_text(new_text)):.4f}",
+        ])
+    print(f"\nEnsemble triggers on {dataset} ('{profile}' profile, threshold {threshold})")
+    print(tabulate(rows, headers=["Image", "Conf before", "Conf after", "CER before", "CER after"], tablefmt="grid"))
+    print(f"Trigger rate: {old_triggers}/{len(rows)} before, {new_triggers}/{len(rows)} after")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Word grouping: EasyOCR paragraph mode vs group_words, and the ensemble trigger rate")
+    parser.add_argument("--dataset", default="datasets/ocr_eval")
+    parser.add_argument("--profile", default="quality")
+    parser.add_argument("--lang", default="en")
+    parser.add_argument("--sizes", default="10x10,40x15,100x20,200x25", help="Synthetic pages as LINESxWORDS")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    grouping_speed([tuple(int(n) for n in s.split("x")) for s in args.sizes.split(",")], args.repeat)
+    trigger_rate(args.dataset, args.profile, args.lang)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import sys
+import os
+import time
+import argparse
+from tabulate import tabulate
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+from backend.app.ml.dataset_loader import load_dataset
+from backend.app.ml.metrics import compute_cer
+from backend.app.services.preprocessing import PROFILES, preprocess
+from backend.app.services.postprocessing import clean_text
+from backend.app.services import ocr_pipeline
+from backend.app.services.tesseract_pool import shutdown_tesseract_pool
+
+ENGINES = {"easyocr": ocr_pipeline._easyocr_text, "tesseract": ocr_pipeline._tesseract_text}
+
+
+def recognize(img, lang: str, engine: str):
+    """Engine text for a preprocessed image, or None when the engine is not available."""
+    try:
+        return ENGINES[engine](img, lang)[0]
+    except Exception as e:
+        print(f"{engine} unavailable ({e}); CER will be reported as n/a")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessing profiles: time per stage and CER on an evaluation set")
+    parser.add_argument("--dataset", default="datasets/ocr_eval", help="Path to dataset directory")
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--repeat", type=int, default=5, help="Timed preprocessing runs per image")
+    parser.add_argument("--scale", type=float, default=1.0, help="Resize inputs first, e.g. 4 to approximate full-page scans")
+    parser.add_argument("--no_ocr", action="store_true", help="Only time preprocessing")
+    parser.add_argument("--lang", default="en")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="easyocr", help="Engine the CER is measured with")
+    args = parser.parse_args()
+
+    items = load_dataset(os.path.abspath(args.dataset))
+    if not items:
+        print("No dataset items found")
+        return
+    images = []
+    for item in items:
+        img = cv2.imread(item.image_path, cv2.IMREAD_COLOR)
+        if args.scale != 1.0:
+            img = cv2.resize(img, None, fx=args.scale, fy=args.scale, interpolation=cv2.INTER_CUBIC)
+        images.append((item, img))
+
+    ocr_available = not args.no_ocr
+    rows, stage_rows = [], []
+    for profile in args.profiles.split(","):
+        stage_totals = {}
+        total_ms = 0.0
+        cers = []
+        for item, img in images:
+            for _ in range(args.repeat):
+                timings = {}
+                t = time.perf_counter()
+                out = preprocess(img, profile, timings=timings)
+                total_ms += (time.perf_counter() - t) * 1000
+                for stage, ms in timings.items():
+                    stage_totals[stage] = stage_totals.get(stage, 0.0) + ms
+            if ocr_available:
+                text = recognize(out, args.lang, args.engine)
+                if text is None:
+                    ocr_available = False
+                else:
+                    cers.append(compute_cer(item.ground_truth, clean_text(text)))
+        runs = len(images) * args.repeat
+        cer = f"{sum(cers) / len(cers):.4f}" if cers and ocr_available else "n/a"
+        h, w = out.shape[:2]
+        rows.append([profile, f"{total_ms / runs:.1f}", f"{w}x{h}", cer])
+        stage_rows.extend([profile, stage, f"{ms / runs:.2f}"] for stage, ms in stage_totals.items())
+
+    shutdown_tesseract_pool()
+    h, w = images[0][1].shape[:2]
+    print(f"\nDataset: {args.dataset} ({len(images)} images, first {w}x{h}), {args.repeat} runs per image")
+    print(tabulate(rows, headers=["Profile", "Preprocess ms/img", "Output (last img)", f"CER ({args.engine})"], tablefmt="grid"))
+    print(tabulate(stage_rows, headers=["Profile", "Stage", "ms/img"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+import argparse
+from tabulate import tabulate
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+from backend.app.ml.dataset_loader import load_dataset
+from backend.app.services.preprocessing import PROFILES, normalize_resolution, preprocess
+
+
+def make_page(width: int, height: int, font_scale: float) -> np.ndarray:
+    page = np.full((height, width, 3), 245, dtype=np.uint8)
+    thickness = max(1, int(font_scale * 2))
+    for i, y in enumerate(range(int(60 * font_scale) + 20, height - 20, int(60 * font_scale))):
+        cv2.putText(page, f"Item {i} qty 2 x 4.99 = 9.98 total", (20, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (20, 20, 20), thickness)
+    return page
+
+
+def samples(dataset: str):
+    yield "receipt strip 900x3000, small text", make_page(900, 3000, 0.6)
+    yield "receipt strip 900x3000, large text", make_page(900, 3000, 1.6)
+    yield "A4 300 DPI, body text", make_page(2480, 3508, 1.0)
+    yield "A4 300 DPI, large print", make_page(2480, 3508, 3.0)
+    if os.path.isdir(dataset):
+        for item in load_dataset(dataset):
+            yield item.filename, cv2.imread(item.image_path, cv2.IMREAD_COLOR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text-height resolution normalisation vs the fixed 2x upscale")
+    parser.add_argument("--dataset", default="datasets/ocr_eval")
+    parser.add_argument("--profile", default="balanced", choices=list(PROFILES), help="Profile timed with each resizing stage")
+    args = parser.parse_args()
+
+    # The profile with its first stage swapped for the previous fixed rule
+    legacy = ["upscale" if s == "normalize" else s for s in PROFILES[args.profile]]
+
+    rows = []
+    total_fixed, total_out = 0, 0
+    for name, img in samples(os.path.abspath(args.dataset)):
+        out, report = normalize_resolution(img)
+        fixed = report["pixels_out"] + report["pixels_saved_vs_fixed_2x"]
+        total_fixed += fixed
+        total_out += report["pixels_out"]
+        t = time.perf_counter()
+        preprocess(img, args.profile, stages=legacy)
+        legacy_ms = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        preprocess(img, args.profile)
+        new_ms = (time.perf_counter() - t) * 1000
+        h, w = img.shape[:2]
+        rows.append([
+            name, f"{w}x{h}", report["text_height_px"], report["scale"],
+            f"{fixed / 1e6:.2f}", f"{report['pixels_out'] / 1e6:.2f}", f"{legacy_ms:.0f}", f"{new_ms:.0f}",
+        ])
+
+    print(f"\nProfile '{args.profile}': fixed 2x upscale ({' > '.join(legacy)}) vs text-height normalisation")
+    print(tabulate(rows, headers=[
+        "Image", "Size", "Text px", "Scale", "MP (fixed 2x)", "MP (normalised)", "ms (fixed 2x)", "ms (normalised)",
+    ], tablefmt="grid"))
+    print(f"Total: {total_fixed / 1e6:.2f} MP -> {total_out / 1e6:.2f} MP ({(total_fixed - total_out) / 1e6:+.2f} MP saved)")
+
+
+if __name__ == "__main__":
+    main()
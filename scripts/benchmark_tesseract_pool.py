@@ -0,0 +1,88 @@
+import sys
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from tabulate import tabulate
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import pytesseract
+from backend.app.ml.dataset_loader import load_dataset
+from backend.app.services.tesseract_pool import TesseractPool, tesserocr_available
+
+
+def pages(dataset: str, count: int):
+    """Dataset images if there are any, otherwise synthetic invoice pages."""
+    items = load_dataset(os.path.abspath(dataset)) if os.path.isdir(dataset) else []
+    if items:
+        imgs = [cv2.imread(item.image_path, cv2.IMREAD_GRAYSCALE) for item in items]
+        return [imgs[i % len(imgs)] for i in range(count)]
+    out = []
+    for i in range(count):
+        page = np.full((1100, 850), 245, dtype=np.uint8)
+        for line in range(25):
+            cv2.putText(page, f"Item {i}-{line} qty 2 x {line * 3.7:.2f} EUR", (40, 60 + 40 * line), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+        out.append(page)
+    return out
+
+
+def fork_per_call(img: np.ndarray, lang: str):
+    return pytesseract.image_to_data(img, lang=lang, output_type=pytesseract.Output.DICT)
+
+
+def measure(fn, imgs, clients: int):
+    latencies = []
+
+    def timed(img):
+        t = time.perf_counter()
+        fn(img)
+        latencies.append((time.perf_counter() - t) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as ex:
+        list(ex.map(timed, imgs))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return [f"{latencies[len(latencies) // 2]:.0f}", f"{latencies[int(len(latencies) * 0.95) - 1]:.0f}", f"{len(imgs) / wall:.2f}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tesseract: pytesseract fork per call vs persistent worker pool")
+    parser.add_argument("--dataset", default="datasets/ocr_eval")
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--pool_sizes", default="1,2,4")
+    args = parser.parse_args()
+
+    imgs = pages(args.dataset, args.pages)
+    rows = []
+    try:
+        fork_per_call(imgs[0], args.lang)  # warm the page cache for the binary and traineddata
+        for clients in sorted({1, *[int(s) for s in args.pool_sizes.split(",")]}):
+            rows.append([f"fork per call, {clients} client(s)", *measure(lambda img: fork_per_call(img, args.lang), imgs, clients)])
+    except pytesseract.TesseractNotFoundError:
+        print("tesseract binary not found: fork-per-call baseline skipped")
+
+    if tesserocr_available():
+        for size in [int(s) for s in args.pool_sizes.split(",")]:
+            pool = TesseractPool(size=size)
+            try:
+                # Workers load traineddata on their first page: not part of steady-state latency
+                with ThreadPoolExecutor(max_workers=size) as ex:
+                    list(ex.map(lambda img: pool.image_to_data(img, args.lang), imgs[:size]))
+                rows.append([f"pool of {size}, {size} client(s)", *measure(lambda img: pool.image_to_data(img, args.lang), imgs, size)])
+            finally:
+                pool.close()
+    else:
+        print("tesserocr not installed: worker pool skipped")
+
+    print(f"\n{len(imgs)} pages of {imgs[0].shape[1]}x{imgs[0].shape[0]}, lang={args.lang}")
+    print(tabulate(rows, headers=["Mode", "p50 ms/page", "p95 ms/page", "Pages/s"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
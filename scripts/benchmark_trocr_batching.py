@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+import argparse
+import threading
+from tabulate import tabulate
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import torch
+from PIL import Image, ImageDraw
+from backend.app.ml.transformer.inference_trocr import TrOCRInference, DEFAULT_TROCR_MODEL
+
+
+def make_line(i: int) -> Image.Image:
+    img = Image.new("RGB", (384, 64), color="white")
+    ImageDraw.Draw(img).text((8, 24), f"Invoice line {i}: 2 x 19.99 = 39.98", fill="black")
+    return img
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TrOCR throughput per CPU core: single vs batched generate()")
+    parser.add_argument("--model_path", default=DEFAULT_TROCR_MODEL)
+    parser.add_argument("--images", type=int, default=32, help="Line images per run")
+    parser.add_argument("--batch_sizes", default="1,4,8,16")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent recognize() callers for the coalescing run")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads (defaults to all cores)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    cores = torch.get_num_threads()
+
+    trocr = TrOCRInference(args.model_path)
+    if not trocr.loaded:
+        print(f"Could not load model: {trocr.load_error}")
+        return
+
+    images = [make_line(i) for i in range(args.images)]
+    trocr.predict_batch(images[:1])  # warm-up
+
+    rows = []
+    for bs in [int(b) for b in args.batch_sizes.split(",")]:
+        start = time.perf_counter()
+        trocr.predict_batch(images, batch_size=bs)
+        wall = time.perf_counter() - start
+        ips = len(images) / wall
+        rows.append([f"predict_batch (bs={bs})", f"{ips:.2f}", f"{ips / cores:.2f}", f"{wall / len(images) * 1000:.0f}"])
+
+    # Coalescing: independent single-image callers sharing batches
+    latencies = []
+    lock = threading.Lock()
+    per_client = max(1, args.images // args.clients)
+
+    def client(offset: int):
+        for j in range(per_client):
+            t0 = time.perf_counter()
+            trocr.recognize(images[(offset + j) % len(images)])
+            with lock:
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    threads = [threading.Thread(target=client, args=(c * per_client,)) for c in range(args.clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    ips = len(latencies) / wall
+    latencies.sort()
+    rows.append([
+        f"recognize x{args.clients} clients (bs={trocr.batcher.max_batch_size})",
+        f"{ips:.2f}", f"{ips / cores:.2f}", f"p50 {latencies[len(latencies) // 2]:.0f}",
+    ])
+
+    print(f"\nModel: {args.model_path}, torch threads={cores}")
+    print(tabulate(rows, headers=["Mode", "Img/s", "Img/s/core", "ms/img"], tablefmt="grid"))
+    print("Coalescing stats:", trocr.batcher.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ def main():
     parser = argparse.ArgumentParser(description="Run OCR Evaluation")
     parser.add_argument("--dataset", default="datasets/ocr_eval", help="Path to dataset directory")
     parser.add_argument("--output", default="evaluation_results.json", help="Path to save JSON results")
+    parser.add_argument("--workers", type=int, default=1, help="Images processed concurrently (they share EasyOCR recognition batches)")
     args = parser.parse_args()
     
     dataset_path = os.path.abspath(args.dataset)
@@ -21,7 +22,7 @@ def main():
         return
 
     print(f"Running evaluation on dataset: {dataset_path}")
-    results = evaluate_dataset(dataset_path)
+    results = evaluate_dataset(dataset_path, workers=args.workers)
     
     if "error" in results:
         print(f"Error: {results['error']}")
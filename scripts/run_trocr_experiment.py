@@ -24,6 +24,7 @@ def main():
     eval_parser = subparsers.add_parser("evaluate", help="Evaluate and compare models")
     eval_parser.add_argument("--model_path", required=True, help="Path to trained TrOCR model")
     eval_parser.add_argument("--eval_dir", required=True, help="Path to evaluation dataset")
+    eval_parser.add_argument("--batch_size", type=int, default=8, help="Images per TrOCR generate() call")
 
     args = parser.parse_args()
 
@@ -38,7 +39,7 @@ def main():
         )
     elif args.command == "evaluate":
         print(f"Starting evaluation on {args.eval_dir}...")
-        compare_models(args.model_path, args.eval_dir)
+        compare_models(args.model_path, args.eval_dir, batch_size=args.batch_size)
     else:
         parser.print_help()
 
@@ -2,6 +2,7 @@ import io
 import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
 from fastapi.testclient import TestClient
 from backend.app.main import app
 import types
@@ -10,6 +11,14 @@ import types
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    # Tests stub the pipelines; keep results from leaking between them
+    import backend.app.api.routes as routes_mod
+
+    monkeypatch.setattr(routes_mod, "get_result_cache", lambda: None)
+
+
 def test_health_ok():
     r = client.get("/api/health")
     assert r.status_code == 200
@@ -17,7 +26,7 @@ def test_health_ok():
 
 
 def test_ocr_post_success(monkeypatch):
-    def stub_process_image(path: str, lang_hint: str):
+    def stub_process_image(path: str, lang_hint: str, make_pdf: bool = True, profile: str = None):
         return {
             "text": "hello world",
             "structured": {"paragraphs": [{"lines": ["hello world"]}]},
@@ -48,3 +57,139 @@ def test_ocr_post_success(monkeypatch):
     assert j.get("status") == "success"
     assert isinstance(j.get("metadata", {}).get("processing_time_ms"), int)
     assert j.get("text")
+
+
+def test_metrics_reports_engine_state():
+    r = client.get("/api/metrics")
+    assert r.status_code == 200
+    j = r.json()
+    assert "easyocr_readers" in j
+    assert "latency" in j["routed_ocr"]
+    assert "trocr" in j["routed_ocr"]["models"]
+
+
+def test_ocr_returns_503_when_queue_full(monkeypatch):
+    import backend.app.api.routes as routes_mod
+    from backend.app.core.executor import QueueFullError
+
+    class FullExecutor:
+        async def run(self, fn, *args, **kwargs):
+            raise QueueFullError("full")
+
+    monkeypatch.setattr(routes_mod, "get_inference_executor", lambda: FullExecutor(), raising=True)
+
+    files = {"file": ("sample.png", b"\x89PNG\r\n", "image/png")}
+    r = client.post("/api/ocr", files=files)
+    assert r.status_code == 503
+    assert r.headers.get("Retry-After")
+
+
+def test_v1_ocr_rejects_oversized_upload(monkeypatch):
+    import backend.app.api.routes as routes_mod
+
+    monkeypatch.setattr(routes_mod.settings, "v1_ocr_max_upload_mb", 0.001)
+    files = {"file": ("big.png", b"\0" * 4096, "image/png")}
+    r = client.post("/api/v1/ocr", files=files)
+    assert r.status_code == 400
+    assert r.json()["error"]["code"] == "file_too_large"
+
+
+def test_ocr_decodes_from_memory_and_leaves_no_tmp_files(monkeypatch, tmp_path):
+    import backend.app.api.routes as routes_mod
+
+    seen = {}
+
+    def stub_process_image(source, lang_hint, make_pdf=True, profile=None):
+        seen["source"] = source
+        return {"text": "x", "structured": {}, "confidence": 1.0, "language": "en", "pdf_url": "/outputs/x.pdf"}
+
+    monkeypatch.setattr(routes_mod, "process_image", stub_process_image, raising=True)
+    monkeypatch.setattr(routes_mod.settings, "tmp_dir", str(tmp_path))
+    r = client.post("/api/ocr", files={"file": ("a.png", b"\x89PNG-bytes", "image/png")})
+    assert r.status_code == 200
+    assert seen["source"] == b"\x89PNG-bytes"
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_ocr_result_cache_hit_bypass_refresh(monkeypatch, tmp_path):
+    import backend.app.api.routes as routes_mod
+    from backend.app.services.result_cache import ResultCache
+
+    cache = ResultCache(memory_bytes=1 << 20, disk_dir=str(tmp_path / "cache"), disk_bytes=1 << 20, ttl_s=60)
+    monkeypatch.setattr(routes_mod, "get_result_cache", lambda: cache)
+    calls = []
+
+    def stub_process_image(source, lang_hint, make_pdf=True, profile=None):
+        calls.append(lang_hint)
+        return {"text": "cached", "structured": {}, "confidence": 1.0, "language": lang_hint, "pdf_url": None}
+
+    monkeypatch.setattr(routes_mod, "process_image", stub_process_image, raising=True)
+    files = {"file": ("a.png", b"same-bytes", "image/png")}
+
+    statuses = []
+    for query in ("", "", "?lang=fr", "?cache=bypass", "?cache=refresh", ""):
+        r = client.post(f"/api/ocr{query}", files=files)
+        assert r.status_code == 200
+        statuses.append(r.json()["metadata"]["cache"])
+    assert statuses == ["miss", "hit", "miss", "bypass", "refresh", "hit"]
+    assert calls == ["en", "fr", "en", "en"]
+    assert cache.stats()["memory_hits"] == 2
+
+
+def test_ocr_preprocessing_profile_query(monkeypatch):
+    import backend.app.api.routes as routes_mod
+
+    seen = []
+
+    def stub_process_image(source, lang_hint, make_pdf=True, profile=None):
+        seen.append(profile)
+        return {"text": "x", "structured": {}, "confidence": 1.0, "language": "en", "pdf_url": None}
+
+    monkeypatch.setattr(routes_mod, "process_image", stub_process_image, raising=True)
+    files = {"file": ("a.png", b"png-bytes", "image/png")}
+    r = client.post("/api/ocr?profile=fast", files=files)
+    assert r.status_code == 200
+    assert r.json()["metadata"]["preprocessing_profile"] == "fast"
+    r = client.post("/api/ocr", files=files)
+    assert r.json()["metadata"]["preprocessing_profile"] == routes_mod.settings.preprocessing_profile
+    assert seen == ["fast", routes_mod.settings.preprocessing_profile]
+    assert client.post("/api/ocr?profile=turbo", files=files).status_code == 422
+    # Custom pipelines from the deployment config are accepted like profiles
+    from backend.app.services import preprocessing
+    monkeypatch.setattr(preprocessing, "_pipelines", {**preprocessing.PROFILES, "receipt_lite": ("grayscale", "otsu")})
+    r = client.post("/api/ocr?profile=receipt_lite", files=files)
+    assert r.status_code == 200 and seen[-1] == "receipt_lite"
+
+
+def test_ocr_undecodable_upload_is_an_empty_page(monkeypatch, tmp_path):
+    from backend.app.services import ocr_pipeline
+
+    monkeypatch.setattr(ocr_pipeline, "_easyocr_text", lambda img, lang, decoding=None, blocks=None: ("", 0.0))
+    monkeypatch.setattr(ocr_pipeline.settings, "output_dir", str(tmp_path))
+    for body in (b"notanimage", b""):
+        r = client.post("/api/ocr?cache=bypass", files={"file": ("x.png", body, "image/png")})
+        assert r.status_code == 200
+        assert r.json()["text"] == "" and r.json()["confidence"] == 0.0
+
+
+def test_document_over_page_limit_is_413(monkeypatch, tmp_path):
+    import backend.app.api.routes as routes_mod
+    from PIL import Image
+
+    monkeypatch.setattr(routes_mod.settings, "max_pages", 2)
+    monkeypatch.setattr(routes_mod.settings, "tmp_dir", str(tmp_path))
+    monkeypatch.setattr(routes_mod.settings, "upload_tmp_dir", str(tmp_path))
+    buf = io.BytesIO()
+    frames = [Image.new("RGB", (16, 16)) for _ in range(3)]
+    frames[0].save(buf, format="TIFF", save_all=True, append_images=frames[1:])
+    files = {"file": ("doc.tif", buf.getvalue(), "image/tiff")}
+
+    r = client.post("/api/ocr", files=files)
+    assert r.status_code == 413
+    assert r.json()["detail"] == "Document has 3 pages, limit is 2"
+    r = client.post("/api/v1/ocr", files=files)
+    assert r.status_code == 413
+    assert r.json()["error"]["code"] == "too_many_pages"
+    # Sniffed from the bytes: a TIFF declared as PNG still takes the page path
+    r = client.post("/api/ocr", files={"file": ("doc.png", buf.getvalue(), "image/png")})
+    assert r.status_code == 413
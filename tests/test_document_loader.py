@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from PIL import Image
+from backend.app.services import document_loader
+from backend.app.services.document_loader import count_pages, document_kind, is_multipage, iter_pages, process_pages
+
+
+def make_tiff(path, n):
+    frames = [Image.new("RGB", (64, 32), color=(i * 40, 0, 0)) for i in range(n)]
+    frames[0].save(path, format="TIFF", save_all=True, append_images=frames[1:])
+    return path
+
+
+def test_document_kind_by_content_not_extension(tmp_path):
+    pdf = tmp_path / "scan.png"
+    pdf.write_bytes(b"%PDF-1.4\n%%EOF\n")
+    tiff = make_tiff(str(tmp_path / "fax.png"), 2)
+    png = tmp_path / "photo.pdf"
+    Image.new("RGB", (8, 8)).save(str(png), format="PNG")
+    assert document_kind(str(pdf)) == "pdf"
+    assert document_kind(tiff) == "tiff" and count_pages(tiff) == 2
+    assert not is_multipage(str(png))
+
+
+def test_iter_pages_tiff(tmp_path):
+    path = make_tiff(str(tmp_path / "doc.tif"), 3)
+    assert count_pages(path) == 3
+    pages = list(iter_pages(path))
+    assert [p for p, _ in pages] == [1, 2, 3]
+    # BGR: red channel of page 2 is the last one
+    assert pages[1][1][0, 0, 2] == 40
+
+
+def test_iter_pages_rejects_too_many_pages(tmp_path):
+    path = make_tiff(str(tmp_path / "doc.tif"), 3)
+    try:
+        list(iter_pages(path, max_pages=2))
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "limit" in str(e)
+
+
+def test_process_pages_order_bound_and_errors(tmp_path):
+    path = make_tiff(str(tmp_path / "doc.tif"), 5)
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def fn(img):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        if img[0, 0, 2] == 80:
+            raise RuntimeError("bad page")
+        return {"text": f"red={img[0, 0, 2]}"}
+
+    pages = process_pages(path, fn, workers=2)
+    assert [p["page"] for p in pages] == [1, 2, 3, 4, 5]
+    assert pages[2] == {"page": 3, "error": "bad page"}
+    assert pages[3]["text"] == "red=120"
+    assert state["peak"] <= 2
+
+
+def test_process_pages_page_that_fails_to_rasterize(tmp_path, monkeypatch):
+    path = make_tiff(str(tmp_path / "doc.tif"), 3)
+    read_page = document_loader._read_tiff_page
+
+    def flaky(p, page):
+        if page == 2:
+            raise OSError("truncated frame")
+        return read_page(p, page)
+
+    monkeypatch.setattr(document_loader, "_read_tiff_page", flaky)
+    pages = process_pages(path, lambda img: {"text": "ok"}, workers=2)
+    assert [p["page"] for p in pages] == [1, 2, 3]
+    assert pages[1] == {"page": 2, "error": "Could not read page 2: truncated frame"}
+    assert pages[0]["text"] == pages[2]["text"] == "ok"
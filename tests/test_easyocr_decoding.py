@@ -0,0 +1,131 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import cv2
+import numpy as np
+import torch
+from easyocr import easyocr as easyocr_reader
+from easyocr.config import recognition_models
+from easyocr.model.vgg_model import Model
+from easyocr.recognition import get_text
+from easyocr.utils import CTCLabelConverter, get_image_list
+from backend.app.services import easyocr_decoding
+from backend.app.services.easyocr_decoding import readtext
+
+CHARACTERS = recognition_models["gen2"]["english_g2"]["characters"]
+BOXES = [[10, 190, 5, 45], [10, 150, 55, 95]]
+
+
+class RandomWeightsReader:
+    """Reader with EasyOCR's English recognizer architecture and random weights (no model download)."""
+    model_lang = "english"
+    device = "cpu"
+    character = CHARACTERS
+    lang_char = CHARACTERS
+
+    def __init__(self):
+        torch.manual_seed(0)
+        self.recognizer = Model(1, 256, 256, len(CHARACTERS) + 1)
+        self.converter = CTCLabelConverter(CHARACTERS)
+
+    def detect(self, img, reformat=True):
+        return [BOXES], [[]]
+
+
+def page():
+    img = np.full((100, 200), 240, dtype=np.uint8)
+    cv2.putText(img, "Total 42", (15, 35), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 20, 2)
+    cv2.putText(img, "due", (15, 85), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 20, 2)
+    return img
+
+
+def easyocr_results(reader, img, decoder):
+    """What Reader.recognize returns for BOXES on CPU."""
+    out = []
+    for box in BOXES:
+        image_list, max_width = get_image_list([box], [], img, model_height=easyocr_reader.imgH)
+        out += get_text(reader.character, easyocr_reader.imgH, int(max_width), reader.recognizer, reader.converter,
+                        image_list, "", decoder, 5, 1, 0.1, 0.5, 0.003, 0, "cpu")
+    return out
+
+
+def test_adaptive_decoding_matches_easyocr_decoders():
+    reader, img = RandomWeightsReader(), page()
+    for threshold, decoder in ((0.0, "greedy"), (1.01, "beamsearch")):
+        stats = {}
+        ours = readtext(reader, img, decoder="adaptive", threshold=threshold, stats=stats)
+        theirs = easyocr_results(reader, img, decoder)
+        assert [(r[0], r[1]) for r in ours] == [(r[0], r[1]) for r in theirs]
+        assert np.allclose([r[2] for r in ours], [r[2] for r in theirs])
+        assert stats["crops"] == 2
+        assert stats["redecoded"] == (2 if decoder == "beamsearch" else 0)
+
+
+def test_adaptive_decoding_redecodes_only_low_confidence_crops():
+    reader, img = RandomWeightsReader(), page()
+    # Lean the untrained model towards one character so crops get distinct, non-zero confidences
+    with torch.no_grad():
+        reader.recognizer.Prediction.bias[CHARACTERS.index("A") + 1] += 6
+    beam_calls = []
+    decode_beamsearch = reader.converter.decode_beamsearch
+    reader.converter.decode_beamsearch = lambda mat, **kw: beam_calls.append(len(mat)) or decode_beamsearch(mat, **kw)
+
+    greedy = readtext(reader, img, decoder="adaptive", threshold=0.0)
+    assert beam_calls == [] and 0 < greedy[0][2] != greedy[1][2]
+    stats = {}
+    threshold = (greedy[0][2] + greedy[1][2]) / 2
+    mixed = readtext(reader, img, decoder="adaptive", threshold=threshold, stats=stats)
+    assert beam_calls == [1]
+    assert stats["redecoded"] == 1 and stats["redecoded_fraction"] == 0.5
+    # Confidences do not depend on the decoder
+    assert [r[2] for r in mixed] == [r[2] for r in greedy]
+    # Beam cost has been observed, so the saving can be estimated
+    assert stats["beam_ms_saved_est"] is not None
+    try:
+        readtext(reader, img, decoder="viterbi")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_crops_of_concurrent_pages_share_recognizer_passes(monkeypatch):
+    reader = RandomWeightsReader()
+    pages = [page(), 255 - page()]
+    monkeypatch.setattr(easyocr_decoding.settings, "easyocr_batch_size", 1)
+    alone = [readtext(reader, img, decoder="greedy") for img in pages]
+
+    monkeypatch.setattr(easyocr_decoding.settings, "easyocr_batch_size", 8)
+    monkeypatch.setattr(easyocr_decoding.settings, "easyocr_batch_wait_ms", 200.0)
+    monkeypatch.setattr(easyocr_decoding, "_crop_batcher", None)
+    forwards = []
+    probabilities = easyocr_decoding._probabilities
+    monkeypatch.setattr(easyocr_decoding, "_probabilities", lambda r, crops, *a: forwards.append(len(crops)) or probabilities(r, crops, *a))
+    stats = [{}, {}]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        pooled = list(pool.map(lambda i: readtext(reader, pages[i], decoder="greedy", stats=stats[i]), range(2)))
+    batcher = easyocr_decoding.get_crop_batcher()
+    try:
+        # Two widths, one recognizer pass each for the crops of both pages (and one contrast retry each,
+        # the untrained model reads nothing)
+        assert forwards == [2, 2, 2, 2]
+        assert batcher.stats()["largest_batch"] == 4
+        assert stats[0]["mean_recognizer_batch"] == 2
+        for ours, theirs in zip(pooled, alone):
+            assert [(r[0], r[1]) for r in ours] == [(r[0], r[1]) for r in theirs]
+            assert np.allclose([r[2] for r in ours], [r[2] for r in theirs])
+    finally:
+        batcher.close()
+
+
+def test_models_left_to_easyocr_report_the_decoder_it_uses():
+    class DelegatingReader:
+        def readtext(self, img, decoder):
+            self.decoder = decoder
+            return []
+
+    for lang, asked, used in (("chinese_sim", "adaptive", "greedy"), ("chinese_tra", "beamsearch", "greedy"), ("arabic", "adaptive", "beamsearch")):
+        reader, stats = DelegatingReader(), {}
+        reader.model_lang = lang
+        readtext(reader, page(), decoder=asked, stats=stats)
+        assert reader.decoder == stats["decoder"] == used
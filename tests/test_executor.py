@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from backend.app.core.executor import InferenceExecutor, QueueFullError
+
+
+def test_run_returns_result_and_records_times():
+    ex = InferenceExecutor(max_workers=1, max_queue=1)
+    try:
+        assert asyncio.run(ex.run(lambda a, b: a + b, 2, 3)) == 5
+        stats = ex.stats()
+        assert stats["completed"] == 1
+        assert stats["run_time"]["count"] == 1
+        assert stats["wait_time"]["count"] == 1
+    finally:
+        ex.shutdown()
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    ex = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def first():
+        started.set()
+        release.wait()
+
+    try:
+        running = ex.submit(first)
+        # Only count the second task as queued once the first holds the worker
+        assert started.wait(timeout=5)
+        queued = ex.submit(release.wait)
+        assert ex.stats()["queue_depth"] == 1
+        with pytest.raises(QueueFullError):
+            ex.submit(release.wait)
+        assert ex.stats()["rejected"] == 1
+        release.set()
+        running.result(timeout=5)
+        queued.result(timeout=5)
+        # Slots are returned once work completes
+        ex.submit(lambda: None).result(timeout=5)
+    finally:
+        release.set()
+        ex.shutdown()
+
+
+def test_failures_release_slots():
+    ex = InferenceExecutor(max_workers=1, max_queue=0)
+
+    def boom():
+        raise ValueError("bad image")
+
+    try:
+        with pytest.raises(ValueError):
+            ex.submit(boom).result(timeout=5)
+        assert ex.stats()["failed"] == 1
+        assert ex.submit(lambda: 1).result(timeout=5) == 1
+    finally:
+        ex.shutdown()
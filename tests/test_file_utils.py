@@ -0,0 +1,52 @@
+import asyncio
+import hashlib
+import io
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from backend.app.services.file_utils import UploadTooLarge, save_upload
+
+
+def make_upload(data: bytes, filename: str = "doc.png", content_type: str = "image/png", size=None):
+    return UploadFile(
+        io.BytesIO(data), size=size, filename=filename, headers=Headers({"content-type": content_type})
+    )
+
+
+def test_save_upload_streams_and_hashes(tmp_path):
+    data = os.urandom(10_000)
+    saved = asyncio.run(save_upload(make_upload(data), str(tmp_path), chunk_size=1024))
+    assert saved.size == len(data)
+    assert saved.sha256 == hashlib.sha256(data).hexdigest()
+    assert saved.path.endswith(".png")
+    with open(saved.path, "rb") as f:
+        assert f.read() == data
+
+
+def test_save_upload_aborts_at_limit(tmp_path):
+    upload = make_upload(b"x" * 5000)
+    try:
+        asyncio.run(save_upload(upload, str(tmp_path), max_bytes=2048, chunk_size=1024))
+        assert False, "expected UploadTooLarge"
+    except UploadTooLarge:
+        pass
+    # Stopped after the chunk that crossed the limit; partial file removed
+    assert upload.file.tell() == 3072
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_save_upload_rejects_known_size_without_reading(tmp_path):
+    upload = make_upload(b"x" * 5000, size=5000)
+    try:
+        asyncio.run(save_upload(upload, str(tmp_path), max_bytes=1024))
+        assert False, "expected UploadTooLarge"
+    except UploadTooLarge:
+        pass
+    assert upload.file.tell() == 0
+
+
+def test_save_upload_extension_from_content_type(tmp_path):
+    saved = asyncio.run(save_upload(make_upload(b"%PDF", filename="", content_type="application/pdf"), str(tmp_path)))
+    assert saved.path.endswith(".pdf")
@@ -0,0 +1,53 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import cv2
+import numpy as np
+from PIL import Image
+from backend.app.services.image_io import to_bgr, to_pil
+
+
+def sample():
+    img = np.zeros((8, 12, 3), dtype=np.uint8)
+    img[..., 2] = 200  # red in BGR
+    return img
+
+
+def png_bytes(bgr):
+    ok, buf = cv2.imencode(".png", bgr)
+    assert ok
+    return buf.tobytes()
+
+
+def test_to_bgr_from_every_source(tmp_path):
+    bgr = sample()
+    path = str(tmp_path / "a.png")
+    cv2.imwrite(path, bgr)
+    pil = Image.fromarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+    for source in (path, png_bytes(bgr), bytearray(png_bytes(bgr)), bgr, pil):
+        out = to_bgr(source)
+        assert out.shape == (8, 12, 3)
+        assert tuple(out[0, 0]) == (0, 0, 200)
+
+
+def test_to_bgr_passes_arrays_through_and_expands_gray():
+    bgr = sample()
+    assert to_bgr(bgr) is bgr
+    assert to_bgr(np.zeros((4, 4), dtype=np.uint8)).shape == (4, 4, 3)
+
+
+def test_to_pil_is_rgb():
+    pil = to_pil(png_bytes(sample()))
+    assert pil.mode == "RGB"
+    assert pil.getpixel((0, 0)) == (200, 0, 0)
+    assert to_pil(sample()).getpixel((0, 0)) == (200, 0, 0)
+
+
+def test_undecodable_and_missing_inputs():
+    for bad, exc in ((b"not an image", ValueError), ("/nonexistent/x.png", FileNotFoundError)):
+        for fn in (to_bgr, to_pil):
+            try:
+                fn(bad)
+                assert False, "expected error"
+            except exc:
+                pass
@@ -0,0 +1,125 @@
+import io
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from fastapi.testclient import TestClient
+from backend.app.jobs.queue import JobQueue
+from backend.app.jobs.worker import JobWorkerPool
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(f"sqlite:///{tmp_path / 'jobs.db'}", retry_backoff_s=0)
+
+
+def make_upload(tmp_path, name="doc.png"):
+    path = tmp_path / name
+    path.write_bytes(b"fake")
+    return str(path)
+
+
+def test_job_runs_and_stores_result(queue, tmp_path):
+    path = make_upload(tmp_path)
+    job = queue.enqueue(path, kind="ocr")
+    pool = JobWorkerPool(queue, {"ocr": lambda j: {"text": "hello"}}, concurrency=1)
+    assert pool.run_one()
+    done = queue.get(job.id)
+    assert done.status == "succeeded"
+    assert done.attempts == 1
+    assert '"hello"' in done.result
+    assert not os.path.exists(path)
+    assert not pool.run_one()
+
+
+def test_failed_job_is_retried_then_marked_failed(queue, tmp_path):
+    job = queue.enqueue(make_upload(tmp_path), kind="ocr", max_attempts=2)
+
+    def boom(j):
+        raise RuntimeError("engine crashed")
+
+    pool = JobWorkerPool(queue, {"ocr": boom}, concurrency=1)
+    assert pool.run_one()
+    assert queue.get(job.id).status == "queued"
+    assert pool.run_one()
+    failed = queue.get(job.id)
+    assert failed.status == "failed"
+    assert failed.attempts == 2
+    assert "engine crashed" in failed.error
+
+
+def test_job_is_claimed_only_once(queue, tmp_path):
+    queue.enqueue(make_upload(tmp_path))
+    assert queue.claim_next() is not None
+    assert queue.claim_next() is None
+
+
+def test_interrupted_jobs_survive_restart(tmp_path):
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    first = JobQueue(url)
+    job = first.enqueue(make_upload(tmp_path))
+    first.claim_next()
+    # Simulate the claiming process having died
+    with first.Session() as db:
+        from backend.app.jobs.models import Job
+        db.get(Job, job.id).claimed_by = "some-host-that-is-gone:1"
+        db.commit()
+
+    restarted = JobQueue(url)
+    assert restarted.recover(lease_timeout_s=0) == 1
+    assert restarted.get(job.id).status == "queued"
+
+
+def test_interrupted_job_without_attempts_left_is_failed(tmp_path):
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    first = JobQueue(url)
+    path = make_upload(tmp_path)
+    job = first.enqueue(path, max_attempts=1)
+    first.claim_next()
+    # The only attempt took the worker process down with it
+    with first.Session() as db:
+        from backend.app.jobs.models import Job
+        db.get(Job, job.id).claimed_by = "some-host-that-is-gone:1"
+        db.commit()
+
+    restarted = JobQueue(url)
+    assert restarted.recover(lease_timeout_s=0) == 0
+    failed = restarted.get(job.id)
+    assert failed.status == "failed"
+    assert "worker died" in failed.error
+    assert not os.path.exists(path)
+    assert restarted.claim_next() is None
+
+
+def test_jobs_api_roundtrip(tmp_path, monkeypatch):
+    from backend.app.main import app
+    from backend.app.auth.dependencies import get_current_active_user
+    from backend.app.jobs.dependencies import get_job_queue
+    from backend.app.core.config import settings
+
+    class FakeUser:
+        email = "ops@example.com"
+        role = "user"
+
+    queue = JobQueue(f"sqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.setattr(settings, "jobs_dir", str(tmp_path / "uploads"))
+    app.dependency_overrides[get_current_active_user] = lambda: FakeUser()
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    try:
+        client = TestClient(app)
+        files = {"file": ("scan.png", io.BytesIO(b"png-bytes"), "image/png")}
+        r = client.post("/api/jobs?kind=ocr", files=files)
+        assert r.status_code == 202
+        job_id = r.json()["job_id"]
+
+        JobWorkerPool(queue, {"ocr": lambda j: {"text": "done"}}).run_one()
+
+        r = client.get(f"/api/jobs/{job_id}")
+        assert r.status_code == 200
+        body = r.json()
+        assert body["status"] == "succeeded"
+        assert body["result"] == {"text": "done"}
+
+        assert client.get("/api/jobs/does-not-exist").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,118 @@
+import os
+import sys
+from contextlib import contextmanager
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import numpy as np
+from backend.app.services import ocr_pipeline
+from backend.app.services.layout import group_words, page_text, tesseract_paragraphs, weighted_confidence
+from backend.app.services.postprocessing import to_structured
+
+
+def word(x, y, text, conf=0.9, height=20):
+    w = 12 * len(text)
+    return ([[x, y], [x + w, y], [x + w, y + height], [x, y + height]], text, conf)
+
+
+# Two-line paragraph, a right-hand column, a paragraph further down; shuffled like detector output
+DETECTIONS = [
+    word(10, 120, "Thanks", 0.8),
+    word(90, 41, "$199.99", 0.6),
+    word(400, 10, "Paid", 0.7),
+    word(10, 10, "Invoice", 0.99),
+    word(10, 40, "Total:", 0.9),
+    word(110, 12, "12345", 0.95),
+]
+
+
+def test_group_words_builds_lines_and_paragraphs_in_reading_order():
+    paragraphs = group_words(DETECTIONS)
+    assert [p["text"] for p in paragraphs] == ["Invoice 12345\nTotal: $199.99", "Paid", "Thanks"]
+    assert [line["text"] for line in paragraphs[0]["lines"]] == ["Invoice 12345", "Total: $199.99"]
+    assert paragraphs[0]["bbox"][0] == [10, 10] and paragraphs[0]["bbox"][2] == [174, 61]
+    structured = to_structured(page_text(paragraphs))
+    assert [p["lines"] for p in structured["paragraphs"]] == [["Invoice 12345", "Total: $199.99"], ["Paid"], ["Thanks"]]
+    assert group_words([]) == [] and group_words([word(0, 0, "  ")]) == []
+
+
+def test_confidence_is_weighted_by_word_length():
+    line = group_words([word(0, 0, "Invoice", 1.0), word(100, 0, "x", 0.2)])[0]
+    assert abs(line["confidence"] - (7 * 1.0 + 0.2) / 8) < 1e-9
+    # Aggregating paragraphs gives the same as aggregating all words
+    paragraphs = group_words(DETECTIONS)
+    words = [{"text": d[1], "confidence": d[2]} for d in DETECTIONS]
+    assert abs(weighted_confidence(paragraphs) - weighted_confidence(words)) < 1e-9
+
+
+def test_grouping_scales_to_dense_pages():
+    rng = np.random.default_rng(0)
+    # 200 lines of 25 words, jittered and shuffled
+    dets = [word(10 + 60 * c + rng.uniform(-2, 2), 30 * r + rng.uniform(-2, 2), "word", 0.9) for r in range(200) for c in range(25)]
+    order = rng.permutation(len(dets))
+    paragraphs = group_words([dets[i] for i in order])
+    assert len(paragraphs) == 1
+    assert len(paragraphs[0]["lines"]) == 200
+    assert all(line["text"] == " ".join(["word"] * 25) for line in paragraphs[0]["lines"])
+
+
+def test_easyocr_text_keeps_confidences(monkeypatch):
+    calls = []
+
+    class FakePool:
+        @contextmanager
+        def checkout(self, langs, **kwargs):
+            yield object()
+
+    def fake_readtext(reader, img, **kwargs):
+        calls.append(kwargs)
+        return DETECTIONS
+
+    monkeypatch.setattr(ocr_pipeline, "get_reader_pool", lambda: FakePool())
+    monkeypatch.setattr(ocr_pipeline, "readtext", fake_readtext)
+    text, conf = ocr_pipeline._easyocr_text(np.zeros((10, 10), dtype=np.uint8), "en")
+    assert "paragraph" not in calls[0]
+    assert text.startswith("Invoice 12345\nTotal: $199.99\n\n")
+    assert 0.8 < conf < 0.9
+
+
+def tesseract_data(rows):
+    """pytesseract image_to_data DICT output from (level, block, par, line, left, top, width, height, conf, text) rows."""
+    keys = ["level", "block_num", "par_num", "line_num", "left", "top", "width", "height", "conf", "text"]
+    data = {k: [r[i] for r in rows] for i, k in enumerate(keys)}
+    data["page_num"] = [1] * len(rows)
+    return data
+
+
+# Two-line paragraph and a second block; structural rows (conf -1) and an empty word are skipped
+TSV = tesseract_data([
+    (1, 0, 0, 0, 0, 0, 500, 300, -1, ""),
+    (2, 1, 0, 0, 10, 10, 170, 50, -1, ""),
+    (5, 1, 1, 1, 10, 10, 80, 20, 96, "Invoice"),
+    (5, 1, 1, 1, 100, 12, 60, 20, 91.5, "12345"),
+    (5, 1, 1, 2, 10, 40, 70, 20, 88, "Total:"),
+    (5, 1, 1, 2, 90, 40, 84, 21, 45, "$199.99"),
+    (5, 1, 1, 2, 180, 40, 5, 21, 95, " "),
+    (5, 2, 1, 1, 400, 10, 48, 20, 70, "Paid"),
+])
+
+
+def test_tesseract_paragraphs_follow_tesseract_segmentation():
+    paragraphs = tesseract_paragraphs(TSV)
+    assert [p["text"] for p in paragraphs] == ["Invoice 12345\nTotal: $199.99", "Paid"]
+    first = paragraphs[0]["lines"][0]
+    assert first["bbox"] == [[10, 10], [160, 10], [160, 32], [10, 32]]
+    assert abs(first["confidence"] - (7 * 0.96 + 5 * 0.915) / 12) < 1e-9
+    assert paragraphs[1]["confidence"] == 0.7
+    assert tesseract_paragraphs({}) == []
+
+
+def test_tesseract_fallback_reports_confidence_and_blocks(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr_pipeline, "get_tesseract_pool", lambda: None)
+    monkeypatch.setattr(ocr_pipeline.pytesseract, "image_to_data", lambda img, lang, output_type: calls.append(lang) or TSV)
+    blocks = []
+    text, conf = ocr_pipeline._tesseract_text(np.zeros((10, 10), dtype=np.uint8), "en+fr", blocks)
+    assert calls == ["eng+fra"]
+    assert text == "Invoice 12345\nTotal: $199.99\n\nPaid"
+    assert 0.7 < conf < 0.95
+    assert [b["text"] for b in blocks] == ["Invoice 12345", "Total: $199.99", "Paid"]
+    assert set(blocks[0]) == {"text", "confidence", "bbox"}
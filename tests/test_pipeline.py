@@ -2,7 +2,9 @@ import numpy as np
 import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from backend.app.services.preprocessing import preprocess
+from backend.app.services.preprocessing import PROFILES, deskew, estimate_skew, preprocess
+from backend.app.services.preprocessing_service import preprocess_image
+from backend.app.services.tiling import run_tiled
 from backend.app.services.postprocessing import clean_text, to_structured
 from PIL import Image, ImageDraw
 import io
@@ -29,6 +31,123 @@ def test_preprocess_returns_array():
     assert out.shape[0] > 0 and out.shape[1] > 0
 
 
+def test_preprocessing_profiles_time_each_stage():
+    arr = make_test_image_array()
+    for name, stages in PROFILES.items():
+        timings = {}
+        out = preprocess(arr, name, timings=timings)
+        assert out.ndim == 2
+        assert list(timings) == list(stages)
+    # Small text is scaled up to the minimum text height, whatever the profile
+    reports = {}
+    out = preprocess(arr, "quality", reports=reports)
+    scale = reports["normalize"]["scale"]
+    assert scale > 1
+    assert out.shape == preprocess(arr, "fast").shape == (round(64 * scale), round(128 * scale))
+    # The Otsu pipeline of preprocessing_service is the fast profile
+    assert np.array_equal(preprocess_image(arr), preprocess(arr, "fast"))
+    try:
+        preprocess(arr, "turbo")
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "turbo" in str(e)
+
+
+def test_tiled_filters_match_full_frame():
+    import cv2 as cv
+    from concurrent.futures import ThreadPoolExecutor
+    rng = np.random.default_rng(0)
+    img = cv.GaussianBlur((rng.random((700, 500)) * 255).astype(np.uint8), (5, 5), 0)
+
+    def nlm(i):
+        return cv.fastNlMeansDenoising(i, None, 10, 7, 21)
+
+    def blur(i):
+        return cv.GaussianBlur(i, (3, 3), 0)
+
+    with ThreadPoolExecutor(4) as pool:
+        assert np.array_equal(run_tiled(nlm, img, 13, tile_size=256, overlap=16, pool=pool), nlm(img))
+        color = np.dstack([img, img[::-1], img[:, ::-1]])
+        assert np.array_equal(run_tiled(blur, color, 1, tile_size=200, overlap=8, pool=pool), blur(color))
+        # Seam weights of neighbouring tiles sum to 1
+        flat = run_tiled(lambda i: np.full_like(i, 100), img, 0, tile_size=128, overlap=16, pool=pool)
+        assert (flat == 100).all()
+
+
+def test_deskew_estimates_on_a_thumbnail_and_skips_small_angles():
+    import cv2 as cv
+    page = np.full((1400, 1000), 245, dtype=np.uint8)
+    for i, y in enumerate(range(100, 1300, 45)):
+        cv.putText(page, f"Line {i}: total 19.99 due 2024", (60, y), cv.FONT_HERSHEY_SIMPLEX, 1.0, 20, 2)
+    for angle in (-4.0, 2.5):
+        rotated = cv.warpAffine(page, cv.getRotationMatrix2D((500, 700), angle, 1.0), (1000, 1400), borderValue=245)
+        assert abs(estimate_skew(rotated, max_side=500) - angle) <= 0.2
+        assert abs(estimate_skew(deskew(rotated))) <= 0.2
+    # Straight pages are returned as is, without a full-size warp
+    assert deskew(page, epsilon=0.3) is page
+
+
+def test_normalize_resolution_follows_text_height():
+    import cv2 as cv
+    from backend.app.services.preprocessing import estimate_text_height, normalize_resolution
+
+    def page(font_scale, thickness):
+        img = np.full((1800, 1300), 245, dtype=np.uint8)
+        for i, y in enumerate(range(100, 1700, int(70 * font_scale))):
+            cv.putText(img, f"Line {i}: total 19.99 due", (40, y), cv.FONT_HERSHEY_SIMPLEX, font_scale, 20, thickness)
+        return img
+
+    assert 18 <= estimate_text_height(page(1.0, 2)) <= 26
+    # In range: untouched, which saves the 4x pixels the fixed 2x upscale used to add
+    same, report = normalize_resolution(page(1.0, 2))
+    assert same.shape == (1800, 1300) and report["pixels_saved_vs_fixed_2x"] == 0
+    # Large text is scaled down to the top of the range
+    small, report = normalize_resolution(page(3.0, 5))
+    assert report["scale"] < 1 and report["pixels_out"] == small.shape[0] * small.shape[1]
+    assert 36 <= estimate_text_height(small) <= 44
+    # Nothing to measure: left as is
+    blank = np.full((500, 400), 255, dtype=np.uint8)
+    assert normalize_resolution(blank)[0] is blank
+
+
+def test_custom_pipelines_from_config(monkeypatch, tmp_path):
+    import json
+    import threading
+    from backend.app.services import preprocessing
+    from backend.app.services.preprocessing import _clahe, get_pipelines, resolve_profile
+
+    config = tmp_path / "pipelines.json"
+    config.write_text(json.dumps({"lite": ["grayscale", {"stage": "clahe", "name": "strong_clahe", "clip_limit": 4.0}, "otsu"]}))
+    monkeypatch.setattr(preprocessing.settings, "preprocessing_pipelines_file", str(config))
+    monkeypatch.setattr(preprocessing.settings, "preprocessing_pipelines", {"fast": ["grayscale", "otsu"]})
+    monkeypatch.setattr(preprocessing, "_pipelines", None)
+    assert resolve_profile("lite") == "lite" and "quality" in get_pipelines()
+    # Settings override the file and built-ins by name
+    assert get_pipelines()["fast"] == ("grayscale", "otsu")
+
+    trace = []
+    out = preprocess(make_test_image_array(), "lite", trace=trace)
+    assert [t["stage"] for t in trace] == ["grayscale", "strong_clahe", "otsu"]
+    assert trace[-1]["shape"] == list(out.shape) == [64, 128]
+    assert all(t["ms"] >= 0 for t in trace)
+
+    # One CLAHE object per thread and parameter set
+    assert _clahe(4.0, 8) is _clahe(4.0, 8) and _clahe(4.0, 8) is not _clahe(2.0, 8)
+    other = []
+    thread = threading.Thread(target=lambda: other.append(_clahe(4.0, 8)))
+    thread.start()
+    thread.join()
+    assert other[0] is not _clahe(4.0, 8)
+
+    for bad in (["sharpen"], [{"stage": "clahe", "clip": 3}], ["clahe", "clahe"]):
+        monkeypatch.setattr(preprocessing.settings, "preprocessing_pipelines", {"bad": bad})
+        try:
+            preprocessing.load_pipelines()
+            assert False, f"expected ValueError for {bad}"
+        except ValueError:
+            pass
+
+
 def test_postprocessing_structures_text():
     raw = "Invoice 12345\r\n\r\nTotal: $199.99   "
     cleaned = clean_text(raw)
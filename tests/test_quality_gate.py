@@ -0,0 +1,66 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import cv2
+import numpy as np
+from backend.app.services import ocr_pipeline
+from backend.app.services.preprocessing import PROFILES
+from backend.app.services.quality_gate import analyze, decide
+
+
+def make_page(skew=0.0, noise=0.0):
+    page = np.full((1100, 850), 245, dtype=np.uint8)
+    for i, y in enumerate(range(100, 1000, 40)):
+        cv2.putText(page, f"Invoice line {i} total 19.99 due", (60, y), cv2.FONT_HERSHEY_SIMPLEX, 0.9, 20, 2)
+    if skew:
+        m = cv2.getRotationMatrix2D((425, 550), skew, 1.0)
+        page = cv2.warpAffine(page, m, (850, 1100), borderValue=245)
+    if noise:
+        page = np.clip(page + np.random.default_rng(0).normal(0, noise, page.shape), 0, 255).astype(np.uint8)
+    return page
+
+
+def blank_page():
+    return np.clip(240 + np.random.default_rng(1).normal(0, 8, (1100, 850)), 0, 255).astype(np.uint8)
+
+
+def test_analyze_measures_skew_noise_and_ink():
+    clean = analyze(make_page())
+    assert clean["noise"] < 1 and clean["ink"] > 0.05 and abs(clean["skew_deg"]) < 0.5
+    assert abs(abs(analyze(make_page(skew=3))["skew_deg"]) - 3) < 0.5
+    assert 6 < analyze(make_page(noise=10))["noise"] < 12
+    assert analyze(blank_page())["ink"] < 0.001
+
+
+def test_decide_skips_stages_a_clean_page_does_not_need():
+    gate = decide(analyze(make_page()), PROFILES["quality"])
+    assert not gate["blank"]
+    assert set(gate["skipped"]) == {"deskew", "clahe", "nl_means_denoise"}
+    assert gate["stages"] == ["normalize", "grayscale"]
+
+    noisy = decide(analyze(make_page(skew=3, noise=10)), PROFILES["quality"])
+    assert "deskew" in noisy["stages"] and "nl_means_denoise" in noisy["stages"]
+
+    blank = decide(analyze(blank_page()), PROFILES["quality"])
+    assert blank["blank"] and blank["stages"] == []
+
+
+def test_blank_page_skips_ocr(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr_pipeline, "_easyocr_text", lambda img, lang, decoding=None, blocks=None: calls.append(img) or ("text", 0.9))
+    res = ocr_pipeline.process_image(blank_page(), make_pdf=False)
+    assert res["text"] == "" and res["quality_gate"]["blank"]
+    assert calls == []
+    res = ocr_pipeline.process_image(make_page(), make_pdf=False)
+    assert res["text"] == "text" and not res["quality_gate"]["blank"]
+    assert len(calls) == 1
+
+
+def test_routed_blank_page_skips_routing(monkeypatch):
+    from backend.app.ml.unified_ocr import UnifiedOCR
+    ocr = UnifiedOCR()
+    monkeypatch.setattr(ocr.router, "route", lambda *a, **kw: (_ for _ in ()).throw(AssertionError("routed")))
+    res = ocr.process(blank_page())
+    assert res["metadata"]["engine_used"] == "none"
+    assert res["metadata"]["quality_gate"]["blank"]
+    assert res["text"] == ""
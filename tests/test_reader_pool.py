@@ -0,0 +1,69 @@
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend.app.services.reader_pool import EasyOCRReaderPool
+
+
+class FakePool(EasyOCRReaderPool):
+    def __init__(self, max_size: int = 2, load_delay: float = 0.0):
+        super().__init__(max_size=max_size)
+        self.load_delay = load_delay
+        self.loaded = []
+
+    def _load_reader(self, langs, device):
+        time.sleep(self.load_delay)
+        self.loaded.append((tuple(langs), device))
+        return object()
+
+
+def test_reader_reused_and_counted():
+    pool = FakePool()
+    with pool.checkout(["en"], gpu=False) as r1:
+        pass
+    with pool.checkout(["en"], gpu=False) as r2:
+        pass
+    assert r1 is r2
+    stats = pool.stats()["readers"]["en@cpu"]
+    assert stats["loads"] == 1
+    assert stats["hits"] == 1
+
+
+def test_language_order_shares_key():
+    pool = FakePool()
+    with pool.checkout(["fr", "en"], gpu=False) as r1:
+        pass
+    with pool.checkout(["en", "fr"], gpu=False) as r2:
+        pass
+    assert r1 is r2
+
+
+def test_lru_eviction_skips_readers_in_use():
+    pool = FakePool(max_size=1)
+    with pool.checkout(["en"], gpu=False):
+        with pool.checkout(["fr"], gpu=False):
+            # Both pinned, pool temporarily over budget
+            assert pool.stats()["size"] == 2
+        # "fr" became idle while "en" was still pinned, so it goes first
+        assert pool.stats()["readers"]["fr@cpu"]["evictions"] == 1
+    stats = pool.stats()
+    assert stats["size"] == 1
+    assert stats["readers"]["en@cpu"]["loaded"]
+
+
+def test_concurrent_checkout_loads_once():
+    pool = FakePool(load_delay=0.05)
+    seen = []
+
+    def worker():
+        with pool.checkout(["en"], gpu=False) as reader:
+            seen.append(reader)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(pool.loaded) == 1
+    assert len({id(r) for r in seen}) == 1
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend.app.services.result_cache import ResultCache, cache_key, is_cacheable
+
+
+def test_memory_lru_respects_byte_budget():
+    cache = ResultCache(memory_bytes=50)
+    cache.put("a", {"t": "x" * 10})
+    cache.put("b", {"t": "y" * 10})
+    assert cache.get("a") is not None  # a is now most recently used
+    cache.put("c", {"t": "z" * 10})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"t": "x" * 10}
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 50
+    assert stats["evictions"] == 1
+
+
+def test_get_returns_independent_copies():
+    cache = ResultCache(memory_bytes=1024)
+    cache.put("k", {"lines": [1]})
+    cache.get("k")["lines"].append(2)
+    assert cache.get("k") == {"lines": [1]}
+
+
+def test_disk_tier_survives_restart_and_promotes(tmp_path):
+    d = str(tmp_path / "c")
+    ResultCache(memory_bytes=1024, disk_dir=d, disk_bytes=1024, ttl_s=60).put("k", {"text": "hi"})
+    fresh = ResultCache(memory_bytes=1024, disk_dir=d, disk_bytes=1024, ttl_s=60)
+    assert fresh.get("k") == {"text": "hi"}
+    assert fresh.get("k") == {"text": "hi"}
+    stats = fresh.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+
+def test_disk_ttl_and_size_eviction(tmp_path):
+    d = str(tmp_path / "c")
+    cache = ResultCache(memory_bytes=0, disk_dir=d, disk_bytes=40, ttl_s=60)
+    cache.put("old", {"t": "a" * 10})
+    old_path = cache._disk_path("old")
+    os.utime(old_path, (time.time() - 120, time.time() - 120))
+    assert cache.get("old") is None
+    assert not os.path.exists(old_path)
+
+    cache.put("k1", {"t": "b" * 10})
+    os.utime(cache._disk_path("k1"), (time.time() - 10, time.time() - 10))
+    cache.put("k2", {"t": "c" * 10})
+    # Two 19-byte entries fit in 40 bytes, a third forces the oldest out
+    cache.put("k3", {"t": "d" * 10})
+    assert cache.get("k1") is None
+    assert cache.get("k3") == {"t": "d" * 10}
+    assert cache.stats()["disk_bytes"] <= 40
+
+
+def test_cache_key_depends_on_content_pipeline_and_params():
+    base = cache_key("abc", "process_image", lang="en")
+    assert base == cache_key("abc", "process_image", lang="en")
+    assert base != cache_key("abd", "process_image", lang="en")
+    assert base != cache_key("abc", "run_ocr", lang="en")
+    assert base != cache_key("abc", "process_image", lang="fr")
+
+
+def test_failed_results_are_not_cacheable():
+    assert is_cacheable({"text": "ok"})
+    assert not is_cacheable({"text": "", "error": "boom"})
+    assert not is_cacheable({"text": "ok", "pages": [{"page": 1}, {"page": 2, "error": "bad"}]})
@@ -0,0 +1,126 @@
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import numpy as np
+from backend.app.services import tesseract_pool
+from backend.app.services.tesseract_pool import TesseractPageError, TesseractPool, TesseractWorkerError, tsv_to_data
+
+
+def echo_worker(conn, tessdata):
+    """Stand-in for the tesserocr loop: answers with the image's pid/shape, crashes on 1s, hangs on 2s."""
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg[0] == "stop":
+            return
+        if msg[0] == "ping":
+            conn.send(("ok", None))
+            continue
+        _, lang, image = msg
+        if image.max() == 1:
+            os._exit(1)
+        if image.max() == 2:
+            time.sleep(60)
+        conn.send(("ok", {"pid": os.getpid(), "lang": lang, "shape": image.shape}))
+
+
+def broken_worker(conn, tessdata):
+    """Stand-in for a worker whose TessBaseAPI cannot find its traineddata."""
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg[0] == "stop":
+            return
+        conn.send(("ok", None) if msg[0] == "ping" else ("error", "RuntimeError: Failed to init API, possibly an invalid tessdata path"))
+
+
+def test_workers_are_reused_and_replaced_after_crash_or_hang():
+    pool = TesseractPool(size=1, timeout_s=5, target=echo_worker)
+    try:
+        page = np.zeros((20, 30), dtype=np.uint8)
+        first = pool.image_to_data(page, "eng")
+        assert first["lang"] == "eng" and first["shape"] == (20, 30)
+        # Same long-lived process for the next page
+        assert pool.image_to_data(page)["pid"] == first["pid"]
+
+        try:
+            pool.image_to_data(np.ones((2, 2), dtype=np.uint8))
+            assert False, "expected TesseractWorkerError"
+        except TesseractWorkerError:
+            pass
+        after_crash = pool.image_to_data(page)["pid"]
+        assert after_crash != first["pid"]
+
+        pool.timeout_s = 0.5
+        try:
+            pool.image_to_data(np.full((2, 2), 2, dtype=np.uint8))
+            assert False, "expected TesseractWorkerError"
+        except TesseractWorkerError:
+            pass
+        pool.timeout_s = 5
+        assert pool.image_to_data(page)["pid"] not in (first["pid"], after_crash)
+        stats = pool.stats()
+        assert (stats["restarts"], stats["failures"], stats["alive"], stats["idle"]) == (2, 2, 1, 1)
+    finally:
+        pool.close()
+
+
+def test_health_check_replaces_dead_idle_workers():
+    pool = TesseractPool(size=2, target=echo_worker)
+    try:
+        assert pool.check_health() == 0
+        pool._workers[0].process.kill()
+        pool._workers[0].process.join()
+        assert pool.check_health() == 1
+        assert pool.stats()["alive"] == 2
+        # A worker that died while idle is replaced at checkout, without failing the page
+        pool._workers[1].process.kill()
+        pool._workers[1].process.join()
+        pids = {pool.image_to_data(np.zeros((4, 4), dtype=np.uint8))["pid"] for _ in range(4)}
+        assert len(pids) == 2 and pool.stats()["failures"] == 0
+    finally:
+        pool.close()
+
+
+def test_tsv_matches_image_to_data_format():
+    tsv = "1\t1\t0\t0\t0\t0\t0\t0\t100\t40\t-1\t\n5\t1\t1\t1\t1\t1\t10\t5\t50\t20\t95.4\tTotal"
+    data = tsv_to_data(tsv)
+    assert data["text"] == ["", "Total"]
+    assert data["conf"] == [-1, 95]
+    assert data["left"] == [0, 10]
+
+
+def test_pool_disables_itself_and_pages_fall_back_to_pytesseract(monkeypatch):
+    # Imported here: spawned stand-in workers import this module and should start fast
+    from backend.app.services import ocr_pipeline
+
+    pool = TesseractPool(size=1, max_consecutive_failures=2, target=broken_worker)
+    try:
+        monkeypatch.setattr(tesseract_pool, "_tesseract_pool", pool)
+        monkeypatch.setattr(tesseract_pool, "tesserocr_available", lambda: True)
+        monkeypatch.setattr(ocr_pipeline.settings, "tesseract_pool_size", 1)
+        forked = []
+        monkeypatch.setattr(
+            ocr_pipeline.pytesseract, "image_to_data",
+            lambda img, lang, output_type: forked.append(lang) or {"text": ["Total"], "conf": [90], "left": [0], "top": [0],
+                                                                   "width": [10], "height": [5], "page_num": [1], "block_num": [1],
+                                                                   "par_num": [1], "line_num": [1]},
+        )
+        page = np.zeros((4, 4), dtype=np.uint8)
+        for _ in range(2):
+            assert ocr_pipeline._tesseract_text(page, "en") == ("Total", 0.9)
+        assert forked == ["eng", "eng"]
+        assert pool.disabled and pool.stats()["restarts"] == 0
+        assert tesseract_pool.get_tesseract_pool() is None
+        try:
+            pool.image_to_data(page)
+            assert False, "expected TesseractPageError"
+        except TesseractPageError:
+            pass
+    finally:
+        pool.close()